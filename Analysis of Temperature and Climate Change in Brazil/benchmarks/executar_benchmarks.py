@@ -0,0 +1,288 @@
+"""
+Benchmarks do pipeline de temperatura sobre acervos sintéticos do INMET.
+
+Para cada escala (volume relativo ao acervo atual) um acervo sintético é
+gerado e cada etapa é cronometrada separadamente: leitura dos arquivos do
+INMET, consolidação, ``carregar_dados_regiao``, ``preparar_dados``, agregados,
+os gráficos com mais agrupamentos e ``salvar_grafico``. Cada escala roda em um
+processo novo, para que o pico de memória de uma não contamine a outra.
+
+Os resultados vão para um JSON em ``benchmarks/resultados`` com o ambiente,
+o commit e uma projeção linear de tempo e memória para 10x e 50x o acervo atual.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ / 'src'))
+
+from gerar_inmet_sintetico import ESTACOES_REFERENCIA, gerar_acervo_sintetico
+from instrumentacao import pico_rss_mb
+
+logger = logging.getLogger(__name__)
+
+PASTA_RESULTADOS = Path(__file__).resolve().parent / 'resultados'
+
+# Tamanho do acervo atual quando ``data/`` não está disponível
+BYTES_REFERENCIA = 400 * 1024 ** 2
+
+# Gráficos dominados por agrupamentos (groupby/pivot), medidos sem o salvamento
+GRAFICOS_REGIAO = ['plot_variacao_diaria', 'plot_heatmap_semanal']
+GRAFICOS_NACIONAIS = ['plot_comparacao_estados', 'plot_mapa_calor_estados', 'plot_estatisticas_estados']
+
+@contextmanager
+def _cronometro(etapas, nome, **extras):
+    """Registra em ``etapas`` o tempo de parede, o tempo de CPU e o pico de memória de um bloco"""
+    registro = {'etapa': nome, **extras}
+    pico_antes = pico_rss_mb()
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    yield registro
+    registro['segundos'] = time.perf_counter() - inicio
+    registro['cpu_segundos'] = time.process_time() - inicio_cpu
+    registro['pico_rss_mb'] = pico_rss_mb()
+    registro['aumento_pico_rss_mb'] = (
+        registro['pico_rss_mb'] - pico_antes if registro['pico_rss_mb'] is not None else None
+    )
+    etapas.append(registro)
+
+def _executar_escala(escala, anos, pasta, perfil, workers):
+    """Gera o acervo de uma escala e cronometra cada etapa do pipeline"""
+    import data_processing
+    import visualization
+
+    logging.basicConfig(level=logging.WARNING)
+    visualization.definir_perfil_saida(perfil)
+    pasta = Path(pasta)
+    pasta_inmet, pasta_raw, reports_dir = pasta / 'inmet', pasta / 'raw', pasta / 'reports'
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    etapas = []
+
+    estacoes = max(1, round(ESTACOES_REFERENCIA * escala / anos))
+    with _cronometro(etapas, 'gerar_acervo_sintetico') as registro:
+        acervo = gerar_acervo_sintetico(pasta_inmet, estacoes, anos, workers=workers)
+        registro['bytes'] = acervo['bytes']
+
+    with _cronometro(etapas, 'carregar_estacoes_inmet') as registro:
+        _, df = data_processing.carregar_estacoes_inmet(pasta_inmet)
+        registro['linhas'] = len(df)
+    del df
+
+    with _cronometro(etapas, 'consolidar_inmet') as registro:
+        registro['arquivos'] = len(data_processing.consolidar_inmet(pasta_raw, pasta_inmet))
+
+    with _cronometro(etapas, 'carregar_dados_regiao') as registro:
+        dados = {}
+        for regiao in data_processing.REGIOES:
+            df = data_processing.carregar_dados_regiao(regiao, pasta_raw)
+            if df is not None:
+                dados[regiao] = df
+        registro['linhas'] = sum(len(df) for df in dados.values())
+
+    with _cronometro(etapas, 'preparar_dados') as registro:
+        preparados = {regiao: data_processing.preparar_dados(df) for regiao, df in dados.items()}
+        registro['linhas'] = sum(len(df) for df in preparados.values())
+    del preparados
+
+    with _cronometro(etapas, 'calcular_agregados_regiao'):
+        agregados = {regiao: visualization.calcular_agregados_regiao(df) for regiao, df in dados.items()}
+
+    # A pilha de gráficos é importada sob demanda pelo visualization; medida
+    # à parte para não ser atribuída ao primeiro gráfico
+    with _cronometro(etapas, 'importar_graficos'):
+        import matplotlib.pyplot  # noqa: F401
+        import seaborn  # noqa: F401
+
+    # salvar_grafico é cronometrado à parte e descontado do tempo dos gráficos
+    salvar_original = visualization.salvar_grafico
+    salvamentos = {'segundos': 0.0, 'cpu_segundos': 0.0, 'graficos': 0, 'bytes': 0}
+
+    def salvar_cronometrado(*args, **kwargs):
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        caminho = salvar_original(*args, **kwargs)
+        salvamentos['segundos'] += time.perf_counter() - inicio
+        salvamentos['cpu_segundos'] += time.process_time() - inicio_cpu
+        if caminho is not None:
+            salvamentos['graficos'] += 1
+            salvamentos['bytes'] += Path(caminho).stat().st_size
+        return caminho
+
+    visualization.salvar_grafico = salvar_cronometrado
+    try:
+        def medir_grafico(nome, chamadas):
+            antes, antes_cpu = salvamentos['segundos'], salvamentos['cpu_segundos']
+            with _cronometro(etapas, nome) as registro:
+                for chamada in chamadas:
+                    chamada()
+            registro['segundos'] -= salvamentos['segundos'] - antes
+            registro['cpu_segundos'] -= salvamentos['cpu_segundos'] - antes_cpu
+
+        for nome in GRAFICOS_REGIAO:
+            funcao = getattr(visualization, nome)
+            medir_grafico(nome, [
+                lambda r=regiao, df=df: funcao(df, r, reports_dir, agregados=agregados[r])
+                for regiao, df in dados.items()
+            ])
+        for nome in GRAFICOS_NACIONAIS:
+            funcao = getattr(visualization, nome)
+            medir_grafico(nome, [lambda: funcao(dados, reports_dir)])
+    finally:
+        visualization.salvar_grafico = salvar_original
+
+    etapas.append({'etapa': 'salvar_grafico', 'pico_rss_mb': pico_rss_mb(), **salvamentos})
+    return {
+        'escala': escala,
+        'estacoes': estacoes,
+        'anos': anos,
+        'bytes_acervo': acervo['bytes'],
+        'etapas': etapas
+    }
+
+def projetar(resultados, bytes_referencia, fatores):
+    """
+    Ajusta, por etapa, uma reta (tempo e pico de memória em função do tamanho do
+    acervo) e projeta os valores para ``fatores`` vezes o acervo de referência.
+    """
+    projecoes = {}
+    nomes = [etapa['etapa'] for etapa in resultados[0]['etapas']]
+    tamanhos = np.array([r['bytes_acervo'] for r in resultados], dtype=float)
+
+    for fator in fatores:
+        alvo = bytes_referencia * fator
+        etapas = {}
+        for nome in nomes:
+            projecao = {}
+            for medida in ('segundos', 'pico_rss_mb'):
+                valores = [next(e[medida] for e in r['etapas'] if e['etapa'] == nome) for r in resultados]
+                if None in valores:
+                    # Plataforma sem medida do pico de memória
+                    projecao[medida] = None
+                    continue
+                valores = np.array(valores)
+                if len(resultados) > 1 and np.ptp(tamanhos) > 0:
+                    inclinacao, intercepto = np.polyfit(tamanhos, valores, 1)
+                else:
+                    inclinacao, intercepto = valores[0] / tamanhos[0], 0.0
+                projecao[medida] = float(intercepto + inclinacao * alvo)
+            etapas[nome] = projecao
+        projecoes[f'{fator:g}x'] = {'bytes': alvo, 'etapas': etapas}
+    return projecoes
+
+def _ambiente():
+    import matplotlib
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': multiprocessing.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'matplotlib': matplotlib.__version__
+    }
+
+def _bytes_referencia():
+    """Tamanho do acervo real em ``data/``, se presente"""
+    arquivos = list((RAIZ / 'data').glob('INMET_*.CSV'))
+    return sum(a.stat().st_size for a in arquivos) if arquivos else BYTES_REFERENCIA
+
+def imprimir_resumo(relatorio, anterior=None):
+    """Tabela por escala com as etapas ordenadas pelo tempo gasto"""
+    for resultado in relatorio['resultados']:
+        mb = resultado['bytes_acervo'] / 1024 ** 2
+        print(f"\nEscala {resultado['escala']:g} ({resultado['estacoes']} estações x "
+              f"{resultado['anos']} anos, {mb:.0f} MB)")
+        base = {}
+        if anterior:
+            for r in anterior['resultados']:
+                if r['escala'] == resultado['escala']:
+                    base = {e['etapa']: e['segundos'] for e in r['etapas']}
+        print(f"{'etapa':28} {'s':>9} {'cpu s':>9} {'MB/s':>9} {'pico MB':>9}" + ('  vs anterior' if base else ''))
+        for etapa in sorted(resultado['etapas'], key=lambda e: -e['segundos']):
+            linha = (
+                f"{etapa['etapa']:28} {etapa['segundos']:9.2f} {etapa['cpu_segundos']:9.2f} "
+                f"{mb / max(etapa['segundos'], 1e-9):9.1f} "
+                + (f"{etapa['pico_rss_mb']:9.0f}" if etapa['pico_rss_mb'] is not None else f"{'-':>9}")
+            )
+            if etapa['etapa'] in base:
+                linha += f"  {etapa['segundos'] / max(base[etapa['etapa']], 1e-9):.2f}x"
+            print(linha)
+
+    for nome, projecao in relatorio['projecoes'].items():
+        total = sum(e['segundos'] for e in projecao['etapas'].values())
+        picos = [e['pico_rss_mb'] for e in projecao['etapas'].values() if e['pico_rss_mb'] is not None]
+        memoria = f", pico de {max(picos) / 1024:.1f} GB de memória" if picos else ""
+        print(f"\nProjeção {nome} ({projecao['bytes'] / 1024 ** 3:.1f} GB): "
+              f"{total / 60:.1f} min no total{memoria}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks do pipeline de temperatura')
+    parser.add_argument('--escalas', default='0.05,0.1,0.2',
+                        help='Volumes relativos ao acervo atual, separados por vírgula')
+    parser.add_argument('--anos', type=int, default=1, help='Anos por estação nos acervos sintéticos')
+    parser.add_argument('--projetar', default='10,50', help='Fatores do acervo atual a projetar')
+    parser.add_argument('--perfil', default='preview', help='Perfil de saída dos gráficos')
+    parser.add_argument('--workers', type=int, default=1, help='Processos usados na geração dos acervos')
+    parser.add_argument('--pasta', type=Path, help='Pasta de trabalho (padrão: temporária)')
+    parser.add_argument('--saida', type=Path, default=PASTA_RESULTADOS)
+    parser.add_argument('--comparar', type=Path, help='JSON de uma execução anterior para comparação')
+    args = parser.parse_args()
+
+    escalas = [float(e) for e in args.escalas.split(',')]
+    fatores = [float(f) for f in args.projetar.split(',')]
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    contexto = multiprocessing.get_context('spawn')
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as temporaria:
+        base = args.pasta or Path(temporaria)
+        for escala in escalas:
+            logger.info(f"Executando escala {escala:g}")
+            with contexto.Pool(1) as pool:
+                resultados.append(pool.apply(
+                    _executar_escala,
+                    (escala, args.anos, base / f'escala_{escala:g}', args.perfil, args.workers)
+                ))
+
+    bytes_referencia = _bytes_referencia()
+    relatorio = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': _ambiente(),
+        'perfil': args.perfil,
+        'bytes_referencia': bytes_referencia,
+        'resultados': resultados,
+        'projecoes': projetar(resultados, bytes_referencia, fatores)
+    }
+
+    args.saida.mkdir(parents=True, exist_ok=True)
+    caminho = args.saida / f"benchmark_{datetime.now():%Y%m%d_%H%M%S}_{relatorio['ambiente']['commit'] or 'local'}.json"
+    caminho.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    logger.info(f"Resultados salvos em {caminho}")
+
+    anterior = json.loads(args.comparar.read_text()) if args.comparar else None
+    imprimir_resumo(relatorio, anterior)
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,286 @@
+"""
+Gerador de arquivos sintéticos no formato dos arquivos horários do INMET.
+
+Os arquivos seguem byte a byte o layout publicado pelo INMET: codificação
+latin-1, 8 linhas de metadados, cabeçalho com as 19 colunas, vírgula decimal,
+``Hora UTC`` no formato ``0000 UTC``, células vazias para medições ausentes e
+``;`` ao final de cada linha. Um arquivo é gerado por estação e ano, com séries
+plausíveis (ciclos diário e sazonal, chuva esparsa, falhas de transmissão).
+"""
+
+import argparse
+import logging
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Estações e anos equivalentes ao acervo atual (565 estações em 2024, ~400 MB)
+ESTACOES_REFERENCIA = 565
+
+ROTULOS_CABECALHO = [
+    'REGIAO:', 'UF:', 'ESTACAO:', 'CODIGO (WMO):', 'LATITUDE:', 'LONGITUDE:',
+    'ALTITUDE:', 'DATA DE FUNDACAO:'
+]
+
+COLUNAS_INMET = [
+    'Data', 'Hora UTC',
+    'PRECIPITAÇÃO TOTAL, HORÁRIO (mm)',
+    'PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)',
+    'PRESSÃO ATMOSFERICA MAX.NA HORA ANT. (AUT) (mB)',
+    'PRESSÃO ATMOSFERICA MIN. NA HORA ANT. (AUT) (mB)',
+    'RADIACAO GLOBAL (Kj/m²)',
+    'TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)',
+    'TEMPERATURA DO PONTO DE ORVALHO (°C)',
+    'TEMPERATURA MÁXIMA NA HORA ANT. (AUT) (°C)',
+    'TEMPERATURA MÍNIMA NA HORA ANT. (AUT) (°C)',
+    'TEMPERATURA ORVALHO MAX. NA HORA ANT. (AUT) (°C)',
+    'TEMPERATURA ORVALHO MIN. NA HORA ANT. (AUT) (°C)',
+    'UMIDADE REL. MAX. NA HORA ANT. (AUT) (%)',
+    'UMIDADE REL. MIN. NA HORA ANT. (AUT) (%)',
+    'UMIDADE RELATIVA DO AR, HORARIA (%)',
+    'VENTO, DIREÇÃO HORARIA (gr) (° (gr))',
+    'VENTO, RAJADA MAXIMA (m/s)',
+    'VENTO, VELOCIDADE HORARIA (m/s)'
+]
+
+# Sigla de região e centro aproximado (latitude, longitude) de cada UF
+UFS = {
+    'AC': ('N', -9.0, -70.5), 'AM': ('N', -4.0, -64.0), 'AP': ('N', 1.4, -51.8),
+    'PA': ('N', -4.0, -52.5), 'RO': ('N', -10.9, -63.0), 'RR': ('N', 2.0, -61.3),
+    'TO': ('N', -10.2, -48.3), 'AL': ('NE', -9.6, -36.6), 'BA': ('NE', -12.5, -41.7),
+    'CE': ('NE', -5.2, -39.5), 'MA': ('NE', -5.0, -45.3), 'PB': ('NE', -7.1, -36.8),
+    'PE': ('NE', -8.4, -37.9), 'PI': ('NE', -7.7, -42.7), 'RN': ('NE', -5.8, -36.6),
+    'SE': ('NE', -10.6, -37.4), 'DF': ('CO', -15.8, -47.9), 'GO': ('CO', -15.9, -49.8),
+    'MS': ('CO', -20.5, -54.8), 'MT': ('CO', -12.7, -55.9), 'ES': ('SE', -19.6, -40.7),
+    'MG': ('SE', -18.5, -44.6), 'RJ': ('SE', -22.3, -42.7), 'SP': ('SE', -22.3, -48.5),
+    'PR': ('S', -24.6, -51.6), 'RS': ('S', -30.0, -53.2), 'SC': ('S', -27.3, -50.4)
+}
+
+_ZERO_INICIAL = re.compile(r';(-?)0,')
+
+# Colunas de data e hora por ano, iguais para todas as estações
+_horarios = {}
+
+def _formatar_numero(valor, casas):
+    """Formata um número com vírgula decimal, como nos metadados do INMET"""
+    return f'{valor:.{casas}f}'.replace('.', ',')
+
+def escrever_arquivo_inmet(caminho, cabecalho, dados):
+    """
+    Grava um arquivo no formato do INMET.
+
+    Args:
+        caminho (Path): Arquivo de destino
+        cabecalho (list): Os 8 valores de metadados, já formatados como texto
+        dados (pd.DataFrame): Colunas ``COLUNAS_INMET``; Data e Hora UTC como texto,
+            medições numéricas com NaN nas ausências
+    """
+    # Coluna vazia no fim reproduz o ';' que encerra cada linha
+    tabela = dados.assign(**{'': np.nan}).to_csv(
+        sep=';', decimal=',', float_format='%g', na_rep='', index=False, lineterminator='\n'
+    )
+    # O INMET omite o zero antes da vírgula: 0,2 vira ,2 e -0,5 vira -,5
+    tabela = _ZERO_INICIAL.sub(r';\1,', tabela)
+
+    with open(caminho, 'w', encoding='latin-1', newline='') as arquivo:
+        for rotulo, valor in zip(ROTULOS_CABECALHO, cabecalho):
+            arquivo.write(f'{rotulo};{valor}\n')
+        arquivo.write(tabela)
+
+def _colunas_horario(ano):
+    if ano not in _horarios:
+        horarios = pd.date_range(f'{ano}-01-01', f'{ano}-12-31 23:00', freq='h')
+        _horarios[ano] = (
+            np.asarray(horarios.strftime('%Y/%m/%d'), dtype=object),
+            np.asarray(horarios.strftime('%H%M UTC'), dtype=object),
+            horarios.dayofyear.to_numpy(),
+            horarios.hour.to_numpy()
+        )
+    return _horarios[ano]
+
+def simular_estacao(ano, latitude, altitude, rng):
+    """
+    Simula um ano de medições horárias de uma estação.
+
+    Returns:
+        pd.DataFrame: Colunas ``COLUNAS_INMET`` prontas para ``escrever_arquivo_inmet``
+    """
+    datas, horas, dia_ano, hora = _colunas_horario(ano)
+    n = len(datas)
+    hora_local = (hora - 3) % 24
+
+    # Temperatura: média pela latitude e altitude, ciclos sazonal e diário e
+    # anomalias sinóticas de alguns dias interpoladas hora a hora
+    media = 27.5 - 0.3 * max(0.0, -latitude - 5) - 0.0065 * altitude
+    sazonal = 0.2 * abs(latitude) * np.cos(2 * np.pi * (dia_ano - 15) / 366)
+    amplitude = rng.uniform(3.0, 6.0)
+    diario = amplitude * np.cos(2 * np.pi * (hora_local - 15) / 24)
+    nos = np.arange(0, n + 72, 72)
+    sinotico = np.interp(np.arange(n), nos, rng.normal(0, 2.0, len(nos)))
+    temperatura = media + sazonal + diario + sinotico + rng.normal(0, 0.4, n)
+
+    umidade = np.clip(78 - 4.5 * (diario + sinotico) + rng.normal(0, 5, n), 12, 100).round()
+    gama = np.log(umidade / 100) + 17.27 * temperatura / (237.7 + temperatura)
+    orvalho = 237.7 * gama / (17.27 - gama)
+
+    pressao = (
+        1013.25 * (1 - 2.25577e-5 * altitude) ** 5.25588
+        + 1.2 * np.cos(2 * np.pi * (hora_local - 10) / 12) - sinotico * 0.8
+    )
+
+    sol = np.clip(np.sin(np.pi * (hora_local - 6) / 12), 0, None)
+    nuvens = rng.beta(2, 3, n)
+    radiacao = np.where(sol > 0, 3600 * sol * (1 - 0.75 * nuvens), np.nan)
+
+    chuva = np.where(rng.random(n) < 0.05 * nuvens, rng.exponential(2.5, n), 0.0)
+    velocidade = rng.gamma(2.0, 1.0, n)
+    rajada = velocidade * rng.uniform(1.5, 2.5, n) + rng.gamma(1.5, 0.6, n)
+
+    def anterior(serie):
+        return np.concatenate([serie[:1], serie[:-1]])
+
+    def faixa(serie, escala):
+        folga = rng.uniform(0, escala, n)
+        return np.maximum(serie, anterior(serie)) + folga, np.minimum(serie, anterior(serie)) - folga
+
+    temp_max, temp_min = faixa(temperatura, 0.6)
+    orv_max, orv_min = faixa(orvalho, 0.5)
+    pres_max, pres_min = faixa(pressao, 0.2)
+    umid_max, umid_min = faixa(umidade, 3)
+
+    valores = {
+        COLUNAS_INMET[2]: chuva.round(1),
+        COLUNAS_INMET[3]: pressao.round(1),
+        COLUNAS_INMET[4]: pres_max.round(1),
+        COLUNAS_INMET[5]: pres_min.round(1),
+        COLUNAS_INMET[6]: radiacao.round(1),
+        COLUNAS_INMET[7]: temperatura.round(1),
+        COLUNAS_INMET[8]: orvalho.round(1),
+        COLUNAS_INMET[9]: temp_max.round(1),
+        COLUNAS_INMET[10]: temp_min.round(1),
+        COLUNAS_INMET[11]: orv_max.round(1),
+        COLUNAS_INMET[12]: orv_min.round(1),
+        COLUNAS_INMET[13]: np.clip(umid_max, None, 100).round(),
+        COLUNAS_INMET[14]: np.clip(umid_min, 5, None).round(),
+        COLUNAS_INMET[15]: umidade,
+        COLUNAS_INMET[16]: rng.integers(1, 361, n).astype(float),
+        COLUNAS_INMET[17]: rajada.round(1),
+        COLUNAS_INMET[18]: velocidade.round(1)
+    }
+    dados = pd.DataFrame({'Data': datas, 'Hora UTC': horas, **valores})
+
+    # Falha de transmissão: um trecho sem nenhuma medição
+    if rng.random() < 0.3:
+        inicio = rng.integers(0, n - 500)
+        dados.iloc[inicio:inicio + rng.integers(24, 500), 2:] = np.nan
+    return dados
+
+def _gerar_estacao(pasta_saida, i, anos, ano_inicial, semente):
+    """Gera os arquivos de uma estação; a semente por estação torna o acervo
+    independente do número de processos"""
+    rng = np.random.default_rng([semente, i])
+    uf = list(UFS)[i % len(UFS)]
+    regiao, lat_centro, lon_centro = UFS[uf]
+    latitude = lat_centro + rng.uniform(-2, 2)
+    longitude = lon_centro + rng.uniform(-2, 2)
+    altitude = rng.uniform(5, 1200)
+    codigo = f'S{i:04d}'
+    nome = f'SINTETICA {i:04d}'
+    fundacao = f'{rng.integers(1, 29):02d}/{rng.integers(1, 13):02d}/{rng.integers(0, 24):02d}'
+    cabecalho = [
+        regiao, uf, nome, codigo, _formatar_numero(latitude, 8),
+        _formatar_numero(longitude, 8), _formatar_numero(altitude, 2), fundacao
+    ]
+
+    total_bytes = 0
+    for ano in range(ano_inicial, ano_inicial + anos):
+        caminho = Path(pasta_saida) / f'INMET_{regiao}_{uf}_{codigo}_{nome}_01-01-{ano}_A_31-12-{ano}.CSV'
+        escrever_arquivo_inmet(caminho, cabecalho, simular_estacao(ano, latitude, altitude, rng))
+        total_bytes += caminho.stat().st_size
+    return total_bytes
+
+def gerar_acervo_sintetico(pasta_saida, estacoes, anos=1, ano_inicial=2024, semente=0, workers=1):
+    """
+    Gera ``estacoes`` x ``anos`` arquivos sintéticos no formato do INMET.
+
+    Args:
+        pasta_saida (Path): Pasta de destino
+        estacoes (int): Número de estações, distribuídas entre as 27 UFs
+        anos (int): Anos consecutivos por estação
+        ano_inicial (int): Primeiro ano
+        semente (int): Semente do gerador aleatório
+        workers (int): Processos usados na geração
+
+    Returns:
+        dict: Arquivos gravados, bytes e tempo gasto
+    """
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+
+    inicio = time.perf_counter()
+    argumentos = [(pasta_saida, i, anos, ano_inicial, semente) for i in range(estacoes)]
+    if workers <= 1:
+        total_bytes = sum(_gerar_estacao(*args) for args in argumentos)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            total_bytes = sum(executor.map(_gerar_estacao, *zip(*argumentos), chunksize=8))
+
+    duracao = time.perf_counter() - inicio
+    logger.info(
+        f"{estacoes * anos} arquivos sintéticos ({total_bytes / 1024 ** 2:.0f} MB) gerados "
+        f"em {duracao:.1f} s em {pasta_saida}"
+    )
+    return {'arquivos': estacoes * anos, 'bytes': total_bytes, 'segundos': duracao}
+
+def verificar_formato(caminho_original, caminho_copia):
+    """
+    Confere o escritor contra um arquivo real: relê o arquivo, grava-o de novo
+    com ``escrever_arquivo_inmet`` e compara os bytes.
+
+    Returns:
+        bool: True se a cópia for idêntica ao original
+    """
+    with open(caminho_original, encoding='latin-1') as arquivo:
+        cabecalho = [arquivo.readline().rstrip('\n').split(';', 1)[1] for _ in range(8)]
+    dados = pd.read_csv(
+        caminho_original, sep=';', decimal=',', encoding='latin-1', skiprows=8,
+        usecols=COLUNAS_INMET, dtype={'Data': str, 'Hora UTC': str}
+    )
+    escrever_arquivo_inmet(caminho_copia, cabecalho, dados)
+    return Path(caminho_original).read_bytes() == Path(caminho_copia).read_bytes()
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera arquivos sintéticos no formato do INMET')
+    parser.add_argument('saida', type=Path, help='Pasta de destino')
+    parser.add_argument('--estacoes', type=int, help='Número de estações')
+    parser.add_argument('--anos', type=int, default=1, help='Anos por estação')
+    parser.add_argument('--escala', type=float, default=1.0,
+                        help='Volume relativo ao acervo atual, usado se --estacoes não for informado')
+    parser.add_argument('--ano-inicial', type=int, default=2024)
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--verificar', type=Path, metavar='ARQUIVO_INMET',
+                        help='Apenas confere o formato gravado contra um arquivo real do INMET')
+    args = parser.parse_args()
+
+    if args.verificar:
+        args.saida.mkdir(parents=True, exist_ok=True)
+        identico = verificar_formato(args.verificar, args.saida / args.verificar.name)
+        print('Formato idêntico ao original' if identico else 'Formato difere do original')
+        return
+
+    estacoes = args.estacoes or max(1, round(ESTACOES_REFERENCIA * args.escala / args.anos))
+    gerar_acervo_sintetico(
+        args.saida, estacoes, args.anos, args.ano_inicial, args.semente, args.workers
+    )
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,90 @@
+"""
+Tempo de importação dos módulos do pipeline, comparado a um orçamento.
+
+Cada módulo é importado em um interpretador novo (sem cache de módulos), várias
+vezes, e vale o menor tempo medido. Tarefas curtas agendadas (somente
+estatísticas, consolidação) não devem pagar a importação do matplotlib e do
+seaborn; o orçamento acusa quando uma importação no nível do módulo volta a
+carregar a pilha de gráficos.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PASTA_SRC = Path(__file__).resolve().parents[1] / 'src'
+
+# Orçamento de importação, em milissegundos (None: apenas informativo)
+ORCAMENTO_MS = {
+    'perfis_saida': 50,
+    'instrumentacao': 600,
+    'data_processing': 700,
+    'registro_graficos': 700,
+    'gerar_visualizacoes': 800,
+    'visualization': 800,
+    'matplotlib.pyplot': None,
+    'seaborn': None
+}
+
+CODIGO_MEDICAO = (
+    "import time; inicio = time.perf_counter(); import {modulo}; "
+    "print(time.perf_counter() - inicio)"
+)
+
+def medir_importacao(modulo, repeticoes=5):
+    """Menor tempo de importação de ``modulo`` em interpretadores novos, em ms"""
+    ambiente = {**os.environ, 'PYTHONPATH': str(PASTA_SRC), 'MPLBACKEND': 'Agg'}
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, '-c', CODIGO_MEDICAO.format(modulo=modulo)],
+            cwd=PASTA_SRC, env=ambiente, capture_output=True, text=True, check=True
+        ).stdout
+        tempos.append(float(saida.strip().splitlines()[-1]) * 1000)
+    return min(tempos)
+
+def detalhar_importacao(modulo, limite=10):
+    """Importações mais caras (tempo acumulado) de ``modulo``, via ``-X importtime``"""
+    ambiente = {**os.environ, 'PYTHONPATH': str(PASTA_SRC), 'MPLBACKEND': 'Agg'}
+    saida = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+        cwd=PASTA_SRC, env=ambiente, capture_output=True, text=True, check=True
+    ).stderr
+    linhas = []
+    for linha in saida.splitlines()[1:]:
+        partes = linha.split('|')
+        if len(partes) == 3:
+            linhas.append((int(partes[1]) / 1000, partes[2].strip()))
+    return sorted(linhas, reverse=True)[:limite]
+
+def main():
+    parser = argparse.ArgumentParser(description='Mede o tempo de importação dos módulos do pipeline')
+    parser.add_argument('modulos', nargs='*', default=list(ORCAMENTO_MS),
+                        help='Módulos a medir (padrão: todos os do orçamento)')
+    parser.add_argument('--repeticoes', type=int, default=5, help='Medições por módulo')
+    parser.add_argument('--detalhar', action='store_true',
+                        help='Lista as importações mais caras de cada módulo')
+    args = parser.parse_args()
+
+    estourados = []
+    print(f"{'módulo':22} {'ms':>8} {'orçamento':>10}")
+    for modulo in args.modulos:
+        ms = medir_importacao(modulo, args.repeticoes)
+        orcamento = ORCAMENTO_MS.get(modulo)
+        situacao = ''
+        if orcamento is not None and ms > orcamento:
+            situacao = '  ESTOURADO'
+            estourados.append(modulo)
+        print(f"{modulo:22} {ms:8.0f} {orcamento if orcamento is not None else '-':>10}{situacao}")
+        if args.detalhar:
+            for acumulado, nome in detalhar_importacao(modulo):
+                print(f"    {acumulado:8.0f} ms  {nome}")
+
+    if estourados:
+        print(f"\nOrçamento de importação estourado: {', '.join(estourados)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
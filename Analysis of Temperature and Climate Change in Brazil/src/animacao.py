@@ -0,0 +1,247 @@
+"""
+Módulo para geração de animações horárias da temperatura em todas as estações.
+
+A figura base (eixos, grade, posições das estações e barra de cores) é
+desenhada uma única vez por processo; cada quadro apenas restaura esse fundo
+e redesenha os marcadores coloridos e o rótulo de data (blitting). Os quadros
+são divididos em blocos renderizados em processos paralelos e gravados como
+PNGs numerados ou montados em um GIF/WebP animado.
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
+from PIL import Image
+
+from data_processing import PASTA_INMET, carregar_estacoes_inmet
+from espacial import EXTENSAO_BRASIL, montar_matriz_horaria
+
+logger = logging.getLogger(__name__)
+
+FORMATOS_ANIMACAO = ('png', 'gif', 'webp')
+
+# Base desenhada por processo, reaproveitada entre blocos com a mesma configuração
+_base = {'chave': None}
+
+def _construir_base(config):
+    """
+    Desenha a parte estática da figura e guarda o fundo para o blitting.
+
+    Returns:
+        dict: Canvas, fundo salvo e artistas animados (marcadores e rótulo)
+    """
+    fig = Figure(figsize=config['tamanho'], dpi=config['dpi'])
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0.08, 0.06, 0.76, 0.86])
+
+    oeste, leste, sul, norte = EXTENSAO_BRASIL
+    ax.set_xlim(oeste, leste)
+    ax.set_ylim(sul, norte)
+    ax.set_aspect('equal')
+    ax.set_facecolor('#eef2f5')
+    ax.grid(True, color='white', linewidth=0.8)
+    ax.set_xlabel('Longitude')
+    ax.set_ylabel('Latitude')
+    ax.set_title(config['titulo'])
+
+    # Todas as estações em cinza, visíveis mesmo nas horas sem leitura
+    longitudes, latitudes = config['longitudes'], config['latitudes']
+    ax.scatter(longitudes, latitudes, s=config['tamanho_marcador'], c='#c8ced3', linewidths=0)
+
+    norma = Normalize(config['vmin'], config['vmax'])
+    cax = fig.add_axes([0.87, 0.15, 0.03, 0.68])
+    fig.colorbar(ScalarMappable(norma, config['cmap']), cax=cax, label='Temperatura (°C)')
+
+    pontos = ax.scatter(
+        longitudes, latitudes, c=np.zeros(len(longitudes)), s=config['tamanho_marcador'],
+        cmap=config['cmap'], norm=norma, linewidths=0, animated=True
+    )
+    pontos.get_cmap().set_bad(alpha=0)
+    rotulo = ax.text(
+        0.02, 0.02, '', transform=ax.transAxes, fontsize=12,
+        bbox={'facecolor': 'white', 'alpha': 0.8, 'edgecolor': 'none'}, animated=True
+    )
+
+    canvas.draw()
+    return {
+        'canvas': canvas,
+        'fundo': canvas.copy_from_bbox(fig.bbox),
+        'pontos': pontos,
+        'rotulo': rotulo
+    }
+
+def _desenhar_quadro(base, valores, rotulo):
+    """Restaura o fundo, atualiza os artistas animados e retorna o buffer RGBA"""
+    canvas = base['canvas']
+    canvas.restore_region(base['fundo'])
+    base['pontos'].set_array(np.ma.masked_invalid(valores))
+    base['rotulo'].set_text(rotulo)
+    base['pontos'].axes.draw_artist(base['pontos'])
+    base['pontos'].axes.draw_artist(base['rotulo'])
+    return canvas.buffer_rgba()
+
+def _renderizar_bloco(primeiro, valores, rotulos, config, pasta_quadros):
+    """Renderiza um bloco de quadros consecutivos em PNGs numerados"""
+    if _base['chave'] != config['chave']:
+        _base.update(_construir_base(config), chave=config['chave'])
+
+    for deslocamento, (linha, rotulo) in enumerate(zip(valores, rotulos)):
+        buffer = _desenhar_quadro(_base, linha, rotulo)
+        imagem = Image.frombuffer('RGBA', buffer.shape[1::-1], buffer, 'raw', 'RGBA', 0, 1)
+        imagem.convert('RGB').save(
+            Path(pasta_quadros) / f'quadro_{primeiro + deslocamento:05d}.png', compress_level=1
+        )
+    return len(rotulos)
+
+def _montar_animacao(pasta_quadros, total, caminho, formato, fps):
+    """Monta o GIF/WebP lendo os quadros do disco sob demanda"""
+    quadros = (
+        Image.open(Path(pasta_quadros) / f'quadro_{i:05d}.png') for i in range(1, total)
+    )
+    primeiro = Image.open(Path(pasta_quadros) / 'quadro_00000.png')
+    opcoes = {'quality': 80, 'method': 4} if formato == 'webp' else {'optimize': False}
+    primeiro.save(
+        caminho, save_all=True, append_images=quadros,
+        duration=round(1000 / fps), loop=0, **opcoes
+    )
+
+def gerar_animacao(estacoes, df, saida, formato='png', fps=24, workers=None,
+                   passo=1, dpi=100, coluna='TEMPERATURA', titulo=None):
+    """
+    Gera a animação horária de uma variável em todas as estações.
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO (ver ``carregar_estacoes_inmet``)
+        df (pd.DataFrame): Dados longos com DATA, CODIGO e ``coluna``
+        saida (Path): Pasta dos quadros (formato png) ou arquivo da animação
+        formato (str): 'png' (quadros numerados), 'gif' ou 'webp'
+        fps (int): Quadros por segundo da animação
+        workers (int): Processos de renderização; None usa todos os núcleos
+        passo (int): Intervalo, em horas, entre quadros consecutivos
+        dpi (int): Resolução dos quadros
+        coluna (str): Variável a animar
+        titulo (str): Título da figura
+
+    Returns:
+        Path: Pasta dos quadros ou arquivo da animação
+    """
+    if formato not in FORMATOS_ANIMACAO:
+        raise ValueError(f"Formato desconhecido: {formato}. Use um de {', '.join(FORMATOS_ANIMACAO)}")
+
+    horarios, estacoes, matriz = montar_matriz_horaria(estacoes, df, coluna)
+    horarios, matriz = horarios[::passo], matriz[::passo]
+    vmin, vmax = np.nanpercentile(matriz, [1, 99])
+
+    config = {
+        'tamanho': (8, 8),
+        'dpi': dpi,
+        'titulo': titulo or 'Temperatura horária nas estações do INMET',
+        'longitudes': estacoes['LONGITUDE'].to_numpy(),
+        'latitudes': estacoes['LATITUDE'].to_numpy(),
+        'tamanho_marcador': 18,
+        'cmap': 'RdYlBu_r',
+        'vmin': float(vmin),
+        'vmax': float(vmax)
+    }
+    config['chave'] = (
+        config['titulo'], dpi, config['vmin'], config['vmax'],
+        config['longitudes'].tobytes(), config['latitudes'].tobytes()
+    )
+    rotulos = horarios.strftime('%d/%m/%Y %H:00 UTC')
+
+    saida = Path(saida)
+    if formato == 'png':
+        saida.mkdir(parents=True, exist_ok=True)
+        temporaria = None
+        pasta_quadros = saida
+    else:
+        saida.parent.mkdir(parents=True, exist_ok=True)
+        temporaria = tempfile.TemporaryDirectory()
+        pasta_quadros = Path(temporaria.name)
+
+    # Blocos menores que o necessário para equilibrar a carga entre processos
+    workers = workers or os.cpu_count() or 1
+    tamanho_bloco = max(1, -(-len(horarios) // (workers * 4)))
+    blocos = [
+        (inicio, matriz[inicio:inicio + tamanho_bloco], list(rotulos[inicio:inicio + tamanho_bloco]))
+        for inicio in range(0, len(horarios), tamanho_bloco)
+    ]
+
+    try:
+        inicio = time.perf_counter()
+        if workers == 1:
+            total = sum(_renderizar_bloco(*bloco, config, pasta_quadros) for bloco in blocos)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futuros = [
+                    executor.submit(_renderizar_bloco, *bloco, config, pasta_quadros)
+                    for bloco in blocos
+                ]
+                total = sum(futuro.result() for futuro in futuros)
+        duracao = time.perf_counter() - inicio
+        logger.info(
+            f"{total} quadros renderizados em {duracao:.1f} s "
+            f"({total / duracao:.1f} quadros/s, {workers} processos)"
+        )
+
+        if formato != 'png':
+            inicio = time.perf_counter()
+            _montar_animacao(pasta_quadros, total, saida, formato, fps)
+            duracao = time.perf_counter() - inicio
+            logger.info(
+                f"Animação salva em {saida} ({saida.stat().st_size / 1024:.0f} KB, "
+                f"{total / duracao:.1f} quadros/s na codificação)"
+            )
+    finally:
+        if temporaria is not None:
+            temporaria.cleanup()
+
+    return saida
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera a animação horária da temperatura nas estações do INMET')
+    parser.add_argument('--dados', type=Path, default=PASTA_INMET, help='Pasta com os arquivos INMET_*.CSV')
+    parser.add_argument('--saida', type=Path, help='Pasta dos quadros ou arquivo .gif/.webp')
+    parser.add_argument('--formato', choices=FORMATOS_ANIMACAO, default='png')
+    parser.add_argument('--regiao', nargs='*', help='Siglas de região do INMET (N, NE, CO, SE, S)')
+    parser.add_argument('--uf', nargs='*', help='Siglas de UF')
+    parser.add_argument('--inicio', help='Primeira data (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='Última data (AAAA-MM-DD, inclusiva)')
+    parser.add_argument('--passo', type=int, default=1, help='Horas entre quadros')
+    parser.add_argument('--fps', type=int, default=24)
+    parser.add_argument('--workers', type=int, help='Processos de renderização')
+    parser.add_argument('--dpi', type=int, default=100)
+    args = parser.parse_args()
+
+    estacoes, df = carregar_estacoes_inmet(args.dados, regioes=args.regiao, estados=args.uf)
+    if df is None:
+        return
+
+    if args.inicio:
+        df = df[df['DATA'] >= pd.Timestamp(args.inicio)]
+    if args.fim:
+        df = df[df['DATA'] < pd.Timestamp(args.fim) + pd.Timedelta(days=1)]
+
+    reports_dir = Path(__file__).resolve().parents[1] / 'reports'
+    saida = args.saida or (
+        reports_dir / 'animacao' if args.formato == 'png' else reports_dir / f'animacao.{args.formato}'
+    )
+    gerar_animacao(
+        estacoes, df, saida, formato=args.formato, fps=args.fps,
+        workers=args.workers, passo=args.passo, dpi=args.dpi
+    )
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,313 @@
+"""
+Climatologia de referência e armazenamento de anomalias de temperatura.
+
+A climatologia de cada série (uma estação, pela coluna CODIGO, ou o arquivo
+consolidado inteiro quando não há CODIGO) é uma superfície suave por hora do
+dia x dia do ano: harmônicos anuais, harmônicos diários e a modulação do ciclo
+diário ao longo do ano, ajustados por mínimos quadrados. Os coeficientes ficam
+em ``<dados>/anomalias/climatologia.csv`` e as anomalias (temperatura menos
+climatologia) ao lado dos arquivos consolidados, em ``<dados>/anomalias``, com
+as mesmas linhas de cada arquivo.
+
+A atualização é incremental: só os arquivos novos ou alterados são relidos e
+só as séries sem climatologia são ajustadas; a climatologia existente (período
+de referência fixo) só é refeita com ``recalcular=True``.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import PASTA_RAW, SUBPASTA_ANOMALIAS, arquivo_anomalias
+
+logger = logging.getLogger(__name__)
+
+ARQUIVO_CLIMATOLOGIA = 'climatologia.csv'
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+# Harmônicos do ciclo anual e do ciclo diário
+HARMONICOS_ANUAIS = 3
+HARMONICOS_DIARIOS = 2
+
+# Dias distintos com dados para ajustar o ciclo anual, horas distintas para o
+# diário e observações mínimas para ajustar uma série
+DIAS_MINIMOS_ANUAIS = 300
+HORAS_MINIMAS_DIARIAS = 12
+OBSERVACOES_MINIMAS = 24
+
+DIAS_ANO = 365.25
+
+def _serie_arquivo(arquivo):
+    """Série de um arquivo consolidado sem CODIGO: o nome sem o ano"""
+    return re.sub(r'_\d{4}$', '', Path(arquivo).stem)
+
+def ler_consolidado(arquivo):
+    """
+    Lê um arquivo consolidado com a coluna SERIE (CODIGO ou o nome do arquivo).
+
+    Returns:
+        pd.DataFrame: DATA, TEMPERATURA e SERIE, na ordem do arquivo
+    """
+    df = pd.read_csv(arquivo, sep=';', dtype={'CODIGO': str})
+    df['DATA'] = pd.to_datetime(df['DATA'])
+    df['SERIE'] = df['CODIGO'] if 'CODIGO' in df.columns else _serie_arquivo(arquivo)
+    return df[['DATA', 'TEMPERATURA', 'SERIE']]
+
+def matriz_harmonica(datas, harmonicos_anuais, harmonicos_diarios):
+    """
+    Matriz de regressão da climatologia para as datas (horárias).
+
+    Colunas: constante, (cos, sen) de cada harmônico anual, (cos, sen) de cada
+    harmônico diário e, com os dois ciclos, os quatro produtos do primeiro
+    harmônico anual pelo primeiro diário (amplitude diária variando no ano).
+
+    Args:
+        datas (pd.Series): Datas e horas (datetime64)
+        harmonicos_anuais (int): Harmônicos do ciclo anual
+        harmonicos_diarios (int): Harmônicos do ciclo diário
+
+    Returns:
+        np.ndarray: Matriz (observações x termos)
+    """
+    minutos = np.asarray(datas, dtype='datetime64[m]')
+    dias = minutos.astype('datetime64[D]')
+    hora = (minutos - dias).astype(float) / 60
+    dia = (dias - dias.astype('datetime64[Y]')).astype(float) + hora / 24
+    angulo_anual = 2 * np.pi * dia / DIAS_ANO
+    angulo_diario = 2 * np.pi * hora / 24
+
+    colunas = [np.ones_like(hora)]
+    for k in range(1, harmonicos_anuais + 1):
+        colunas += [np.cos(k * angulo_anual), np.sin(k * angulo_anual)]
+    for m in range(1, harmonicos_diarios + 1):
+        colunas += [np.cos(m * angulo_diario), np.sin(m * angulo_diario)]
+    if harmonicos_anuais and harmonicos_diarios:
+        for anual in (np.cos(angulo_anual), np.sin(angulo_anual)):
+            colunas += [anual * np.cos(angulo_diario), anual * np.sin(angulo_diario)]
+    return np.column_stack(colunas)
+
+def ajustar_climatologia(df, harmonicos_anuais=HARMONICOS_ANUAIS, harmonicos_diarios=HARMONICOS_DIARIOS,
+                         inicio=None, fim=None):
+    """
+    Ajusta a climatologia de cada série no período de referência.
+
+    Séries com menos de um ano de dias não ajustam o ciclo anual, e séries sem
+    horas suficientes não ajustam o ciclo diário (a climatologia se reduz ao
+    que os dados sustentam).
+
+    Args:
+        df (pd.DataFrame): DATA, TEMPERATURA e SERIE (ver ``ler_consolidado``)
+        harmonicos_anuais (int): Harmônicos do ciclo anual
+        harmonicos_diarios (int): Harmônicos do ciclo diário
+        inicio (str): Início do período de referência (AAAA-MM-DD); None para todo o período
+        fim (str): Fim do período de referência (inclusive); None para todo o período
+
+    Returns:
+        pd.DataFrame: Indexado por SERIE, com n, inicio, fim, anuais, diarios,
+        rmse e os coeficientes c0, c1, ...
+    """
+    df = df.dropna(subset=['TEMPERATURA'])
+    if inicio is not None:
+        df = df[df['DATA'] >= pd.Timestamp(inicio)]
+    if fim is not None:
+        df = df[df['DATA'] < pd.Timestamp(fim) + pd.Timedelta(days=1)]
+
+    linhas = {}
+    for serie, parte in df.groupby('SERIE', sort=True):
+        if len(parte) < OBSERVACOES_MINIMAS:
+            logger.warning(f"Série {serie} com {len(parte)} observações; sem climatologia")
+            continue
+        datas = parte['DATA']
+        anuais = harmonicos_anuais if datas.dt.normalize().nunique() >= DIAS_MINIMOS_ANUAIS else 0
+        diarios = harmonicos_diarios if datas.dt.hour.nunique() >= HORAS_MINIMAS_DIARIAS else 0
+        matriz = matriz_harmonica(datas, anuais, diarios)
+        valores = parte['TEMPERATURA'].to_numpy(dtype=float)
+        coeficientes = np.linalg.lstsq(matriz, valores, rcond=None)[0]
+        residuos = valores - matriz @ coeficientes
+        linhas[serie] = {
+            'n': len(parte), 'inicio': datas.min(), 'fim': datas.max(),
+            'anuais': anuais, 'diarios': diarios,
+            'rmse': float(np.sqrt(np.mean(residuos ** 2))),
+            **{f'c{i}': valor for i, valor in enumerate(coeficientes)}
+        }
+
+    climatologia = pd.DataFrame.from_dict(linhas, orient='index')
+    climatologia.index.name = 'SERIE'
+    logger.info(f"Climatologia ajustada para {len(climatologia)} séries")
+    return climatologia
+
+def avaliar_climatologia(climatologia, datas, series):
+    """
+    Valor climatológico de cada observação (NaN para séries sem climatologia).
+
+    Args:
+        climatologia (pd.DataFrame): Resultado de ``ajustar_climatologia``
+        datas (pd.Series): Datas das observações
+        series (pd.Series): Série de cada observação
+
+    Returns:
+        np.ndarray: Climatologia de cada observação
+    """
+    datas = pd.Series(datas).reset_index(drop=True)
+    series = pd.Series(series).reset_index(drop=True)
+    valores = np.full(len(datas), np.nan)
+    for serie, indices in series.groupby(series, sort=False).indices.items():
+        if serie not in climatologia.index:
+            continue
+        linha = climatologia.loc[serie]
+        matriz = matriz_harmonica(datas.iloc[indices], int(linha['anuais']), int(linha['diarios']))
+        coeficientes = linha[[f'c{i}' for i in range(matriz.shape[1])]].to_numpy(dtype=float)
+        valores[indices] = matriz @ coeficientes
+    return valores
+
+def grade_climatologica(climatologia, serie, ano=2001):
+    """
+    Climatologia de uma série em grade dia do ano x hora do dia.
+
+    Returns:
+        pd.DataFrame: Índice 1..365 (dia do ano), colunas 0..23 (hora)
+    """
+    datas = pd.Series(pd.date_range(f'{ano}-01-01', f'{ano}-12-31 23:00', freq='h'))
+    valores = avaliar_climatologia(climatologia, datas, pd.Series(serie, index=datas.index))
+    return pd.DataFrame(
+        valores.reshape(-1, 24), index=pd.RangeIndex(1, len(datas) // 24 + 1, name='DIA'),
+        columns=pd.RangeIndex(24, name='HORA')
+    )
+
+def calcular_anomalias(df, climatologia):
+    """Anomalias (TEMPERATURA menos climatologia) de um DataFrame de ``ler_consolidado``"""
+    return df['TEMPERATURA'].to_numpy(dtype=float) - avaliar_climatologia(climatologia, df['DATA'], df['SERIE'])
+
+def _gravar_anomalias(caminho, datas, anomalias):
+    """
+    Grava DATA;ANOMALIA. As datas são formatadas pelo numpy e as anomalias
+    arredondadas antes da escrita: o ``date_format``/``float_format`` do pandas
+    formata valor a valor e dominava o tempo da atualização.
+    """
+    texto_datas = datas.to_numpy().astype('datetime64[m]').astype(str)
+    pd.DataFrame({
+        'DATA': pd.Series(texto_datas).str.replace('T', ' ', regex=False),
+        'ANOMALIA': np.round(anomalias, 3)
+    }).to_csv(caminho, sep=';', index=False)
+
+def ler_climatologia(pasta_anomalias):
+    """Climatologia gravada em ``pasta_anomalias``; None se não houver"""
+    caminho = Path(pasta_anomalias) / ARQUIVO_CLIMATOLOGIA
+    if not caminho.exists():
+        return None
+    climatologia = pd.read_csv(caminho, sep=';', index_col='SERIE', dtype={'SERIE': str},
+                               parse_dates=['inicio', 'fim'])
+    return climatologia
+
+def _versoes(climatologia):
+    """Identificador dos coeficientes de cada série, para detectar anomalias obsoletas"""
+    return {
+        serie: hashlib.sha1(linha.to_numpy(dtype=float).tobytes()).hexdigest()[:12]
+        for serie, linha in climatologia.filter(regex=r'^c\d+$').fillna(0).iterrows()
+    }
+
+def _estado_fonte(arquivo):
+    estado = Path(arquivo).stat()
+    return [estado.st_mtime_ns, estado.st_size]
+
+def _ler_manifesto(pasta_anomalias):
+    caminho = Path(pasta_anomalias) / ARQUIVO_MANIFESTO
+    if caminho.exists():
+        try:
+            return json.loads(caminho.read_text())
+        except ValueError:
+            logger.warning(f"Manifesto de anomalias inválido em {caminho}; anomalias serão refeitas")
+    return {}
+
+def atualizar_anomalias(pasta_dados=None, recalcular=False, harmonicos_anuais=HARMONICOS_ANUAIS,
+                        harmonicos_diarios=HARMONICOS_DIARIOS, inicio=None, fim=None):
+    """
+    Atualiza a climatologia e as anomalias dos arquivos consolidados.
+
+    Um arquivo de anomalias é refeito quando o consolidado é novo ou mudou
+    (data de modificação e tamanho) ou quando a climatologia de uma de suas
+    séries mudou. Séries novas são ajustadas com os dados dos arquivos
+    relidos; a climatologia das demais permanece a mesma.
+
+    Args:
+        pasta_dados (Path): Pasta com os arquivos consolidados (padrão: data/raw)
+        recalcular (bool): Refaz a climatologia de todas as séries e todas as anomalias
+        harmonicos_anuais (int): Harmônicos do ciclo anual das séries ajustadas
+        harmonicos_diarios (int): Harmônicos do ciclo diário das séries ajustadas
+        inicio (str): Início do período de referência das séries ajustadas
+        fim (str): Fim do período de referência das séries ajustadas
+
+    Returns:
+        list: Arquivos de anomalias gravados
+    """
+    pasta_dados = Path(pasta_dados or PASTA_RAW)
+    pasta_anomalias = pasta_dados / SUBPASTA_ANOMALIAS
+    pasta_anomalias.mkdir(parents=True, exist_ok=True)
+    arquivos = sorted(pasta_dados.glob('INMET_*.CSV'))
+    opcoes = {'harmonicos_anuais': harmonicos_anuais, 'harmonicos_diarios': harmonicos_diarios,
+              'inicio': inicio, 'fim': fim}
+
+    climatologia = None if recalcular else ler_climatologia(pasta_anomalias)
+    manifesto = {} if recalcular else _ler_manifesto(pasta_anomalias)
+
+    if climatologia is None:
+        lidos = {arquivo: ler_consolidado(arquivo) for arquivo in arquivos}
+        climatologia = ajustar_climatologia(pd.concat(lidos.values(), ignore_index=True), **opcoes)
+    else:
+        lidos = {
+            arquivo: ler_consolidado(arquivo) for arquivo in arquivos
+            if manifesto.get(arquivo.name, {}).get('fonte') != _estado_fonte(arquivo)
+        }
+        if lidos:
+            novos = pd.concat(lidos.values(), ignore_index=True)
+            novos = novos[~novos['SERIE'].isin(climatologia.index)]
+            if not novos.empty:
+                climatologia = pd.concat([climatologia, ajustar_climatologia(novos, **opcoes)])
+    climatologia.to_csv(pasta_anomalias / ARQUIVO_CLIMATOLOGIA, sep=';', date_format='%Y-%m-%d %H:%M')
+    # Coeficientes como gravados, para que as versões coincidam nas próximas execuções
+    climatologia = ler_climatologia(pasta_anomalias)
+    versoes = _versoes(climatologia)
+
+    gravados = []
+    for arquivo in arquivos:
+        entrada = manifesto.get(arquivo.name)
+        if (arquivo not in lidos and entrada is not None and arquivo_anomalias(arquivo).exists()
+                and all(versoes.get(serie) == versao for serie, versao in entrada['series'].items())):
+            continue
+        df = lidos[arquivo] if arquivo in lidos else ler_consolidado(arquivo)
+        caminho = arquivo_anomalias(arquivo)
+        _gravar_anomalias(caminho, df['DATA'], calcular_anomalias(df, climatologia))
+        manifesto[arquivo.name] = {
+            'fonte': _estado_fonte(arquivo),
+            'series': {serie: versoes.get(serie) for serie in df['SERIE'].unique()}
+        }
+        gravados.append(caminho)
+
+    (pasta_anomalias / ARQUIVO_MANIFESTO).write_text(json.dumps(manifesto, indent=2, sort_keys=True))
+    logger.info(f"{len(gravados)} de {len(arquivos)} arquivos de anomalias atualizados em {pasta_anomalias}")
+    return gravados
+
+def main():
+    parser = argparse.ArgumentParser(description='Atualiza a climatologia e as anomalias dos arquivos consolidados')
+    parser.add_argument('--dados', type=Path, default=PASTA_RAW, help='Pasta com os arquivos consolidados')
+    parser.add_argument('--recalcular', action='store_true',
+                        help='Refaz a climatologia de todas as séries e todas as anomalias')
+    parser.add_argument('--inicio', help='Início do período de referência (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='Fim do período de referência (AAAA-MM-DD)')
+    parser.add_argument('--harmonicos-anuais', type=int, default=HARMONICOS_ANUAIS)
+    parser.add_argument('--harmonicos-diarios', type=int, default=HARMONICOS_DIARIOS)
+    args = parser.parse_args()
+
+    atualizar_anomalias(
+        args.dados, args.recalcular, args.harmonicos_anuais, args.harmonicos_diarios, args.inicio, args.fim
+    )
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
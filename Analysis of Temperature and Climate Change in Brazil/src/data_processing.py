@@ -7,10 +7,57 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import glob
+import gzip
+import io
+import itertools
 import logging
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from instrumentacao import medir_etapa
 
 logger = logging.getLogger(__name__)
 
+# Regiões usadas nos arquivos consolidados de ``data/raw``
+REGIOES = ['NORTE', 'NORDESTE', 'CENTRO-OESTE', 'SUDESTE', 'SUL']
+
+# Siglas de região usadas nos cabeçalhos dos arquivos do INMET
+SIGLAS_REGIOES = {'N': 'NORTE', 'NE': 'NORDESTE', 'CO': 'CENTRO-OESTE', 'SE': 'SUDESTE', 'S': 'SUL'}
+
+# Pasta com os arquivos originais do INMET (uma estação por arquivo)
+PASTA_INMET = Path(__file__).resolve().parents[1] / 'data'
+
+# Pasta padrão com os arquivos consolidados por região e UF
+PASTA_RAW = PASTA_INMET / 'raw'
+
+# Subpasta, ao lado dos arquivos consolidados, com as anomalias precomputadas
+# (ver climatologia.py)
+SUBPASTA_ANOMALIAS = 'anomalias'
+
+# Nomes curtos das variáveis horárias dos arquivos do INMET
+VARIAVEIS_INMET = {
+    'PRECIPITACAO': 'PRECIPITAÇÃO TOTAL, HORÁRIO (mm)',
+    'PRESSAO': 'PRESSAO ATMOSFERICA AO NIVEL DA ESTACAO, HORARIA (mB)',
+    'RADIACAO': 'RADIACAO GLOBAL (Kj/m²)',
+    'TEMPERATURA': 'TEMPERATURA DO AR - BULBO SECO, HORARIA (°C)',
+    'TEMPERATURA_ORVALHO': 'TEMPERATURA DO PONTO DE ORVALHO (°C)',
+    'UMIDADE': 'UMIDADE RELATIVA DO AR, HORARIA (%)',
+    'VENTO_DIRECAO': 'VENTO, DIREÇÃO HORARIA (gr) (° (gr))',
+    'VENTO_RAJADA': 'VENTO, RAJADA MAXIMA (m/s)',
+    'VENTO_VELOCIDADE': 'VENTO, VELOCIDADE HORARIA (m/s)'
+}
+
+# Valor usado pelo INMET para medições ausentes
+VALOR_AUSENTE_INMET = -9999
+
+# Pipeline de leitura dos arquivos do INMET: threads de E/S e arquivos em
+# memória entre os estágios (leitura, interpretação e consumo)
+LEITORES_IO = 4
+JANELA_PIPELINE = 8
+
+@medir_etapa
 def carregar_dados(caminho_arquivo: str) -> pd.DataFrame:
     """
     Carrega os dados do arquivo CSV e realiza limpeza inicial.
@@ -28,11 +75,69 @@ def carregar_dados(caminho_arquivo: str) -> pd.DataFrame:
         print(f"Erro ao carregar os dados: {e}")
         return None
 
-def carregar_dados_regiao(regiao):
-    """Carrega dados de temperatura para uma região específica"""
+def arquivos_regiao(regiao, pasta_dados=None):
+    """Lista os arquivos consolidados de uma região (incluindo os arquivos por UF)"""
+    pasta_dados = Path(pasta_dados or PASTA_RAW)
+    return sorted(pasta_dados.glob(f'INMET_{regiao}_*.CSV'))
+
+def arquivos_estado_capital(regiao, estado, pasta_dados=None):
+    """Retorna os caminhos dos arquivos do estado e de sua capital"""
+    pasta_dados = Path(pasta_dados or PASTA_RAW)
+    return (
+        pasta_dados / f'INMET_{regiao}_UF_{estado}_2024.CSV',
+        pasta_dados / f'INMET_{regiao}_UF_{estado}_CAPITAL_2024.CSV'
+    )
+
+def arquivo_anomalias(arquivo):
+    """Caminho do arquivo de anomalias precomputadas de um arquivo consolidado"""
+    arquivo = Path(arquivo)
+    return arquivo.parent / SUBPASTA_ANOMALIAS / arquivo.name
+
+def anexar_anomalias(df, arquivo):
+    """
+    Anexa a ``df`` a coluna ANOMALIA precomputada para ``arquivo``.
+
+    O arquivo de anomalias tem as mesmas linhas, na mesma ordem, do arquivo
+    consolidado; se estiver ausente ou desatualizado, a coluna fica NaN.
+    """
+    caminho = arquivo_anomalias(arquivo)
+    if caminho.exists():
+        anomalias = pd.read_csv(caminho, sep=';')
+        if len(anomalias) == len(df) and (pd.to_datetime(anomalias['DATA']).values == df['DATA'].values).all():
+            df['ANOMALIA'] = anomalias['ANOMALIA'].to_numpy()
+            return df
+        logger.warning(f"Anomalias desatualizadas para {arquivo}; execute climatologia.py")
+    else:
+        logger.warning(f"Anomalias não encontradas para {arquivo}; execute climatologia.py")
+    df['ANOMALIA'] = np.nan
+    return df
+
+def descobrir_estados(pasta_dados=None):
+    """
+    Descobre as UFs com arquivos consolidados em ``pasta_dados``.
+
+    Returns:
+        dict: Lista ordenada de UFs por região, por exemplo {'SUDESTE': ['RJ', 'SP']}
+    """
+    pasta_dados = Path(pasta_dados or PASTA_RAW)
+    padrao = re.compile(r'INMET_(.+)_UF_([A-Z]{2})_\d{4}\.CSV')
+    estados = {}
+    for arquivo in pasta_dados.glob('INMET_*_UF_*.CSV'):
+        encontrado = padrao.fullmatch(arquivo.name)
+        if encontrado:
+            regiao, estado = encontrado.groups()
+            estados.setdefault(regiao, set()).add(estado)
+    return {regiao: sorted(ufs) for regiao, ufs in estados.items()}
+
+@medir_etapa
+def carregar_dados_regiao(regiao, pasta_dados=None, anomalia=False):
+    """
+    Carrega dados de temperatura para uma região específica.
+
+    Com ``anomalia=True``, inclui a coluna ANOMALIA precomputada (ver climatologia.py).
+    """
     try:
-        pasta_dados = Path('data/raw')
-        arquivos = list(pasta_dados.glob(f'INMET_{regiao}_*.CSV'))
+        arquivos = arquivos_regiao(regiao, pasta_dados)
         
         if not arquivos:
             logger.warning(f"Nenhum arquivo encontrado para a região {regiao}")
@@ -45,6 +150,9 @@ def carregar_dados_regiao(regiao):
             try:
                 df = pd.read_csv(arquivo, sep=';')
                 df['DATA'] = pd.to_datetime(df['DATA'])
+                if anomalia:
+                    df = anexar_anomalias(df, arquivo)
+                df['REGIAO'] = regiao
                 
                 # Extrair estado do nome do arquivo se disponível
                 nome_arquivo = arquivo.stem
@@ -67,6 +175,259 @@ def carregar_dados_regiao(regiao):
         logger.error(f"Erro ao carregar dados da região {regiao}: {str(e)}")
         return None
 
+def arquivos_inmet(pasta_dados=PASTA_INMET):
+    """Arquivos do INMET de uma pasta, inclusive os comprimidos com gzip"""
+    pasta_dados = Path(pasta_dados)
+    return sorted([*pasta_dados.glob('INMET_*.CSV'), *pasta_dados.glob('INMET_*.CSV.gz')])
+
+def _abrir_inmet(caminho_arquivo):
+    caminho_arquivo = Path(caminho_arquivo)
+    return gzip.open(caminho_arquivo) if caminho_arquivo.suffix == '.gz' else open(caminho_arquivo, 'rb')
+
+def _ler_conteudo(caminho_arquivo):
+    """Lê (e descomprime, se for .gz) um arquivo inteiro"""
+    with _abrir_inmet(caminho_arquivo) as arquivo:
+        return arquivo.read()
+
+def _ler_antecipado(arquivos, janela):
+    """
+    Lê os arquivos em threads de E/S, no máximo ``janela`` arquivos à frente do
+    consumidor: quando o consumo atrasa, a leitura para e a memória fica limitada.
+
+    Yields:
+        tuple: (arquivo, Future com o conteúdo), na ordem de ``arquivos``
+    """
+    iterador = iter(arquivos)
+    with ThreadPoolExecutor(LEITORES_IO, thread_name_prefix='leitura') as leitores:
+        pendentes = deque(
+            (arquivo, leitores.submit(_ler_conteudo, arquivo))
+            for arquivo in itertools.islice(iterador, janela)
+        )
+        while pendentes:
+            arquivo, leitura = pendentes.popleft()
+            leitura.exception()
+            for proximo in itertools.islice(iterador, 1):
+                pendentes.append((proximo, leitores.submit(_ler_conteudo, proximo)))
+            yield arquivo, leitura
+
+def processar_em_pipeline(arquivos, funcao, workers=1, janela=JANELA_PIPELINE):
+    """
+    Aplica ``funcao(arquivo, conteudo)`` a cada arquivo em estágios sobrepostos:
+    leitura e descompressão em threads de E/S, interpretação em ``workers``
+    processos (ou neste processo) e consumo pelo chamador.
+
+    Filas limitadas a ``janela`` arquivos entre os estágios seguram os estágios
+    anteriores quando um posterior atrasa, mantendo a memória limitada; o tempo
+    total tende ao do estágio mais lento, e não à soma dos estágios.
+
+    Args:
+        arquivos (list): Caminhos dos arquivos
+        funcao (callable): Função de nível de módulo (serializável) ``(arquivo, conteudo)``
+        workers (int): Processos de interpretação; 1 interpreta neste processo
+        janela (int): Arquivos em andamento por estágio
+
+    Yields:
+        tuple: (arquivo, resultado, erro), na ordem de ``arquivos``
+    """
+    processos = ProcessPoolExecutor(workers) if workers > 1 else None
+    pendentes = deque()
+
+    def concluir():
+        arquivo, tarefa = pendentes.popleft()
+        erro = tarefa.exception()
+        return arquivo, None if erro else tarefa.result(), erro
+
+    try:
+        for arquivo, leitura in _ler_antecipado(arquivos, janela):
+            if leitura.exception() is not None or processos is None:
+                tarefa = Future()
+                try:
+                    tarefa.set_result(funcao(arquivo, leitura.result()))
+                except Exception as e:
+                    tarefa.set_exception(e)
+            else:
+                tarefa = processos.submit(funcao, arquivo, leitura.result())
+            pendentes.append((arquivo, tarefa))
+            if len(pendentes) >= janela:
+                yield concluir()
+        while pendentes:
+            yield concluir()
+    finally:
+        if processos is not None:
+            processos.shutdown(cancel_futures=True)
+
+def _interpretar_inmet(arquivo, conteudo, variaveis, regioes=None, estados=None):
+    """Metadados e dados de um arquivo do INMET; None se fora da seleção"""
+    metadados = ler_cabecalho_inmet(arquivo, conteudo)
+    if regioes and metadados['REGIAO'] not in regioes:
+        return None
+    if estados and metadados['ESTADO'] not in estados:
+        return None
+    return metadados, ler_arquivo_inmet(arquivo, variaveis, conteudo)
+
+def ler_cabecalho_inmet(caminho_arquivo, conteudo=None):
+    """
+    Lê as 8 linhas de metadados de um arquivo do INMET.
+
+    Args:
+        caminho_arquivo (str | Path): Caminho do arquivo CSV
+        conteudo (bytes): Conteúdo já lido do arquivo; evita reabri-lo
+
+    Returns:
+        dict: Região, UF, nome, código, latitude, longitude e altitude da estação
+    """
+    if conteudo is not None:
+        linhas = conteudo[:4096].decode('latin-1').splitlines()[:8]
+    else:
+        with _abrir_inmet(caminho_arquivo) as arquivo:
+            linhas = [arquivo.readline().decode('latin-1') for _ in range(8)]
+    valores = [linha.rstrip('\r\n').split(';')[1] for linha in linhas]
+
+    def numero(texto):
+        return float(texto.replace(',', '.')) if texto else np.nan
+
+    return {
+        'REGIAO': valores[0],
+        'ESTADO': valores[1],
+        'ESTACAO': valores[2],
+        'CODIGO': valores[3],
+        'LATITUDE': numero(valores[4]),
+        'LONGITUDE': numero(valores[5]),
+        'ALTITUDE': numero(valores[6])
+    }
+
+def _converter_datas_inmet(datas, horas):
+    """Combina as colunas Data (2024/01/01) e Hora UTC ("0000 UTC") em timestamps UTC"""
+    # Poucos valores distintos por arquivo: converter cada um só uma vez
+    formato = '%Y/%m/%d' if '/' in datas.iloc[0] else '%Y-%m-%d'
+    dias = pd.to_datetime(datas, format=formato, cache=True)
+    mapa_horas = {h: int(h.replace(':', '')[:2]) for h in horas.unique()}
+    return dias + pd.to_timedelta(horas.map(mapa_horas), unit='h')
+
+@medir_etapa
+def ler_arquivo_inmet(caminho_arquivo, variaveis=('TEMPERATURA',), conteudo=None):
+    """
+    Lê os dados horários de um arquivo do INMET.
+
+    Args:
+        caminho_arquivo (str | Path): Caminho do arquivo CSV (ou CSV.gz)
+        variaveis (tuple): Nomes curtos (ver ``VARIAVEIS_INMET``) a carregar
+        conteudo (bytes): Conteúdo já lido e descomprimido do arquivo
+
+    Returns:
+        pd.DataFrame: Colunas DATA (UTC), CODIGO e as variáveis pedidas
+    """
+    if conteudo is None:
+        conteudo = _ler_conteudo(caminho_arquivo)
+    metadados = ler_cabecalho_inmet(caminho_arquivo, conteudo)
+    colunas = {VARIAVEIS_INMET[v]: v for v in variaveis}
+
+    df = pd.read_csv(
+        io.BytesIO(conteudo),
+        sep=';',
+        decimal=',',
+        encoding='latin-1',
+        skiprows=8,
+        usecols=['Data', 'Hora UTC', *colunas],
+        dtype={'Data': str, 'Hora UTC': str}
+    ).rename(columns=colunas)
+
+    df['DATA'] = _converter_datas_inmet(df.pop('Data'), df.pop('Hora UTC'))
+    df[list(variaveis)] = df[list(variaveis)].replace(VALOR_AUSENTE_INMET, np.nan)
+    df['CODIGO'] = metadados['CODIGO']
+    return df[['DATA', 'CODIGO', *variaveis]]
+
+@medir_etapa
+def carregar_estacoes_inmet(pasta_dados=PASTA_INMET, regioes=None, estados=None,
+                            variaveis=('TEMPERATURA',), workers=1):
+    """
+    Carrega os arquivos do INMET de todas as estações selecionadas.
+
+    Args:
+        pasta_dados (Path): Pasta com os arquivos ``INMET_*.CSV`` (ou ``.CSV.gz``)
+        regioes (list): Siglas de região do INMET (N, NE, CO, SE, S); None para todas
+        estados (list): Siglas de UF; None para todas
+        variaveis (tuple): Variáveis horárias a carregar
+        workers (int): Processos de interpretação (ver ``processar_em_pipeline``)
+
+    Returns:
+        tuple: (DataFrame de estações indexado por CODIGO, DataFrame longo com os dados)
+    """
+    estacoes, dfs = [], []
+    interpretar = partial(_interpretar_inmet, variaveis=tuple(variaveis), regioes=regioes, estados=estados)
+    for arquivo, resultado, erro in processar_em_pipeline(arquivos_inmet(pasta_dados), interpretar, workers):
+        if erro is not None:
+            logger.error(f"Erro ao carregar arquivo {arquivo}: {str(erro)}")
+        elif resultado is not None:
+            metadados, df = resultado
+            dfs.append(df)
+            estacoes.append({**metadados, 'ARQUIVO': arquivo.name})
+
+    if not dfs:
+        logger.warning(f"Nenhum arquivo do INMET encontrado em {pasta_dados}")
+        return None, None
+
+    # O INMET publica um arquivo por estação e ano: manter um registro por estação
+    df_estacoes = pd.DataFrame(estacoes).drop_duplicates('CODIGO').set_index('CODIGO')
+    df_dados = pd.concat(dfs, ignore_index=True)
+    df_dados['CODIGO'] = df_dados['CODIGO'].astype('category')
+    logger.info(f"Carregados {len(df_dados)} registros de {len(df_estacoes)} estações do INMET")
+    return df_estacoes, df_dados
+
+@medir_etapa
+def consolidar_inmet(pasta_saida, pasta_inmet=PASTA_INMET, workers=1):
+    """
+    Gera os arquivos consolidados por UF e ano (formato de ``data/raw``) a partir
+    dos arquivos do INMET, uma UF por vez. A leitura e a interpretação dos
+    arquivos da UF seguinte correm enquanto a atual é gravada.
+
+    Args:
+        pasta_saida (Path): Pasta onde gravar os arquivos ``INMET_<REGIAO>_UF_<UF>_<ANO>.CSV``
+        pasta_inmet (Path): Pasta com os arquivos ``INMET_*.CSV`` de cada estação
+        workers (int): Processos de interpretação (ver ``processar_em_pipeline``)
+
+    Returns:
+        list: Caminhos dos arquivos gravados
+    """
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+
+    grupos = {}
+    for arquivo in arquivos_inmet(pasta_inmet):
+        metadados = ler_cabecalho_inmet(arquivo)
+        grupos.setdefault((metadados['REGIAO'], metadados['ESTADO']), []).append(arquivo)
+    ordem = [arquivo for arquivos in grupos.values() for arquivo in arquivos]
+    grupo_de = {arquivo: grupo for grupo, arquivos in grupos.items() for arquivo in arquivos}
+
+    gravados = []
+
+    def gravar_uf(sigla, estado, dfs):
+        df = pd.concat(dfs, ignore_index=True)
+        df = df.dropna(subset=['TEMPERATURA']).sort_values('DATA', kind='stable')
+        for ano, parte in df.groupby(df['DATA'].dt.year):
+            caminho = pasta_saida / f'INMET_{SIGLAS_REGIOES[sigla]}_UF_{estado}_{ano}.CSV'
+            parte[['DATA', 'TEMPERATURA', 'CODIGO']].to_csv(
+                caminho, sep=';', index=False, date_format='%Y-%m-%d %H:%M'
+            )
+            gravados.append(caminho)
+
+    interpretar = partial(_interpretar_inmet, variaveis=('TEMPERATURA',))
+    atual, dfs = None, []
+    for arquivo, resultado, erro in processar_em_pipeline(ordem, interpretar, workers):
+        if grupo_de[arquivo] != atual:
+            if dfs:
+                gravar_uf(*atual, dfs)
+            atual, dfs = grupo_de[arquivo], []
+        if erro is not None:
+            logger.error(f"Erro ao carregar arquivo {arquivo}: {str(erro)}")
+        else:
+            dfs.append(resultado[1])
+    if dfs:
+        gravar_uf(*atual, dfs)
+
+    logger.info(f"{len(gravados)} arquivos consolidados gravados em {pasta_saida}")
+    return gravados
+
 def adicionar_colunas_tempo(df):
     """Adiciona colunas de hora e dia da semana ao DataFrame"""
     try:
@@ -77,6 +438,7 @@ def adicionar_colunas_tempo(df):
         logger.error(f"Erro ao adicionar colunas de tempo: {str(e)}")
         return df
 
+@medir_etapa
 def preparar_dados(df):
     """Prepara os dados para análise"""
     if df is None:
@@ -84,10 +446,11 @@ def preparar_dados(df):
         
     try:
         # Seleciona colunas relevantes
-        df = df[['DATA', 'TEMPERATURA', 'REGIAO', 'ESTADO']]
+        colunas = ['DATA', 'TEMPERATURA', 'REGIAO', 'ESTADO']
+        df = df[colunas + (['ANOMALIA'] if 'ANOMALIA' in df.columns else [])]
         
         # Remove valores ausentes
-        df = df.dropna()
+        df = df.dropna(subset=colunas)
         
         # Ordena por data
         df = df.sort_values('DATA')
@@ -98,18 +461,93 @@ def preparar_dados(df):
         logger.error(f"Erro ao preparar dados: {str(e)}")
         return None
 
-def carregar_todas_regioes():
+@medir_etapa
+def carregar_dados_estado_capital(regiao, estado, pasta_dados=None, anomalia=False):
+    """
+    Carrega e combina dados do estado e sua capital.
+
+    Com ``anomalia=True``, inclui a coluna ANOMALIA precomputada (ver climatologia.py).
+    """
+    try:
+        arquivo_estado, arquivo_capital = arquivos_estado_capital(regiao, estado, pasta_dados)
+        
+        # Carregar dados do estado
+        if arquivo_estado.exists():
+            df_estado = pd.read_csv(arquivo_estado, sep=';')
+            df_estado['TIPO'] = 'ESTADO'
+            df_estado['DATA'] = pd.to_datetime(df_estado['DATA'])
+            if anomalia:
+                df_estado = anexar_anomalias(df_estado, arquivo_estado)
+            df_estado = adicionar_colunas_tempo(df_estado)
+        else:
+            logger.warning(f"Arquivo não encontrado para o estado {estado}")
+            return None
+            
+        # Carregar dados da capital
+        if arquivo_capital.exists():
+            df_capital = pd.read_csv(arquivo_capital, sep=';')
+            df_capital['TIPO'] = 'CAPITAL'
+            df_capital['DATA'] = pd.to_datetime(df_capital['DATA'])
+            if anomalia:
+                df_capital = anexar_anomalias(df_capital, arquivo_capital)
+            df_capital = adicionar_colunas_tempo(df_capital)
+        else:
+            logger.warning(f"Arquivo não encontrado para a capital de {estado}")
+            return None
+            
+        # Combinar dados
+        df_combinado = pd.concat([df_estado, df_capital], ignore_index=True)
+        return df_combinado
+        
+    except Exception as e:
+        logger.error(f"Erro ao carregar dados de {estado}: {str(e)}")
+        return None
+
+@medir_etapa
+def carregar_todas_regioes(pasta_dados=None, anomalia=False):
     """Carrega dados de todas as regiões"""
-    regioes = ['NORTE', 'NORDESTE', 'CENTRO-OESTE', 'SUDESTE', 'SUL']
     dados = {}
     
-    for regiao in regioes:
-        df = carregar_dados_regiao(regiao)
+    for regiao in REGIOES:
+        df = carregar_dados_regiao(regiao, pasta_dados, anomalia)
         if df is not None:
             dados[regiao] = preparar_dados(df)
     
     return dados
 
+@medir_etapa
+def filtrar_dados(df, inicio=None, fim=None, estacoes=None):
+    """
+    Restringe os dados a um período e a um conjunto de estações.
+
+    Args:
+        df (pd.DataFrame): Dados com a coluna DATA (e CODIGO, para filtrar estações)
+        inicio (str): Primeira data incluída (AAAA-MM-DD)
+        fim (str): Última data incluída (AAAA-MM-DD)
+        estacoes (list): Códigos das estações; ignorado se os dados não têm CODIGO
+
+    Returns:
+        pd.DataFrame: Dados filtrados, ou None se nada restar
+    """
+    if df is None:
+        return None
+
+    mascara = pd.Series(True, index=df.index)
+    if inicio:
+        mascara &= df['DATA'] >= pd.Timestamp(inicio)
+    if fim:
+        mascara &= df['DATA'] < pd.Timestamp(fim) + pd.Timedelta(days=1)
+    if estacoes:
+        if 'CODIGO' in df.columns:
+            mascara &= df['CODIGO'].isin(estacoes)
+        else:
+            logger.warning("Dados sem a coluna CODIGO; filtro de estações ignorado")
+
+    if mascara.all():
+        return df
+    df = df[mascara].reset_index(drop=True)
+    return df if len(df) else None
+
 def preparar_dados_temperatura(df: pd.DataFrame) -> pd.DataFrame:
     """
     Prepara os dados de temperatura para análise.
@@ -133,5 +571,92 @@ def calcular_estatisticas_basicas(df: pd.DataFrame) -> dict:
     Returns:
         dict: Dicionário com estatísticas calculadas
     """
-    # Implementar cálculos estatísticos
-    pass
+    temperatura = df['TEMPERATURA'].dropna()
+    if temperatura.empty:
+        return {'registros': 0}
+
+    diaria = temperatura.groupby(df.loc[temperatura.index, 'DATA'].dt.date).agg(['min', 'max'])
+    return {
+        'registros': int(len(temperatura)),
+        'inicio': str(df['DATA'].min()),
+        'fim': str(df['DATA'].max()),
+        'media': float(temperatura.mean()),
+        'mediana': float(temperatura.median()),
+        'desvio_padrao': float(temperatura.std()),
+        'minima': float(temperatura.min()),
+        'maxima': float(temperatura.max()),
+        'percentil_5': float(temperatura.quantile(0.05)),
+        'percentil_95': float(temperatura.quantile(0.95)),
+        'amplitude_diaria_media': float((diaria['max'] - diaria['min']).mean())
+    }
+
+def estatisticas_parciais(df):
+    """
+    Agregados parciais de uma partição dos dados (por exemplo, um arquivo),
+    combináveis com ``combinar_estatisticas``.
+
+    Guarda contagem, média e soma dos quadrados dos desvios (combinação de
+    Chan), a contagem de cada valor distinto (quantis exatos: as medições do
+    INMET têm uma casa decimal) e a mínima e a máxima de cada dia.
+
+    Returns:
+        dict: Agregados parciais, ou None se ``df`` for None
+    """
+    if df is None:
+        return None
+    temperatura = df['TEMPERATURA'].dropna()
+    media = float(temperatura.mean()) if len(temperatura) else 0.0
+    return {
+        'registros': int(len(temperatura)),
+        'inicio': df['DATA'].min(),
+        'fim': df['DATA'].max(),
+        'media': media,
+        'm2': float(((temperatura - media) ** 2).sum()),
+        'valores': temperatura.value_counts(),
+        'diaria': temperatura.groupby(df.loc[temperatura.index, 'DATA'].dt.date).agg(['min', 'max'])
+    }
+
+def _quantil_contagens(valores, contagens, q):
+    """Quantil com interpolação linear (como o pandas) a partir de valores ordenados e suas contagens"""
+    posicao = q * (contagens.sum() - 1)
+    acumulado = np.cumsum(contagens)
+    inferior = valores[np.searchsorted(acumulado, np.floor(posicao), side='right')]
+    superior = valores[np.searchsorted(acumulado, np.ceil(posicao), side='right')]
+    return float(inferior + (superior - inferior) * (posicao - np.floor(posicao)))
+
+def combinar_estatisticas(parciais):
+    """
+    Combina agregados de ``estatisticas_parciais`` nas estatísticas de
+    ``calcular_estatisticas_basicas`` para a união das partições.
+
+    Returns:
+        dict: Estatísticas combinadas, ou None se nenhuma partição tiver dados
+    """
+    parciais = [parcial for parcial in parciais if parcial is not None]
+    if not parciais:
+        return None
+    registros = sum(parcial['registros'] for parcial in parciais)
+    if registros == 0:
+        return {'registros': 0}
+    parciais = [parcial for parcial in parciais if parcial['registros']]
+
+    media = sum(parcial['registros'] * parcial['media'] for parcial in parciais) / registros
+    m2 = sum(parcial['m2'] + parcial['registros'] * (parcial['media'] - media) ** 2 for parcial in parciais)
+    contagens = pd.concat([parcial['valores'] for parcial in parciais]).groupby(level=0).sum().sort_index()
+    valores, contagens = contagens.index.to_numpy(dtype=float), contagens.to_numpy()
+    diaria = pd.concat([parcial['diaria'] for parcial in parciais]).groupby(level=0).agg(
+        {'min': 'min', 'max': 'max'}
+    )
+    return {
+        'registros': int(registros),
+        'inicio': str(min(parcial['inicio'] for parcial in parciais)),
+        'fim': str(max(parcial['fim'] for parcial in parciais)),
+        'media': float(media),
+        'mediana': _quantil_contagens(valores, contagens, 0.5),
+        'desvio_padrao': float(np.sqrt(m2 / (registros - 1))) if registros > 1 else float('nan'),
+        'minima': float(valores[0]),
+        'maxima': float(valores[-1]),
+        'percentil_5': _quantil_contagens(valores, contagens, 0.05),
+        'percentil_95': _quantil_contagens(valores, contagens, 0.95),
+        'amplitude_diaria_media': float((diaria['max'] - diaria['min']).mean())
+    }
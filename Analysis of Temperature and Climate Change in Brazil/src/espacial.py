@@ -0,0 +1,300 @@
+"""
+Índice espacial das estações do INMET e interpolação em grade.
+
+As coordenadas dos cabeçalhos das estações são convertidas em vetores unitários
+3D, de modo que a distância euclidiana (corda) preserva a ordem das distâncias
+sobre a esfera; o índice usa a ``cKDTree`` do scipy quando disponível e uma busca
+vetorizada com numpy caso contrário. A interpolação por inverso da distância
+(IDW) calcula os vizinhos de cada ponto da grade uma única vez e reaproveita os
+pesos para todos os horários pedidos, em lote.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import PASTA_INMET, carregar_estacoes_inmet
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+logger = logging.getLogger(__name__)
+
+RAIO_TERRA_KM = 6371.0
+
+# Extensão aproximada do território brasileiro (longitude, latitude)
+EXTENSAO_BRASIL = (-74.5, -34.0, -34.5, 6.0)
+
+# Vizinhos, raio máximo e potência padrão da interpolação IDW
+VIZINHOS_IDW = 8
+RAIO_IDW_KM = 400.0
+POTENCIA_IDW = 2.0
+
+# Pontos de grade x horários processados de uma vez (limita a memória do lote)
+BLOCO_INTERPOLACAO = 4_000_000
+
+def _vetores_unitarios(latitudes, longitudes):
+    """Converte coordenadas em graus para vetores unitários 3D"""
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _corda_para_km(corda):
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.clip(corda / 2, 0, 1))
+
+def _km_para_corda(km):
+    return 2 * np.sin(np.asarray(km, dtype=float) / (2 * RAIO_TERRA_KM))
+
+def montar_matriz_horaria(estacoes, df, coluna='TEMPERATURA'):
+    """
+    Organiza os dados longos em uma matriz horária (horas x estações).
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO, com LATITUDE e LONGITUDE
+        df (pd.DataFrame): Dados com DATA, CODIGO e ``coluna``
+        coluna (str): Variável a organizar
+
+    Returns:
+        tuple: (horários, estações com coordenadas válidas, matriz float32 com NaN nas lacunas)
+    """
+    estacoes = estacoes.dropna(subset=['LATITUDE', 'LONGITUDE'])
+    df = df[df['CODIGO'].isin(estacoes.index)].dropna(subset=[coluna])
+
+    inicio = df['DATA'].min().floor('h')
+    horarios = pd.date_range(inicio, df['DATA'].max().floor('h'), freq='h')
+    linhas = ((df['DATA'] - inicio) // pd.Timedelta(hours=1)).to_numpy()
+    colunas = estacoes.index.get_indexer(df['CODIGO'].astype(str))
+
+    matriz = np.full((len(horarios), len(estacoes)), np.nan, dtype=np.float32)
+    matriz[linhas, colunas] = df[coluna].to_numpy(dtype=np.float32)
+    return horarios, estacoes, matriz
+
+class IndiceEstacoes:
+    """
+    Índice espacial das estações para consultas de vizinhos mais próximos e por raio.
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO, com LATITUDE e LONGITUDE;
+            estações sem coordenadas são ignoradas
+    """
+    def __init__(self, estacoes):
+        self.estacoes = estacoes.dropna(subset=['LATITUDE', 'LONGITUDE'])
+        self.codigos = self.estacoes.index.to_numpy()
+        self._pontos = _vetores_unitarios(self.estacoes['LATITUDE'], self.estacoes['LONGITUDE'])
+        self._arvore = cKDTree(self._pontos) if cKDTree is not None else None
+        if self._arvore is None:
+            logger.info("scipy não está instalado; índice espacial por busca exaustiva (numpy)")
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def _distancias(self, consultas):
+        """Distâncias (corda) entre cada consulta e todas as estações, sem árvore"""
+        produto = np.clip(consultas @ self._pontos.T, -1, 1)
+        return np.sqrt(2 - 2 * produto)
+
+    def vizinhos(self, latitudes, longitudes, k=VIZINHOS_IDW, raio_km=None):
+        """
+        As ``k`` estações mais próximas de cada ponto.
+
+        Args:
+            latitudes, longitudes (array): Coordenadas dos pontos de consulta
+            k (int): Número de vizinhos
+            raio_km (float): Distância máxima; vizinhos além dela ficam de fora
+
+        Returns:
+            tuple: (distâncias em km, posições das estações), arrays (pontos, k);
+            vizinhos ausentes têm distância ``inf`` e posição ``len(self)``
+        """
+        consultas = _vetores_unitarios(np.atleast_1d(latitudes), np.atleast_1d(longitudes))
+        k = min(k, len(self))
+        limite = _km_para_corda(raio_km) if raio_km is not None else np.inf
+
+        if self._arvore is not None:
+            cordas, posicoes = self._arvore.query(consultas, k=k, distance_upper_bound=limite)
+            cordas, posicoes = cordas.reshape(len(consultas), k), posicoes.reshape(len(consultas), k)
+        else:
+            distancias = self._distancias(consultas)
+            posicoes = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+            cordas = np.take_along_axis(distancias, posicoes, axis=1)
+            ordem = np.argsort(cordas, axis=1)
+            cordas = np.take_along_axis(cordas, ordem, axis=1)
+            posicoes = np.take_along_axis(posicoes, ordem, axis=1)
+            fora = cordas > limite
+            cordas[fora], posicoes[fora] = np.inf, len(self)
+
+        return _corda_para_km(cordas), posicoes
+
+    def mais_proximas(self, latitude, longitude, k=5):
+        """Tabela das ``k`` estações mais próximas de um ponto, com a distância em km"""
+        distancias, posicoes = self.vizinhos(latitude, longitude, k)
+        validas = posicoes[0] < len(self)
+        resultado = self.estacoes.iloc[posicoes[0][validas]].copy()
+        resultado['DISTANCIA_KM'] = distancias[0][validas]
+        return resultado
+
+    def no_raio(self, latitude, longitude, raio_km):
+        """Estações a até ``raio_km`` de um ponto, ordenadas pela distância"""
+        consulta = _vetores_unitarios([latitude], [longitude])
+        if self._arvore is not None:
+            posicoes = np.array(self._arvore.query_ball_point(consulta[0], _km_para_corda(raio_km)), dtype=int)
+        else:
+            posicoes = np.flatnonzero(self._distancias(consulta)[0] <= _km_para_corda(raio_km))
+        distancias = _corda_para_km(np.sqrt(np.sum((self._pontos[posicoes] - consulta) ** 2, axis=1)))
+        ordem = np.argsort(distancias)
+        resultado = self.estacoes.iloc[posicoes[ordem]].copy()
+        resultado['DISTANCIA_KM'] = distancias[ordem]
+        return resultado
+
+def grade_nacional(resolucao=0.25, extensao=EXTENSAO_BRASIL):
+    """
+    Grade regular de latitude e longitude cobrindo o Brasil.
+
+    Returns:
+        tuple: (latitudes, longitudes) em graus, vetores 1D do sul para o norte e do oeste para o leste
+    """
+    oeste, leste, sul, norte = extensao
+    return np.arange(sul, norte + resolucao / 2, resolucao), np.arange(oeste, leste + resolucao / 2, resolucao)
+
+def interpolar_idw(indice, valores, latitudes, longitudes, k=VIZINHOS_IDW,
+                   raio_km=RAIO_IDW_KM, potencia=POTENCIA_IDW):
+    """
+    Interpola valores das estações em uma grade pelo inverso da distância.
+
+    Os vizinhos e os pesos de cada ponto da grade são calculados uma única vez;
+    cada linha de ``valores`` (um horário ou um agregado) reaproveita-os. Estações
+    sem valor em um horário (NaN) são descartadas e os pesos restantes
+    renormalizados; pontos sem nenhum vizinho válido no raio ficam NaN.
+
+    Args:
+        indice (IndiceEstacoes): Índice das estações (colunas de ``valores``)
+        valores (array): (horários, estações) ou (estações,)
+        latitudes, longitudes (array): Eixos da grade (ver ``grade_nacional``)
+        k (int): Vizinhos considerados por ponto
+        raio_km (float): Distância máxima dos vizinhos
+        potencia (float): Expoente do inverso da distância
+
+    Returns:
+        np.ndarray: (horários, latitudes, longitudes), ou (latitudes, longitudes) para um único vetor
+    """
+    valores = np.asarray(valores, dtype=np.float32)
+    unico = valores.ndim == 1
+    valores = np.atleast_2d(valores)
+
+    malha_lat, malha_lon = np.meshgrid(latitudes, longitudes, indexing='ij')
+    distancias, posicoes = indice.vizinhos(malha_lat.ravel(), malha_lon.ravel(), k, raio_km)
+    pesos = (1.0 / np.maximum(distancias, 1e-3) ** potencia).astype(np.float32)
+    pesos[posicoes == len(indice)] = 0
+
+    # Coluna extra de NaN para os vizinhos ausentes (posição ``len(indice)``)
+    valores = np.concatenate([valores, np.full((len(valores), 1), np.nan, np.float32)], axis=1)
+    pontos = len(pesos)
+    grade = np.empty((len(valores), pontos), dtype=np.float32)
+
+    passo = max(1, BLOCO_INTERPOLACAO // max(1, pontos * pesos.shape[1]))
+    for inicio in range(0, len(valores), passo):
+        vizinhos = valores[inicio:inicio + passo][:, posicoes]
+        validos = ~np.isnan(vizinhos)
+        pesos_validos = np.where(validos, pesos, 0)
+        soma_pesos = pesos_validos.sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            grade[inicio:inicio + passo] = (
+                np.where(validos, vizinhos, 0) * pesos_validos
+            ).sum(axis=2) / soma_pesos
+
+    grade = grade.reshape(len(valores), len(latitudes), len(longitudes))
+    return grade[0] if unico else grade
+
+def interpolar_horarios(estacoes, df, horarios=None, coluna='TEMPERATURA', resolucao=0.25, **opcoes):
+    """
+    Grades nacionais de uma variável para vários horários, em um único lote.
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO (ver ``carregar_estacoes_inmet``)
+        df (pd.DataFrame): Dados longos com DATA, CODIGO e ``coluna``
+        horarios (list): Horários desejados; None para todos
+        coluna (str): Variável a interpolar
+        resolucao (float): Espaçamento da grade, em graus
+        **opcoes: Repassadas a ``interpolar_idw``
+
+    Returns:
+        tuple: (horários, latitudes, longitudes, grades (horários, latitudes, longitudes), estações)
+    """
+    todos, estacoes, matriz = montar_matriz_horaria(estacoes, df, coluna)
+    if horarios is not None:
+        horarios = pd.DatetimeIndex(horarios)
+        linhas = todos.get_indexer(horarios)
+        encontrados = linhas >= 0
+        if not encontrados.all():
+            logger.warning(f"{(~encontrados).sum()} horários sem dados ignorados")
+        todos, matriz = horarios[encontrados], matriz[linhas[encontrados]]
+
+    latitudes, longitudes = grade_nacional(resolucao)
+    grades = interpolar_idw(IndiceEstacoes(estacoes), matriz, latitudes, longitudes, **opcoes)
+    return todos, latitudes, longitudes, grades, estacoes
+
+def interpolar_agregado(estacoes, df, coluna='TEMPERATURA', medida='mean', resolucao=0.25, **opcoes):
+    """Grade nacional de um agregado por estação (média do período, por exemplo)"""
+    por_estacao = df.groupby(df['CODIGO'].astype(str))[coluna].agg(medida)
+    estacoes = estacoes.dropna(subset=['LATITUDE', 'LONGITUDE'])
+    estacoes = estacoes[estacoes.index.isin(por_estacao.index)]
+    latitudes, longitudes = grade_nacional(resolucao)
+    grade = interpolar_idw(
+        IndiceEstacoes(estacoes), por_estacao.reindex(estacoes.index).to_numpy(),
+        latitudes, longitudes, **opcoes
+    )
+    return latitudes, longitudes, grade, estacoes
+
+def main():
+    parser = argparse.ArgumentParser(description='Mapas interpolados (IDW) da temperatura nas estações do INMET')
+    parser.add_argument('--dados', type=Path, default=PASTA_INMET, help='Pasta com os arquivos INMET_*.CSV')
+    parser.add_argument('--saida', type=Path, default=Path(__file__).resolve().parents[1] / 'reports' / 'mapas')
+    parser.add_argument('--regiao', nargs='*', help='Siglas de região do INMET (N, NE, CO, SE, S)')
+    parser.add_argument('--uf', nargs='*', help='Siglas de UF')
+    parser.add_argument('--inicio', help='Primeira data (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='Última data (AAAA-MM-DD, inclusiva)')
+    parser.add_argument('--horarios', nargs='*',
+                        help='Horários UTC a mapear (AAAA-MM-DDTHH); sem eles, um mapa da média do período')
+    parser.add_argument('--resolucao', type=float, default=0.25, help='Espaçamento da grade, em graus')
+    parser.add_argument('--vizinhos', type=int, default=VIZINHOS_IDW)
+    parser.add_argument('--raio', type=float, default=RAIO_IDW_KM, help='Raio máximo dos vizinhos, em km')
+    args = parser.parse_args()
+
+    from visualization import plot_mapa_interpolado
+
+    estacoes, df = carregar_estacoes_inmet(args.dados, regioes=args.regiao, estados=args.uf)
+    if df is None:
+        return
+    if args.inicio:
+        df = df[df['DATA'] >= pd.Timestamp(args.inicio)]
+    if args.fim:
+        df = df[df['DATA'] < pd.Timestamp(args.fim) + pd.Timedelta(days=1)]
+
+    args.saida.mkdir(parents=True, exist_ok=True)
+    opcoes = {'k': args.vizinhos, 'raio_km': args.raio}
+    if args.horarios:
+        horarios, latitudes, longitudes, grades, validas = interpolar_horarios(
+            estacoes, df, args.horarios, resolucao=args.resolucao, **opcoes
+        )
+        for horario, grade in zip(horarios, grades):
+            plot_mapa_interpolado(
+                grade, latitudes, longitudes, validas, args.saida,
+                f'mapa_temperatura_{horario:%Y%m%d_%H}.png', f'Temperatura em {horario:%d/%m/%Y %H}h UTC'
+            )
+    else:
+        latitudes, longitudes, grade, validas = interpolar_agregado(
+            estacoes, df, resolucao=args.resolucao, **opcoes
+        )
+        plot_mapa_interpolado(
+            grade, latitudes, longitudes, validas, args.saida,
+            'mapa_temperatura_media.png', 'Temperatura média do período'
+        )
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,358 @@
+"""
+Backends de execução das tarefas do pipeline.
+
+``BackendLocal`` distribui as tarefas em processos desta máquina.
+``BackendFila`` usa uma fila de trabalho em arquivos numa pasta compartilhada
+(por exemplo, um NFS montado em todos os nós): o coordenador grava cada
+tarefa em ``pendentes/``, trabalhadores em qualquer nó a reservam com um
+``rename`` atômico para ``em_execucao/`` e gravam o resultado em
+``resultados/``. Na mesma máquina, o backend pode iniciar os próprios
+trabalhadores, o que permite testar a configuração sem um cluster.
+
+Nos dois backends, tarefas com erro são refeitas até ``tentativas`` vezes; na
+fila, uma reserva sem sinal de vida do trabalhador por mais de ``prazo``
+segundos (nó que caiu) também volta para ``pendentes/``.
+
+Trabalhador em um nó (com ``src`` do projeto disponível)::
+
+    python src/execucao.py --fila /compartilhado/fila
+"""
+
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('local', 'fila')
+
+# Execuções de uma tarefa antes de considerá-la falha
+TENTATIVAS = 3
+
+# Segundos sem sinal de vida após os quais uma reserva é devolvida à fila
+PRAZO_RESERVA = 600
+
+# Intervalo de consulta à fila, em segundos
+INTERVALO_FILA = 0.2
+
+class BackendLocal:
+    """
+    Executa as tarefas em ``workers`` processos locais (ou neste processo,
+    com um worker ou uma única tarefa).
+    """
+    def __init__(self, workers=1, tentativas=TENTATIVAS):
+        self.workers = workers
+        self.tentativas = tentativas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def mapear(self, funcao, argumentos):
+        """
+        Aplica ``funcao(*args)`` a cada item de ``argumentos``.
+
+        Yields:
+            tuple: (índice, resultado, erro), na ordem em que as tarefas terminam;
+            ``erro`` só é preenchido depois de esgotadas as tentativas
+        """
+        argumentos = list(argumentos)
+        if self.workers <= 1 or len(argumentos) <= 1:
+            for indice, args in enumerate(argumentos):
+                for tentativa in range(1, self.tentativas + 1):
+                    try:
+                        resultado = funcao(*args)
+                    except Exception as e:
+                        erro = e
+                        logger.warning(f"Tarefa {indice} falhou (tentativa {tentativa}): {str(e)}")
+                    else:
+                        erro = None
+                        break
+                yield indice, (None if erro else resultado), erro
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(argumentos))) as executor:
+            tentativas = {}
+            futuros = {executor.submit(funcao, *args): indice for indice, args in enumerate(argumentos)}
+            while futuros:
+                futuro = next(as_completed(futuros))
+                indice = futuros.pop(futuro)
+                try:
+                    yield indice, futuro.result(), None
+                except Exception as e:
+                    tentativas[indice] = tentativas.get(indice, 1)
+                    logger.warning(f"Tarefa {indice} falhou (tentativa {tentativas[indice]}): {str(e)}")
+                    if tentativas[indice] >= self.tentativas:
+                        yield indice, None, e
+                    else:
+                        tentativas[indice] += 1
+                        futuros[executor.submit(funcao, *argumentos[indice])] = indice
+
+class BackendFila:
+    """
+    Executa as tarefas por uma fila de trabalho em arquivos na pasta compartilhada ``pasta``.
+
+    Args:
+        pasta (Path): Pasta da fila, visível ao coordenador e a todos os trabalhadores
+        workers (int): Trabalhadores iniciados nesta máquina (0: apenas nós externos)
+        tentativas (int): Execuções de uma tarefa antes de considerá-la falha
+        prazo (float): Segundos sem sinal de vida para devolver uma reserva à fila
+    """
+    def __init__(self, pasta, workers=0, tentativas=TENTATIVAS, prazo=PRAZO_RESERVA):
+        self.pasta = Path(pasta)
+        self.workers = workers
+        self.tentativas = tentativas
+        self.prazo = prazo
+        self._processos = []
+        for subpasta in ('pendentes', 'em_execucao', 'resultados'):
+            (self.pasta / subpasta).mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        for numero in range(self.workers):
+            processo = multiprocessing.Process(
+                target=trabalhar, args=(self.pasta,), kwargs={'prazo': self.prazo},
+                name=f'trabalhador-{numero}', daemon=True
+            )
+            processo.start()
+            self._processos.append(processo)
+        return self
+
+    def __exit__(self, *exc):
+        for processo in self._processos:
+            processo.terminate()
+        for processo in self._processos:
+            processo.join()
+        self._processos = []
+        return False
+
+    def _enfileirar(self, identificador, funcao, args, tentativa):
+        tarefa = {
+            'funcao': (funcao.__module__, funcao.__qualname__),
+            'argumentos': args,
+            'tentativa': tentativa
+        }
+        _gravar_atomico(self.pasta / 'pendentes' / f'{identificador}.pkl', tarefa)
+
+    def _recuperar_reservas(self, tarefas):
+        """Devolve à fila as reservas deste lote sem sinal de vida há mais de ``prazo``"""
+        agora = time.time()
+        for reserva in (self.pasta / 'em_execucao').glob('*.pkl.*'):
+            identificador = reserva.name.split('.pkl.')[0]
+            if identificador not in tarefas:
+                continue
+            try:
+                if agora - reserva.stat().st_mtime <= self.prazo:
+                    continue
+                os.rename(reserva, self.pasta / 'pendentes' / f'{identificador}.pkl')
+            except FileNotFoundError:
+                continue
+            logger.warning(f"Reserva de {identificador} expirada ({reserva.name.split('.pkl.')[1]}); tarefa devolvida à fila")
+
+    def mapear(self, funcao, argumentos):
+        """
+        Enfileira ``funcao(*args)`` para cada item de ``argumentos`` e aguarda os resultados.
+
+        Yields:
+            tuple: (índice, resultado, erro), na ordem em que as tarefas terminam;
+            ``erro`` só é preenchido depois de esgotadas as tentativas
+        """
+        lote = uuid.uuid4().hex[:12]
+        tarefas = {}
+        for indice, args in enumerate(argumentos):
+            identificador = f'{lote}_{indice:05d}'
+            tarefas[identificador] = (indice, args, 1)
+            self._enfileirar(identificador, funcao, args, 1)
+        logger.info(f"{len(tarefas)} tarefas enfileiradas em {self.pasta} (lote {lote})")
+
+        ultima_verificacao = time.time()
+        while tarefas:
+            concluidas = [
+                caminho for caminho in (self.pasta / 'resultados').glob(f'{lote}_*.pkl')
+                if caminho.stem in tarefas
+            ]
+            for caminho in concluidas:
+                with open(caminho, 'rb') as arquivo:
+                    resposta = pickle.load(arquivo)
+                caminho.unlink()
+                indice, args, tentativa = tarefas.pop(caminho.stem)
+                if resposta['erro'] is None:
+                    yield indice, resposta['resultado'], None
+                    continue
+                logger.warning(
+                    f"Tarefa {indice} falhou em {resposta['trabalhador']} (tentativa {tentativa}): "
+                    f"{resposta['erro']}"
+                )
+                if tentativa >= self.tentativas:
+                    yield indice, None, RuntimeError(resposta['detalhes'])
+                else:
+                    tarefas[caminho.stem] = (indice, args, tentativa + 1)
+                    self._enfileirar(caminho.stem, funcao, args, tentativa + 1)
+
+            if not concluidas:
+                if time.time() - ultima_verificacao > self.prazo / 4:
+                    self._recuperar_reservas(tarefas)
+                    ultima_verificacao = time.time()
+                time.sleep(INTERVALO_FILA)
+
+        # Resultados duplicados de reservas expiradas cujo trabalhador ainda concluiu a tarefa
+        for restante in (self.pasta / 'resultados').glob(f'{lote}_*.pkl'):
+            restante.unlink(missing_ok=True)
+
+def _gravar_atomico(caminho, conteudo):
+    """Grava um pickle em arquivo temporário e o renomeia: leitores nunca veem arquivos parciais"""
+    temporario = caminho.with_name(f'.{caminho.name}.{uuid.uuid4().hex[:8]}')
+    with open(temporario, 'wb') as arquivo:
+        pickle.dump(conteudo, arquivo)
+    os.replace(temporario, caminho)
+
+def _resolver(modulo, nome):
+    objeto = importlib.import_module(modulo)
+    for parte in nome.split('.'):
+        objeto = getattr(objeto, parte)
+    return objeto
+
+def _sinalizar(reserva, parar, intervalo):
+    """Atualiza a data da reserva enquanto a tarefa executa (sinal de vida do trabalhador)"""
+    while not parar.wait(intervalo):
+        try:
+            os.utime(reserva)
+        except FileNotFoundError:
+            return
+
+def trabalhar(pasta, ocioso=None, prazo=PRAZO_RESERVA):
+    """
+    Laço de um trabalhador: reserva tarefas de ``pasta`` e grava os resultados.
+
+    Args:
+        pasta (Path): Pasta da fila
+        ocioso (float): Segundos sem tarefas após os quais o trabalhador termina (None: nunca)
+        prazo (float): Prazo de reserva do coordenador; o sinal de vida é enviado a cada prazo/4
+
+    Returns:
+        int: Tarefas executadas
+    """
+    pasta = Path(pasta)
+    trabalhador = f'{socket.gethostname()}-{os.getpid()}'
+    executadas = 0
+    desde = time.time()
+
+    while ocioso is None or time.time() - desde < ocioso:
+        reservada = None
+        for pendente in sorted((pasta / 'pendentes').glob('*.pkl')):
+            reserva = pasta / 'em_execucao' / f'{pendente.name}.{trabalhador}'
+            try:
+                os.rename(pendente, reserva)
+                # O rename preserva a data do enfileiramento: o prazo conta a partir da reserva
+                os.utime(reserva)
+            except FileNotFoundError:
+                continue
+            reservada = pendente.stem, reserva
+            break
+        if reservada is None:
+            time.sleep(INTERVALO_FILA)
+            continue
+
+        identificador, reserva = reservada
+        parar = threading.Event()
+        threading.Thread(target=_sinalizar, args=(reserva, parar, prazo / 4), daemon=True).start()
+        resposta = {'trabalhador': trabalhador, 'resultado': None, 'erro': None, 'detalhes': None}
+        try:
+            with open(reserva, 'rb') as arquivo:
+                tarefa = pickle.load(arquivo)
+            resposta['resultado'] = _resolver(*tarefa['funcao'])(*tarefa['argumentos'])
+        except Exception as e:
+            resposta['erro'] = str(e)
+            resposta['detalhes'] = traceback.format_exc()
+        finally:
+            parar.set()
+        _gravar_atomico(pasta / 'resultados' / f'{identificador}.pkl', resposta)
+        reserva.unlink(missing_ok=True)
+        executadas += 1
+        desde = time.time()
+    return executadas
+
+def criar_backend(nome='local', workers=1, pasta_fila=None, tentativas=TENTATIVAS):
+    """
+    Cria um backend de execução.
+
+    Args:
+        nome (str): 'local' ou 'fila'
+        workers (int): Processos locais (no backend de fila, trabalhadores iniciados nesta máquina)
+        pasta_fila (Path): Pasta compartilhada da fila (backend 'fila')
+        tentativas (int): Execuções de uma tarefa antes de considerá-la falha
+    """
+    if nome == 'local':
+        return BackendLocal(workers, tentativas)
+    if nome == 'fila':
+        if pasta_fila is None:
+            raise ValueError("O backend 'fila' requer a pasta compartilhada da fila")
+        return BackendFila(pasta_fila, workers, tentativas)
+    raise ValueError(f"Backend desconhecido: {nome}")
+
+def mapear_reduzir(backend, mapa, particoes, reduzir):
+    """
+    Aplica ``mapa`` às partições no backend e reduz os parciais de cada grupo.
+
+    Args:
+        backend: ``BackendLocal`` ou ``BackendFila``
+        mapa (callable): Função de nível de módulo que calcula o parcial de uma partição
+        particoes (dict): {grupo: [argumentos de ``mapa`` de cada partição]}; partições
+            repetidas em vários grupos são calculadas uma única vez
+        reduzir (callable): Combina a lista de parciais de um grupo no resultado
+
+    Returns:
+        dict: {grupo: resultado}; grupos com alguma partição falha ficam de fora
+    """
+    unicas = {}
+    for lista in particoes.values():
+        for args in lista:
+            unicas.setdefault(pickle.dumps(args), args)
+    chaves = list(unicas)
+
+    parciais, falhas = {}, set()
+    for indice, resultado, erro in backend.mapear(mapa, list(unicas.values())):
+        if erro is not None:
+            logger.error(f"Partição {unicas[chaves[indice]]} falhou: {str(erro)}")
+            falhas.add(chaves[indice])
+        else:
+            parciais[chaves[indice]] = resultado
+
+    resultados = {}
+    for grupo, lista in particoes.items():
+        chaves_grupo = [pickle.dumps(args) for args in lista]
+        if falhas.intersection(chaves_grupo):
+            logger.error(f"Resultado de {grupo} descartado: partições com falha")
+            continue
+        resultados[grupo] = reduzir([parciais[chave] for chave in chaves_grupo])
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description='Trabalhador da fila de tarefas em pasta compartilhada')
+    parser.add_argument('--fila', type=Path, required=True, help='Pasta compartilhada da fila')
+    parser.add_argument('--ocioso', type=float,
+                        help='Termina após estes segundos sem tarefas (padrão: não termina)')
+    parser.add_argument('--prazo', type=float, default=PRAZO_RESERVA,
+                        help='Prazo de reserva usado pelo coordenador, em segundos')
+    args = parser.parse_args()
+
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    for subpasta in ('pendentes', 'em_execucao', 'resultados'):
+        (args.fila / subpasta).mkdir(parents=True, exist_ok=True)
+    executadas = trabalhar(args.fila, args.ocioso, args.prazo)
+    logger.info(f"{executadas} tarefas executadas")
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -1,137 +1,148 @@
+import argparse
+import json
 import logging
+import os
+import time
 from pathlib import Path
-from data_processing import carregar_dados_regiao
-from visualization import (
-    plot_distribuicao_temperatura, plot_serie_temporal,
-    plot_media_movel, plot_variacao_diaria, plot_heatmap_semanal,
-    plot_comparacao_regioes, plot_correlacao_temperatura_hora,
-    plot_extremos_temperatura, plot_comparacao_estados,
-    plot_mapa_calor_estados, plot_serie_temporal_estados,
-    plot_estatisticas_estados,
-    # Novas funções de visualização
-    plot_radar_estado_capital, plot_violino_estado_capital,
-    plot_ciclo_diario_estado_capital, plot_calor_horario_estado_capital,
-    plot_densidade_estado_capital, plot_boxen_estado_capital,
-    plot_regressao_estado_capital, plot_barras_estado_capital,
-    plot_area_estado_capital, plot_polar_estado_capital
-)
+from instrumentacao import PERFILADORES, configurar_instrumentacao, coletar_registros, gravar_relatorio
+from perfis_saida import PERFIS_SAIDA, definir_perfil_saida, obter_perfil_saida
+from data_processing import PASTA_RAW
+from registro_graficos import GRAFICOS, planejar, executar, estimar_custos, calcular_estatisticas
+from execucao import BACKENDS, TENTATIVAS, criar_backend
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-import pandas as pd
-
-def carregar_dados_estado_capital(regiao, estado):
-    """Carrega e combina dados do estado e sua capital"""
-    try:
-        pasta_dados = Path('data/raw')
-        
-        # Carregar dados do estado
-        arquivo_estado = pasta_dados / f'INMET_{regiao}_UF_{estado}_2024.CSV'
-        if arquivo_estado.exists():
-            df_estado = pd.read_csv(arquivo_estado, sep=';')
-            df_estado['TIPO'] = 'ESTADO'
-            df_estado['DATA'] = pd.to_datetime(df_estado['DATA'])
-            df_estado = adicionar_colunas_tempo(df_estado)
-        else:
-            logger.warning(f"Arquivo não encontrado para o estado {estado}")
-            return None
-            
-        # Carregar dados da capital
-        arquivo_capital = pasta_dados / f'INMET_{regiao}_UF_{estado}_CAPITAL_2024.CSV'
-        if arquivo_capital.exists():
-            df_capital = pd.read_csv(arquivo_capital, sep=';')
-            df_capital['TIPO'] = 'CAPITAL'
-            df_capital['DATA'] = pd.to_datetime(df_capital['DATA'])
-            df_capital = adicionar_colunas_tempo(df_capital)
+# Caminhos padrão relativos ao projeto, não ao diretório corrente
+PASTA_PROJETO = Path(__file__).resolve().parents[1]
+PASTA_REPORTS = PASTA_PROJETO / 'reports'
+
+def _lista(valor):
+    """Converte uma lista separada por vírgulas em lista de strings"""
+    return [item.strip() for item in valor.split(',') if item.strip()] if valor else None
+
+def _imprimir_plano(alvos, estimativa, workers):
+    """Imprime os alvos desatualizados agrupados em tarefas, com o custo estimado"""
+    print(f"{'conjunto':28} {'entidade':10} {'gráficos':>8} {'MB':>8} {'s estim.':>9}")
+    for tarefa in sorted(estimativa['tarefas'], key=lambda t: -t['segundos']):
+        print(
+            f"{tarefa['dados']:28} {tarefa['entidade']:10} {len(tarefa['graficos']):8d} "
+            f"{tarefa['mb_entrada']:8.1f} {tarefa['segundos']:9.1f}"
+        )
+    origem = 'execuções anteriores' if estimativa['historico'] else 'custos padrão, sem histórico'
+    print(
+        f"\n{sum(a['desatualizado'] for a in alvos)} de {len(alvos)} alvos desatualizados em "
+        f"{len(estimativa['tarefas'])} tarefas; estimativa por {origem}: "
+        f"{estimativa['segundos_total']:.0f} s sequencial, "
+        f"{estimativa['segundos_parede']:.0f} s com {workers} processos"
+    )
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gera as visualizações de temperatura')
+    parser.add_argument('--dados', type=Path, default=PASTA_RAW,
+                        help='Pasta com os arquivos consolidados (padrão: data/raw do projeto)')
+    parser.add_argument('--saida', type=Path, default=PASTA_REPORTS,
+                        help='Pasta dos gráficos gerados (padrão: reports do projeto)')
+    parser.add_argument('--cache', type=Path,
+                        help='Pasta de cache dos dados carregados e do estado dos alvos')
+    parser.add_argument('--somente', '--only', type=_lista,
+                        help='Gráficos do registro a gerar, separados por vírgula (ver --listar)')
+    parser.add_argument('--regiao', type=lambda v: [r.upper() for r in _lista(v)],
+                        help='Regiões a gerar, separadas por vírgula')
+    parser.add_argument('--uf', type=lambda v: [uf.upper() for uf in _lista(v)],
+                        help='UFs a gerar, separadas por vírgula')
+    parser.add_argument('--estacao', type=lambda v: [e.upper() for e in _lista(v)],
+                        help='Códigos de estação do INMET a considerar, separados por vírgula')
+    parser.add_argument('--inicio', help='Primeiro dia considerado (AAAA-MM-DD)')
+    parser.add_argument('--fim', help='Último dia considerado (AAAA-MM-DD)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processos usados para gerar os gráficos (no backend fila, '
+                             'trabalhadores iniciados nesta máquina; 0 para usar apenas outros nós)')
+    parser.add_argument('--backend', choices=BACKENDS, default='local',
+                        help='Execução das tarefas: processos locais ou fila em pasta compartilhada')
+    parser.add_argument('--fila', type=Path,
+                        help='Pasta compartilhada da fila (padrão: <saida>/execucao/fila)')
+    parser.add_argument('--tentativas', type=int, default=TENTATIVAS,
+                        help='Execuções de uma tarefa com erro antes de desistir')
+    parser.add_argument('--perfil', choices=PERFIS_SAIDA,
+                        help='Perfil de saída (padrão: variável PERFIL_SAIDA ou print)')
+    parser.add_argument('--anomalia', action='store_true',
+                        help='Gera os gráficos das anomalias precomputadas (ver climatologia.py)')
+    parser.add_argument('--forcar', action='store_true',
+                        help='Regera os gráficos selecionados mesmo se atualizados')
+    parser.add_argument('--simular', '--dry-run', action='store_true',
+                        help='Lista as tarefas planejadas com o custo estimado, sem gerar nada')
+    parser.add_argument('--somente-estatisticas', '--stats-only', action='store_true',
+                        help='Calcula as estatísticas básicas da seleção, sem gerar gráficos')
+    parser.add_argument('--listar', action='store_true',
+                        help='Lista os gráficos registrados e sai')
+    parser.add_argument('--perfilador', choices=PERFILADORES,
+                        help='Captura um perfil de cada etapa em <saida>/execucao/perfis')
+    args = parser.parse_args(argv)
+
+    # Execução em lote: backend sem interface gráfica, herdado pelos processos
+    # de trabalho, em vez da sondagem de backends interativos do matplotlib
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+
+    if args.listar:
+        for nome, spec in GRAFICOS.items():
+            print(f"{nome:22} {spec['agrupamento']:8} {spec['saida']}")
+        return
+
+    if args.perfil:
+        definir_perfil_saida(args.perfil)
+    perfil = obter_perfil_saida()
+
+    filtros = {
+        chave: valor for chave, valor in
+        (('inicio', args.inicio), ('fim', args.fim), ('estacoes', args.estacao)) if valor
+    } or None
+
+    reports_dir = args.saida
+    pasta_execucao = reports_dir / 'execucao'
+
+    if args.simular:
+        alvos = planejar(
+            reports_dir, perfil, args.dados, graficos=args.somente, regioes=args.regiao,
+            estados=args.uf, forcar=args.forcar, filtros=filtros, pasta_estado=args.cache,
+            anomalia=args.anomalia
+        )
+        _imprimir_plano(alvos, estimar_custos(alvos, pasta_execucao, args.workers), args.workers)
+        return
+
+    # Criar diretório de saída se não existir
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Diretório {reports_dir} criado/verificado com sucesso")
+
+    inicio = time.perf_counter()
+    configurar_instrumentacao(args.perfilador, pasta_execucao / 'perfis')
+    backend = criar_backend(
+        args.backend, args.workers, args.fila or pasta_execucao / 'fila', args.tentativas
+    )
+
+    with backend:
+        if args.somente_estatisticas:
+            estatisticas = calcular_estatisticas(
+                args.dados, regioes=args.regiao, estados=args.uf, filtros=filtros, backend=backend
+            )
+            caminho = reports_dir / 'estatisticas.json'
+            caminho.write_text(json.dumps(estatisticas, indent=2, ensure_ascii=False, default=str))
+            logger.info(f"Estatísticas salvas em {caminho}")
         else:
-            logger.warning(f"Arquivo não encontrado para a capital de {estado}")
-            return None
-            
-        # Combinar dados
-        df_combinado = pd.concat([df_estado, df_capital], ignore_index=True)
-        return df_combinado
-        
-    except Exception as e:
-        logger.error(f"Erro ao carregar dados de {estado}: {str(e)}")
-        return None
-
-def adicionar_colunas_tempo(df):
-    """Adiciona colunas de hora e dia da semana ao DataFrame"""
-    df['HORA'] = df['DATA'].dt.hour
-    df['DIA_SEMANA'] = df['DATA'].dt.day_name()
-    return df
-
-def main():
-    # Criar diretório reports se não existir
-    reports_dir = Path('reports')
-    reports_dir.mkdir(exist_ok=True)
-    logger.info("Diretório reports criado/verificado com sucesso")
-    
-    # Lista de regiões
-    regioes = ['NORTE', 'NORDESTE', 'CENTRO-OESTE', 'SUDESTE', 'SUL']
-    
-    # Carregar dados de todas as regiões
-    dados_regioes = {}
-    for regiao in regioes:
-        df = carregar_dados_regiao(regiao)
-        if df is not None:
-            dados_regioes[regiao] = df
-    
-    logger.info(f"Dados carregados para {len(dados_regioes)} regiões")
-    
-    # Gerar visualizações individuais por região
-    for regiao, df in dados_regioes.items():
-        logger.info(f"Gerando visualizações para {regiao}")
-        
-        # Visualizações básicas
-        plot_distribuicao_temperatura(df, regiao, reports_dir)
-        plot_serie_temporal(df, regiao, reports_dir)
-        plot_media_movel(df, regiao, reports_dir)
-        plot_variacao_diaria(df, regiao, reports_dir)
-        plot_heatmap_semanal(df, regiao, reports_dir)
-        plot_correlacao_temperatura_hora(df, regiao, reports_dir)
-        plot_extremos_temperatura(df, regiao, reports_dir)
-        
-        # Visualizações por estado
-        plot_serie_temporal_estados(df, regiao, reports_dir)
-    
-    # Gerar visualizações comparativas entre regiões e estados
-    if len(dados_regioes) > 1:
-        plot_comparacao_regioes(dados_regioes, reports_dir)
-        plot_comparacao_estados(dados_regioes, reports_dir)
-        plot_mapa_calor_estados(dados_regioes, reports_dir)
-        plot_estatisticas_estados(dados_regioes, reports_dir)
-
-    # Lista de regiões e estados
-    estados = {
-        'SUDESTE': ['SP', 'RJ'],
-        'SUL': ['PR', 'SC']
-    }
-    
-    # Gerar visualizações por estado e capital
-    for regiao, lista_estados in estados.items():
-        for estado in lista_estados:
-            logger.info(f"Gerando visualizações para {estado}")
-            
-            # Carregar dados combinados do estado e capital
-            df_combinado = carregar_dados_estado_capital(regiao, estado)
-            
-            if df_combinado is not None:
-                # Gerar as 10 novas visualizações
-                plot_radar_estado_capital(df_combinado, estado, reports_dir)
-                plot_violino_estado_capital(df_combinado, estado, reports_dir)
-                plot_ciclo_diario_estado_capital(df_combinado, estado, reports_dir)
-                plot_calor_horario_estado_capital(df_combinado, estado, reports_dir)
-                plot_densidade_estado_capital(df_combinado, estado, reports_dir)
-                plot_boxen_estado_capital(df_combinado, estado, reports_dir)
-                plot_regressao_estado_capital(df_combinado, estado, reports_dir)
-                plot_barras_estado_capital(df_combinado, estado, reports_dir)
-                plot_area_estado_capital(df_combinado, estado, reports_dir)
-                plot_polar_estado_capital(df_combinado, estado, reports_dir)
-            else:
-                logger.warning(f"Não foi possível gerar visualizações para {estado}")
+            alvos = planejar(
+                reports_dir, perfil, args.dados, graficos=args.somente, regioes=args.regiao,
+                estados=args.uf, forcar=args.forcar, filtros=filtros, pasta_estado=args.cache,
+                anomalia=args.anomalia
+            )
+            executar(
+                alvos, reports_dir, perfil, args.dados, workers=args.workers, filtros=filtros,
+                pasta_cache=args.cache, pasta_estado=args.cache, anomalia=args.anomalia,
+                backend=backend
+            )
+
+    # Relatório com tempo, memória, linhas e bytes de cada etapa
+    gravar_relatorio(pasta_execucao, coletar_registros(), time.perf_counter() - inicio)
 
 if __name__ == '__main__':
     main()
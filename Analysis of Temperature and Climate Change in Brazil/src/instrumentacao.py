@@ -0,0 +1,278 @@
+"""
+Instrumentação das etapas do pipeline de relatórios.
+
+Cada chamada de uma função decorada com ``medir_etapa`` (ou bloco envolvido por
+``etapa``) vira um registro com tempo de parede, tempo de CPU, aumento do pico
+de memória residente, linhas de entrada e de saída e bytes gravados. Ao final
+da execução os registros são gravados em JSON e resumidos em uma tabela
+ordenada pelo tempo gasto. Opcionalmente cada etapa de nível mais externo é
+perfilada com cProfile ou pyinstrument.
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PERFILADORES = ('cprofile', 'pyinstrument')
+
+# Registros concluídos e etapas em andamento (a última é a mais interna)
+_registros = []
+_pilha = []
+_config = {'perfilador': None, 'pasta_perfis': None}
+
+# Protege o encerramento das etapas e a lista de registros contra outras threads
+_trava = threading.Lock()
+
+def configurar_instrumentacao(perfilador=None, pasta_perfis=None):
+    """
+    Ativa a captura de perfis por etapa.
+
+    Args:
+        perfilador (str): 'cprofile', 'pyinstrument' ou None para desativar
+        pasta_perfis (Path): Pasta onde gravar os perfis capturados
+    """
+    if perfilador not in (None, *PERFILADORES):
+        raise ValueError(f"Perfilador desconhecido: {perfilador}. Use um de {', '.join(PERFILADORES)}")
+    if perfilador == 'pyinstrument':
+        try:
+            import pyinstrument  # noqa: F401
+        except ImportError:
+            logger.warning("pyinstrument não está instalado; perfis por etapa desativados")
+            perfilador = None
+    _config.update(perfilador=perfilador, pasta_perfis=str(pasta_perfis) if pasta_perfis else None)
+
+def obter_configuracao():
+    """Configuração atual, para repassar a processos de trabalho"""
+    return dict(_config)
+
+def pico_rss_mb():
+    """Pico de memória residente do processo, em MB (None se indisponível)"""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    # No Windows o psutil informa o pico do working set
+    pico = getattr(psutil.Process().memory_info(), 'peak_wset', None)
+    return pico / 1024 ** 2 if pico is not None else None
+
+def _contar_linhas(objeto):
+    """Linhas de um DataFrame/Series ou soma das linhas dos DataFrames de um dict/tuple"""
+    if isinstance(objeto, (pd.DataFrame, pd.Series)):
+        return len(objeto)
+    if isinstance(objeto, dict):
+        objeto = list(objeto.values())
+    if isinstance(objeto, (list, tuple)):
+        contagens = [len(o) for o in objeto if isinstance(o, (pd.DataFrame, pd.Series))]
+        return sum(contagens) if contagens else None
+    return None
+
+def _iniciar_perfil():
+    if _config['perfilador'] == 'pyinstrument':
+        from pyinstrument import Profiler
+        perfil = Profiler()
+        perfil.start()
+    else:
+        perfil = cProfile.Profile()
+        perfil.enable()
+    return perfil
+
+def _gravar_perfil(perfil, registro):
+    pasta = Path(_config['pasta_perfis'] or 'perfis')
+    pasta.mkdir(parents=True, exist_ok=True)
+    nome = '_'.join(p for p in (registro['etapa'], registro['rotulo'], str(len(_registros))) if p)
+    nome = nome.replace(' ', '_').replace(',', '')
+    if _config['perfilador'] == 'pyinstrument':
+        perfil.stop()
+        caminho = pasta / f'{nome}.html'
+        caminho.write_text(perfil.output_html())
+    else:
+        perfil.disable()
+        caminho = pasta / f'{nome}.prof'
+        perfil.dump_stats(caminho)
+    registro['perfil'] = str(caminho)
+
+@contextmanager
+def etapa(nome, rotulo='', linhas_entrada=None):
+    """
+    Mede um bloco do pipeline como uma etapa.
+
+    Args:
+        nome (str): Nome da etapa (normalmente o da função)
+        rotulo (str): Entidade processada (região, UF...)
+        linhas_entrada (int): Linhas recebidas pela etapa
+
+    Yields:
+        dict: Registro da etapa; ``linhas_saida`` pode ser preenchido pelo bloco
+    """
+    registro = {
+        'etapa': nome,
+        'rotulo': rotulo,
+        'pai': _pilha[-1]['etapa'] if _pilha else None,
+        'pid': os.getpid(),
+        'linhas_entrada': linhas_entrada,
+        'linhas_saida': None,
+        'bytes_saida': 0
+    }
+    # Perfis só na etapa mais externa: perfiladores não podem ser aninhados
+    perfil = _iniciar_perfil() if _config['perfilador'] and not _pilha else None
+    _pilha.append(registro)
+    pico_antes = pico_rss_mb()
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield registro
+    except Exception as e:
+        registro['erro'] = str(e)
+        raise
+    finally:
+        with _trava:
+            registro['segundos'] = time.perf_counter() - inicio
+            registro['cpu_segundos'] = time.process_time() - inicio_cpu
+            pico = pico_rss_mb()
+            registro['aumento_pico_rss_mb'] = pico - pico_antes if pico is not None else None
+            _pilha.pop()
+            if _pilha:
+                _pilha[-1]['bytes_saida'] += registro['bytes_saida']
+            _registros.append(registro)
+        if perfil is not None:
+            _gravar_perfil(perfil, registro)
+
+def medir_etapa(funcao):
+    """Decorador: registra cada chamada de ``funcao`` como uma etapa"""
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        rotulo = ', '.join(a for a in args if isinstance(a, str))
+        linhas = _contar_linhas(args[0]) if args else None
+        with etapa(funcao.__name__, rotulo, linhas) as registro:
+            resultado = funcao(*args, **kwargs)
+            registro['linhas_saida'] = _contar_linhas(resultado)
+        return resultado
+    return envoltorio
+
+def registrar_saida(caminho):
+    """Soma o tamanho de um arquivo gravado à etapa em andamento"""
+    if _pilha and caminho is not None and Path(caminho).exists():
+        _pilha[-1]['bytes_saida'] += Path(caminho).stat().st_size
+
+def registrar_saida_adiada():
+    """
+    Para arquivos gravados em segundo plano: retorna uma função que soma o
+    tamanho do arquivo às etapas em andamento agora, mesmo que já tenham
+    terminado quando a gravação for concluída.
+    """
+    etapas = list(_pilha)
+
+    def registrar(caminho):
+        tamanho = Path(caminho).stat().st_size
+        with _trava:
+            # Etapas encerradas recebem o tamanho diretamente; a mais interna
+            # ainda aberta o repassa às demais ao terminar
+            for registro in reversed(etapas):
+                registro['bytes_saida'] += tamanho
+                if 'segundos' not in registro:
+                    break
+    return registrar
+
+def coletar_registros():
+    """Retorna e descarta os registros concluídos neste processo"""
+    with _trava:
+        registros = list(_registros)
+        _registros.clear()
+    return registros
+
+def incorporar_registros(registros):
+    """Acrescenta registros vindos de outros processos aos deste processo"""
+    with _trava:
+        _registros.extend(registros)
+
+def resumir(registros):
+    """
+    Agrega os registros por etapa, ordenando pelo tempo total.
+
+    Returns:
+        list: Um dict por etapa com chamadas, tempos, memória, linhas e bytes
+    """
+    if not registros:
+        return []
+    df = pd.DataFrame(registros)
+    colunas_opcionais = ['linhas_entrada', 'linhas_saida', 'aumento_pico_rss_mb']
+    df[colunas_opcionais] = df[colunas_opcionais].astype(float)
+    resumo = df.groupby('etapa').agg(
+        chamadas=('etapa', 'size'),
+        segundos=('segundos', 'sum'),
+        cpu_segundos=('cpu_segundos', 'sum'),
+        maior_chamada_segundos=('segundos', 'max'),
+        aumento_pico_rss_mb=('aumento_pico_rss_mb', 'max'),
+        linhas_entrada=('linhas_entrada', lambda s: s.sum(min_count=1)),
+        linhas_saida=('linhas_saida', lambda s: s.sum(min_count=1)),
+        bytes_saida=('bytes_saida', 'sum')
+    ).sort_values('segundos', ascending=False)
+    resumo = resumo.reset_index().astype(object)
+    return resumo.where(resumo.notna(), None).to_dict('records')
+
+def formatar_tabela(resumo, limite=25):
+    """Tabela de texto com as etapas mais lentas"""
+    def texto(valor, largura, casas=0):
+        return f'{valor:{largura}.{casas}f}' if valor is not None else f"{'-':>{largura}}"
+
+    linhas = [
+        f"{'etapa':36} {'n':>5} {'s':>8} {'cpu s':>8} {'max s':>7} {'+RSS MB':>8} "
+        f"{'linhas ent.':>12} {'linhas saída':>12} {'KB':>8}"
+    ]
+    for item in resumo[:limite]:
+        linhas.append(
+            f"{item['etapa']:36} {item['chamadas']:5d} {item['segundos']:8.2f} "
+            f"{item['cpu_segundos']:8.2f} {item['maior_chamada_segundos']:7.2f} "
+            f"{texto(item['aumento_pico_rss_mb'], 8, 1)} {texto(item['linhas_entrada'], 12)} "
+            f"{texto(item['linhas_saida'], 12)} {item['bytes_saida'] / 1024:8.0f}"
+        )
+    return '\n'.join(linhas)
+
+def gravar_relatorio(pasta_saida, registros, duracao=None):
+    """
+    Grava o relatório JSON da execução e registra a tabela resumo no log.
+
+    Args:
+        pasta_saida (Path): Pasta dos relatórios de execução
+        registros (list): Registros de todas as etapas (de todos os processos)
+        duracao (float): Duração total da execução, em segundos
+
+    Returns:
+        Path: Caminho do relatório gravado
+    """
+    pasta_saida = Path(pasta_saida)
+    pasta_saida.mkdir(parents=True, exist_ok=True)
+    resumo = resumir(registros)
+    caminho = pasta_saida / f'execucao_{datetime.now():%Y%m%d_%H%M%S}.json'
+    caminho.write_text(json.dumps(
+        {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'duracao_segundos': duracao,
+            'resumo': resumo,
+            'registros': registros
+        },
+        indent=2, ensure_ascii=False, default=str
+    ))
+    if resumo:
+        logger.info(f"Etapas mais lentas:\n{formatar_tabela(resumo)}")
+    logger.info(f"Relatório de execução salvo em {caminho}")
+    return caminho
@@ -0,0 +1,66 @@
+"""
+Perfis de saída dos gráficos.
+
+Mantidos fora de ``visualization`` para que o ponto de entrada e o planejador
+possam escolher o perfil sem importar o matplotlib.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Perfis de saída: o preview prioriza velocidade de codificação, o web
+# tamanho de arquivo e o print qualidade (PNG a 300 dpi ou PDF vetorial).
+# O layout é ajustado pelo ``tight_layout`` de ``salvar_grafico``; com
+# ``bbox_inches='tight'`` o savefig calcularia a caixa da figura de novo
+PERFIS_SAIDA = {
+    'preview': {
+        'formato': 'png',
+        'dpi': 80,
+        'bbox_inches': None,
+        'pil_kwargs': {'compress_level': 1}
+    },
+    'web': {
+        'formato': 'webp',
+        'dpi': 120,
+        'bbox_inches': None,
+        'pil_kwargs': {'quality': 85, 'method': 4}
+    },
+    'print': {
+        'formato': 'png',
+        'dpi': 300,
+        'bbox_inches': None
+    },
+    'vetorial': {
+        'formato': 'pdf',
+        'dpi': 300,
+        'bbox_inches': None
+    }
+}
+
+def _perfil_do_ambiente(padrao='print'):
+    """Perfil da variável de ambiente PERFIL_SAIDA, validado uma única vez"""
+    nome = os.environ.get('PERFIL_SAIDA', padrao)
+    if nome not in PERFIS_SAIDA:
+        logger.warning(
+            f"PERFIL_SAIDA desconhecido: {nome} (opções: {', '.join(PERFIS_SAIDA)}); usando {padrao}"
+        )
+        return padrao
+    return nome
+
+_perfil_saida = _perfil_do_ambiente()
+
+def definir_perfil_saida(nome):
+    """Define o perfil de saída usado por todos os gráficos da execução"""
+    global _perfil_saida
+    if nome not in PERFIS_SAIDA:
+        raise ValueError(
+            f"Perfil de saída desconhecido: {nome} (opções: {', '.join(PERFIS_SAIDA)})"
+        )
+    _perfil_saida = nome
+    logger.info(f"Perfil de saída: {nome}")
+
+def obter_perfil_saida():
+    """Retorna o nome e as configurações do perfil de saída atual"""
+    return _perfil_saida, PERFIS_SAIDA[_perfil_saida]
@@ -0,0 +1,584 @@
+"""
+Registro declarativo dos gráficos do relatório e planejador de builds incrementais.
+
+Cada gráfico declara o conjunto de dados de entrada, o agrupamento (uma figura
+por região, por UF ou uma única figura nacional) e o nome do arquivo de saída.
+O planejador expande o registro em alvos, reconstrói apenas os desatualizados
+e executa em paralelo as tarefas independentes; cada tarefa carrega seu
+conjunto de dados e calcula os agregados compartilhados uma única vez.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+
+import instrumentacao
+import pandas as pd
+
+from data_processing import (
+    REGIOES, arquivos_regiao, arquivos_estado_capital, arquivo_anomalias, descobrir_estados,
+    carregar_dados_regiao, carregar_dados_estado_capital, filtrar_dados,
+    estatisticas_parciais, combinar_estatisticas
+)
+from execucao import BackendLocal, mapear_reduzir
+
+logger = logging.getLogger(__name__)
+
+# Arquivo (no diretório de saída) com a assinatura de cada alvo já gerado
+ARQUIVO_ESTADO = '.registro_graficos.json'
+
+# Código que desenha os gráficos: alterá-lo invalida todos os alvos
+ARQUIVO_VISUALIZACAO = Path(__file__).resolve().parent / 'visualization.py'
+
+# Código de leitura: alterá-lo invalida o cache de dados carregados
+ARQUIVO_DATA_PROCESSING = Path(__file__).resolve().parent / 'data_processing.py'
+
+# Threads de gravação por processo e imagens aguardando gravação: a
+# codificação dos arquivos se sobrepõe ao desenho do gráfico seguinte
+GRAVADORES = 2
+GRAVACOES_PENDENTES = 4
+
+# Custos usados nas estimativas quando não há execuções anteriores
+CUSTO_PADRAO_GRAFICO = 1.0
+CUSTO_PADRAO_CARGA_MB = 2.0
+
+GRAFICOS = {
+    # Uma figura por região
+    'distribuicao': {
+        'funcao': 'plot_distribuicao_temperatura',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_distribuicao_{entidade}.png'
+    },
+    'serie_temporal': {
+        'funcao': 'plot_serie_temporal',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_temporal_{entidade}.png'
+    },
+    'media_movel': {
+        'funcao': 'plot_media_movel',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_media_movel_{entidade}.png'
+    },
+    'variacao_diaria': {
+        'funcao': 'plot_variacao_diaria',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_variacao_diaria_{entidade}.png', 'agregados': True
+    },
+    'heatmap_semanal': {
+        'funcao': 'plot_heatmap_semanal',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_heatmap_semanal_{entidade}.png', 'agregados': True
+    },
+    'correlacao_hora': {
+        'funcao': 'plot_correlacao_temperatura_hora',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_correlacao_hora_{entidade}.png'
+    },
+    'extremos': {
+        'funcao': 'plot_extremos_temperatura',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_extremos_{entidade}.png'
+    },
+    'temporal_estados': {
+        'funcao': 'plot_serie_temporal_estados',
+        'dados': 'temperatura_regiao', 'agrupamento': 'regiao',
+        'saida': 'temp_temporal_estados_{entidade}.png'
+    },
+
+    # Figuras nacionais, comparando regiões e estados
+    'comparacao_regioes': {
+        'funcao': 'plot_comparacao_regioes',
+        'dados': 'temperatura_regioes', 'agrupamento': 'nacional',
+        'saida': 'temp_comparacao_regioes.png'
+    },
+    'comparacao_estados': {
+        'funcao': 'plot_comparacao_estados',
+        'dados': 'temperatura_regioes', 'agrupamento': 'nacional',
+        'saida': 'temp_comparacao_estados.png'
+    },
+    'mapa_calor_estados': {
+        'funcao': 'plot_mapa_calor_estados',
+        'dados': 'temperatura_regioes', 'agrupamento': 'nacional',
+        'saida': 'temp_mapa_calor_estados.png'
+    },
+    'estatisticas_estados': {
+        'funcao': 'plot_estatisticas_estados',
+        'dados': 'temperatura_regioes', 'agrupamento': 'nacional',
+        'saida': 'temp_estatisticas_estados.png'
+    },
+
+    # Uma figura por UF, comparando estado e capital
+    'radar': {
+        'funcao': 'plot_radar_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'radar_estado_capital_{entidade}.png', 'agregados': True
+    },
+    'violino': {
+        'funcao': 'plot_violino_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'violino_estado_capital_{entidade}.png'
+    },
+    'ciclo_diario': {
+        'funcao': 'plot_ciclo_diario_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'ciclo_diario_{entidade}.png', 'agregados': True
+    },
+    'calor_horario': {
+        'funcao': 'plot_calor_horario_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'calor_horario_{entidade}.png', 'agregados': True
+    },
+    'densidade': {
+        'funcao': 'plot_densidade_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'densidade_{entidade}.png'
+    },
+    'boxen': {
+        'funcao': 'plot_boxen_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'boxen_{entidade}.png'
+    },
+    'regressao': {
+        'funcao': 'plot_regressao_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'regressao_{entidade}.png'
+    },
+    'barras': {
+        'funcao': 'plot_barras_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'barras_{entidade}.png', 'agregados': True
+    },
+    'area': {
+        'funcao': 'plot_area_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'area_{entidade}.png', 'agregados': True
+    },
+    'polar': {
+        'funcao': 'plot_polar_estado_capital',
+        'dados': 'temperatura_estado_capital', 'agrupamento': 'uf',
+        'saida': 'polar_{entidade}.png', 'agregados': True
+    }
+}
+
+def _carregar_regioes(pasta_dados, anomalia=False):
+    """Carrega todas as regiões com dados; None se houver menos de duas"""
+    dados = {}
+    for regiao in REGIOES:
+        df = carregar_dados_regiao(regiao, pasta_dados, anomalia)
+        if df is not None:
+            dados[regiao] = df
+    return dados if len(dados) > 1 else None
+
+# Conjuntos de dados: como carregar cada entidade, de quais arquivos ela depende
+# e qual função de ``visualization`` calcula os agregados compartilhados
+CONJUNTOS = {
+    'temperatura_regiao': {
+        'carregar': lambda regiao, uf, pasta, anomalia: carregar_dados_regiao(regiao, pasta, anomalia),
+        'entradas': lambda regiao, uf, pasta: arquivos_regiao(regiao, pasta),
+        'agregados': 'calcular_agregados_regiao'
+    },
+    'temperatura_regioes': {
+        'carregar': lambda regiao, uf, pasta, anomalia: _carregar_regioes(pasta, anomalia),
+        'entradas': lambda regiao, uf, pasta: [a for r in REGIOES for a in arquivos_regiao(r, pasta)]
+    },
+    'temperatura_estado_capital': {
+        'carregar': lambda regiao, uf, pasta, anomalia: carregar_dados_estado_capital(regiao, uf, pasta, anomalia),
+        'entradas': lambda regiao, uf, pasta: list(arquivos_estado_capital(regiao, uf, pasta)),
+        'agregados': 'calcular_agregados_estado_capital'
+    }
+}
+
+def _entradas(dados, regiao, uf, pasta_dados, anomalia=False):
+    """Arquivos de entrada de uma entidade; no modo anomalia, também os de anomalias"""
+    entradas = list(CONJUNTOS[dados]['entradas'](regiao, uf, pasta_dados))
+    if anomalia:
+        entradas += [arquivo_anomalias(arquivo) for arquivo in entradas]
+    return entradas
+
+def _entidades(agrupamento, pasta_dados):
+    """Lista as entidades (regiao, uf) de um agrupamento com dados disponíveis"""
+    if agrupamento == 'regiao':
+        return [(regiao, None) for regiao in REGIOES if arquivos_regiao(regiao, pasta_dados)]
+    if agrupamento == 'uf':
+        entidades = []
+        for regiao, ufs in descobrir_estados(pasta_dados).items():
+            for uf in ufs:
+                if all(a.exists() for a in arquivos_estado_capital(regiao, uf, pasta_dados)):
+                    entidades.append((regiao, uf))
+                else:
+                    logger.warning(f"Arquivos de estado e capital incompletos para {uf}; gráficos ignorados")
+        return entidades
+    return [(None, None)]
+
+def _selecionar(entidades, regioes=None, estados=None):
+    """Filtros de seleção: entidades sem a dimensão filtrada ficam de fora"""
+    return [
+        (regiao, uf) for regiao, uf in entidades
+        if not (estados and uf not in estados) and not (regioes and regiao not in regioes)
+    ]
+
+def _estado_arquivos(caminhos):
+    """(caminho, mtime, tamanho) dos arquivos existentes, para compor assinaturas"""
+    arquivos = []
+    for caminho in caminhos:
+        caminho = Path(caminho)
+        if caminho.exists():
+            estado = caminho.stat()
+            arquivos.append([str(caminho), estado.st_mtime_ns, estado.st_size])
+    return arquivos
+
+def _assinatura(grafico, perfil, entradas, filtros=None, anomalia=False):
+    """Assinatura de um alvo: função, perfil de saída, filtros, modo e estado dos arquivos de entrada"""
+    conteudo = json.dumps([
+        GRAFICOS[grafico]['funcao'], perfil, filtros or {}, anomalia,
+        _estado_arquivos([*entradas, ARQUIVO_VISUALIZACAO])
+    ], sort_keys=True)
+    return hashlib.sha1(conteudo.encode()).hexdigest()
+
+def _ler_estado(pasta_estado):
+    caminho = Path(pasta_estado) / ARQUIVO_ESTADO
+    if caminho.exists():
+        try:
+            return json.loads(caminho.read_text())
+        except ValueError:
+            logger.warning(f"Estado do registro inválido em {caminho}; todos os alvos serão refeitos")
+    return {}
+
+def planejar(reports_dir, perfil, pasta_dados=None, graficos=None, regioes=None,
+             estados=None, forcar=False, filtros=None, pasta_estado=None, anomalia=False):
+    """
+    Expande o registro nos alvos selecionados e marca os desatualizados.
+
+    Args:
+        reports_dir (Path): Diretório de saída
+        perfil (tuple): (nome, configurações) do perfil de saída
+        pasta_dados (Path): Pasta com os arquivos consolidados
+        graficos (list): Nomes do registro a gerar; None para todos
+        regioes (list): Regiões selecionadas; None para todas
+        estados (list): UFs selecionadas; None para todas
+        forcar (bool): Considera todos os alvos desatualizados
+        filtros (dict): Período e estações (ver ``filtrar_dados``), parte da assinatura
+        pasta_estado (Path): Onde fica o estado do registro; padrão ``reports_dir``
+        anomalia (bool): Gráficos das anomalias precomputadas (arquivos ``*_anomalia``)
+
+    Returns:
+        list: Alvos (dicts com grafico, dados, regiao, uf, saida, entradas,
+        assinatura e desatualizado), na ordem do registro
+    """
+    desconhecidos = set(graficos or []) - set(GRAFICOS)
+    if desconhecidos:
+        raise ValueError(f"Gráficos desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    nome_perfil, config_perfil = perfil
+    estado_anterior = _ler_estado(pasta_estado or reports_dir)
+    entidades = {}
+    alvos = []
+
+    for grafico, spec in GRAFICOS.items():
+        if graficos and grafico not in graficos:
+            continue
+        agrupamento = spec['agrupamento']
+        if agrupamento not in entidades:
+            entidades[agrupamento] = _selecionar(_entidades(agrupamento, pasta_dados), regioes, estados)
+
+        for regiao, uf in entidades[agrupamento]:
+            entidade = (uf or regiao or '').lower()
+            saida = (Path(reports_dir) / spec['saida'].format(entidade=entidade)).with_suffix(
+                f".{config_perfil['formato']}"
+            )
+            if anomalia:
+                saida = saida.with_stem(f'{saida.stem}_anomalia')
+            entradas = _entradas(spec['dados'], regiao, uf, pasta_dados, anomalia)
+            assinatura = _assinatura(grafico, nome_perfil, entradas, filtros, anomalia)
+            anterior = estado_anterior.get(str(saida.resolve()), {})
+            alvos.append({
+                'grafico': grafico,
+                'dados': spec['dados'],
+                'regiao': regiao,
+                'uf': uf,
+                'saida': saida,
+                'entradas': entradas,
+                'assinatura': assinatura,
+                'desatualizado': (
+                    forcar or anterior.get('assinatura') != assinatura
+                    or (anterior.get('gerado', True) and not saida.exists())
+                )
+            })
+    return alvos
+
+def _filtrar(dados, filtros):
+    """Aplica os filtros a um DataFrame ou a um dict de DataFrames"""
+    if not filtros or dados is None:
+        return dados
+    if isinstance(dados, dict):
+        filtrados = {chave: filtrar_dados(df, **filtros) for chave, df in dados.items()}
+        return {chave: df for chave, df in filtrados.items() if df is not None} or None
+    return filtrar_dados(dados, **filtros)
+
+def carregar_conjunto(dados, regiao, uf, pasta_dados=None, pasta_cache=None, filtros=None,
+                      anomalia=False):
+    """
+    Carrega o conjunto de dados de uma entidade e aplica os filtros.
+
+    Com ``anomalia``, inclui a coluna ANOMALIA precomputada (ver climatologia.py).
+
+    Com ``pasta_cache``, o resultado da leitura (antes dos filtros) é guardado
+    em pickle, identificado pelo estado dos arquivos de entrada e do código de
+    leitura; execuções seguintes com as mesmas entradas não releem os CSVs.
+    """
+    conjunto = CONJUNTOS[dados]
+    entradas = _entradas(dados, regiao, uf, pasta_dados, anomalia)
+    rotulo = uf or regiao or 'nacional'
+
+    with instrumentacao.etapa('carregar_conjunto', f'{dados} {rotulo}') as registro:
+        registro['bytes_entrada'] = sum(Path(a).stat().st_size for a in entradas if Path(a).exists())
+        if pasta_cache is None:
+            return _filtrar(conjunto['carregar'](regiao, uf, pasta_dados, anomalia), filtros)
+
+        pasta_cache = Path(pasta_cache)
+        pasta_cache.mkdir(parents=True, exist_ok=True)
+        chave = hashlib.sha1(json.dumps(
+            [dados, regiao, uf, _estado_arquivos([*entradas, ARQUIVO_DATA_PROCESSING])]
+        ).encode()).hexdigest()[:16]
+        prefixo = f"{dados}_{rotulo.lower()}_{'anomalia_' if anomalia else ''}"
+        caminho = pasta_cache / f'{prefixo}{chave}.pkl'
+
+        if caminho.exists():
+            registro['cache'] = True
+            return _filtrar(pd.read_pickle(caminho), filtros)
+
+        resultado = conjunto['carregar'](regiao, uf, pasta_dados, anomalia)
+        if resultado is not None:
+            for antigo in pasta_cache.glob(f'{prefixo}*.pkl'):
+                antigo.unlink()
+            pd.to_pickle(resultado, caminho)
+        return _filtrar(resultado, filtros)
+
+def _executar_tarefa(dados, regiao, uf, graficos, contexto):
+    """
+    Gera os gráficos de uma entidade: carrega os dados e os agregados uma só vez.
+
+    Executada em processos separados; retorna os pares (nome do arquivo, gerado)
+    e os registros de instrumentação do processo. Um gráfico sem saída (por
+    exemplo, sem a coluna ESTADO) não é gerado.
+    """
+    import visualization
+
+    if visualization.obter_perfil_saida()[0] != contexto['perfil']:
+        visualization.definir_perfil_saida(contexto['perfil'])
+    if instrumentacao.obter_configuracao() != contexto['instrumentacao']:
+        instrumentacao.configurar_instrumentacao(**contexto['instrumentacao'])
+    visualization.configurar_gravacao(GRAVADORES, GRAVACOES_PENDENTES)
+
+    df = carregar_conjunto(
+        dados, regiao, uf, contexto['pasta_dados'], contexto['pasta_cache'], contexto['filtros'],
+        contexto['anomalia']
+    )
+    if df is None:
+        logger.warning(f"Sem dados para {dados} ({uf or regiao or 'nacional'})")
+        return [], instrumentacao.coletar_registros()
+    if contexto['anomalia']:
+        # Os agregados compartilhados também passam a ser de anomalias
+        df = visualization.usar_anomalias(df)
+
+    agregados = None
+    if 'agregados' in CONJUNTOS[dados]:
+        agregados = getattr(visualization, CONJUNTOS[dados]['agregados'])(df)
+
+    reports_dir = contexto['reports_dir']
+    inicio = time.time()
+    for grafico, _ in graficos:
+        spec = GRAFICOS[grafico]
+        funcao = getattr(visualization, spec['funcao'])
+        argumentos = [df, reports_dir] if spec['agrupamento'] == 'nacional' else [df, uf or regiao, reports_dir]
+        opcoes = {'agregados': agregados} if spec.get('agregados') else {}
+        if contexto['anomalia']:
+            opcoes['anomalia'] = True
+        funcao(*argumentos, **opcoes)
+
+    # Os arquivos só existem depois que as gravações em segundo plano terminam
+    visualization.aguardar_gravacoes()
+    visualization.descartar_modelos()
+    gerados = [
+        (saida.name, saida.exists() and saida.stat().st_mtime >= inicio - 1)
+        for _, saida in graficos
+    ]
+    return gerados, instrumentacao.coletar_registros()
+
+def _agrupar_tarefas(alvos):
+    """Agrupa os alvos desatualizados por conjunto de dados e entidade"""
+    tarefas = {}
+    for alvo in alvos:
+        if alvo['desatualizado']:
+            chave = (alvo['dados'], alvo['regiao'], alvo['uf'])
+            tarefas.setdefault(chave, []).append(alvo)
+    return tarefas
+
+def executar(alvos, reports_dir, perfil, pasta_dados=None, workers=1, filtros=None,
+             pasta_cache=None, pasta_estado=None, anomalia=False, backend=None):
+    """
+    Gera os alvos desatualizados, agrupando-os em tarefas por entidade.
+
+    Tarefas independentes rodam em paralelo no ``backend`` (padrão: ``workers``
+    processos locais, ver execucao.py), e os registros de instrumentação de
+    cada tarefa são incorporados aos deste processo. As
+    assinaturas dos alvos executados são gravadas em ``pasta_estado`` (padrão
+    ``reports_dir``) para que a próxima execução os considere atualizados;
+    alvos que não produziram arquivo só são refeitos quando as entradas mudam
+    ou com ``forcar``.
+
+    Returns:
+        list: Nomes dos arquivos gerados
+    """
+    tarefas = _agrupar_tarefas(alvos)
+    logger.info(
+        f"{len(alvos)} alvos selecionados, {sum(a['desatualizado'] for a in alvos)} "
+        f"desatualizados em {len(tarefas)} tarefas"
+    )
+    if not tarefas:
+        return []
+
+    contexto = {
+        'reports_dir': reports_dir,
+        'perfil': perfil[0],
+        'pasta_dados': pasta_dados,
+        'pasta_cache': pasta_cache,
+        'filtros': filtros,
+        'anomalia': anomalia,
+        'instrumentacao': instrumentacao.obter_configuracao()
+    }
+    argumentos = [
+        (dados, regiao, uf, [(a['grafico'], a['saida']) for a in grupo], contexto)
+        for (dados, regiao, uf), grupo in tarefas.items()
+    ]
+
+    inicio = time.perf_counter()
+    gerados = []
+    for indice, retorno, erro in (backend or BackendLocal(workers)).mapear(_executar_tarefa, argumentos):
+        if erro is not None:
+            dados, regiao, uf = argumentos[indice][:3]
+            logger.error(f"Erro ao executar tarefa {dados} ({uf or regiao or 'nacional'}): {str(erro)}")
+            continue
+        resultado, registros = retorno
+        gerados.extend(resultado)
+        instrumentacao.incorporar_registros(registros)
+
+    # Registrar as assinaturas dos alvos executados
+    pasta_estado = Path(pasta_estado or reports_dir)
+    pasta_estado.mkdir(parents=True, exist_ok=True)
+    estado = _ler_estado(pasta_estado)
+    executados = dict(gerados)
+    for alvo in alvos:
+        nome = alvo['saida'].name
+        if nome in executados:
+            estado[str(alvo['saida'].resolve())] = {
+                'assinatura': alvo['assinatura'], 'gerado': executados[nome]
+            }
+    (pasta_estado / ARQUIVO_ESTADO).write_text(json.dumps(estado, indent=2, sort_keys=True))
+
+    gerados = [nome for nome, gerado in gerados if gerado]
+    logger.info(f"{len(gerados)} gráficos gerados em {time.perf_counter() - inicio:.1f} s")
+    return gerados
+
+def _custos_historicos(pasta_execucao, execucoes=5):
+    """
+    Custos médios das últimas execuções instrumentadas: segundos por chamada de
+    cada gráfico e segundos por MB lido na carga dos conjuntos de dados.
+    """
+    tempos, carga_segundos, carga_bytes = {}, 0.0, 0
+    for caminho in sorted(Path(pasta_execucao).glob('execucao_*.json'))[-execucoes:]:
+        try:
+            registros = json.loads(caminho.read_text())['registros']
+        except (ValueError, KeyError):
+            continue
+        for registro in registros:
+            if registro['etapa'] == 'carregar_conjunto' and not registro.get('cache'):
+                carga_segundos += registro['segundos']
+                carga_bytes += registro.get('bytes_entrada') or 0
+            elif registro.get('pai') is None:
+                tempos.setdefault(registro['etapa'], []).append(registro['segundos'])
+
+    custos = {etapa: sum(valores) / len(valores) for etapa, valores in tempos.items()}
+    segundos_por_mb = carga_segundos / (carga_bytes / 1024 ** 2) if carga_bytes else None
+    return custos, segundos_por_mb
+
+def estimar_custos(alvos, pasta_execucao, workers=1):
+    """
+    Estima o custo das tarefas desatualizadas a partir das execuções anteriores.
+
+    Sem histórico, usa ``CUSTO_PADRAO_GRAFICO`` por gráfico e
+    ``CUSTO_PADRAO_CARGA_MB`` por MB de entrada.
+
+    Returns:
+        dict: Tarefas (entidade, gráficos, MB de entrada, segundos estimados),
+        total sequencial e tempo de parede estimado com ``workers`` processos
+    """
+    custos, segundos_por_mb = _custos_historicos(pasta_execucao)
+    segundos_por_mb = segundos_por_mb or CUSTO_PADRAO_CARGA_MB
+
+    tarefas = []
+    for (dados, regiao, uf), grupo in _agrupar_tarefas(alvos).items():
+        mb = sum(Path(a).stat().st_size for a in grupo[0]['entradas'] if Path(a).exists()) / 1024 ** 2
+        graficos = sum(
+            custos.get(GRAFICOS[a['grafico']]['funcao'], CUSTO_PADRAO_GRAFICO) for a in grupo
+        )
+        tarefas.append({
+            'dados': dados,
+            'entidade': uf or regiao or 'nacional',
+            'graficos': [a['grafico'] for a in grupo],
+            'mb_entrada': mb,
+            'segundos': mb * segundos_por_mb + graficos
+        })
+
+    # Tarefas mais longas primeiro, cada uma no processo menos ocupado
+    ocupacao = [0.0] * max(1, workers)
+    for tarefa in sorted(tarefas, key=lambda t: -t['segundos']):
+        ocupacao[ocupacao.index(min(ocupacao))] += tarefa['segundos']
+
+    return {
+        'tarefas': tarefas,
+        'historico': bool(custos),
+        'segundos_total': sum(t['segundos'] for t in tarefas),
+        'segundos_parede': max(ocupacao)
+    }
+
+def estatisticas_arquivo(arquivo, filtros=None):
+    """Agregados parciais de um arquivo consolidado (a partição do map-reduce das estatísticas)"""
+    df = pd.read_csv(arquivo, sep=';', dtype={'CODIGO': str})
+    df['DATA'] = pd.to_datetime(df['DATA'])
+    return estatisticas_parciais(_filtrar(df, filtros))
+
+def calcular_estatisticas(pasta_dados=None, regioes=None, estados=None, filtros=None, backend=None):
+    """
+    Estatísticas básicas das regiões e dos pares estado/capital selecionados,
+    sem gerar nenhum gráfico.
+
+    Cada arquivo consolidado é uma partição: os agregados parciais são
+    calculados no ``backend`` (padrão: neste processo) e combinados por
+    região e por estado/capital; arquivos compartilhados entre uma região e
+    suas UFs são lidos uma única vez.
+
+    Returns:
+        dict: {'regioes': {regiao: estatísticas}, 'estados': {uf: {tipo: estatísticas}}}
+    """
+    particoes = {}
+    for regiao, _ in _selecionar(_entidades('regiao', pasta_dados), regioes, estados):
+        particoes[('regioes', regiao)] = [(arquivo, filtros) for arquivo in arquivos_regiao(regiao, pasta_dados)]
+    for regiao, uf in _selecionar(_entidades('uf', pasta_dados), regioes, estados):
+        arquivo_estado, arquivo_capital = arquivos_estado_capital(regiao, uf, pasta_dados)
+        particoes[('estados', uf, 'ESTADO')] = [(arquivo_estado, filtros)]
+        particoes[('estados', uf, 'CAPITAL')] = [(arquivo_capital, filtros)]
+
+    combinadas = mapear_reduzir(backend or BackendLocal(), estatisticas_arquivo, particoes, combinar_estatisticas)
+
+    estatisticas = {'regioes': {}, 'estados': {}}
+    for grupo, resultado in combinadas.items():
+        if resultado is None:
+            continue
+        if grupo[0] == 'regioes':
+            estatisticas['regioes'][grupo[1]] = resultado
+        else:
+            estatisticas['estados'].setdefault(grupo[1], {})[grupo[2]] = resultado
+    return estatisticas
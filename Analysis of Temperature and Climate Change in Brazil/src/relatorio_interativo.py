@@ -0,0 +1,304 @@
+"""
+Módulo para geração do relatório interativo (HTML) das séries de temperatura.
+
+Cada série horária é gravada como uma pirâmide de resoluções em blocos JSON.
+A página carrega primeiro o nível mais grosseiro e busca níveis mais finos
+conforme o zoom, desenhando as séries com traços WebGL (``scattergl``).
+"""
+
+import argparse
+import json
+import logging
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import PASTA_INMET, carregar_estacoes_inmet
+
+logger = logging.getLogger(__name__)
+
+# Pontos por arquivo de bloco em cada nível da pirâmide
+PONTOS_POR_BLOCO = 2048
+
+# Pontos máximos por série desenhados de uma vez na página
+ORCAMENTO_PONTOS = 2000
+
+# Fator de agregação entre níveis consecutivos da pirâmide
+FATOR_PIRAMIDE = 4
+
+def construir_piramide(valores, fator=FATOR_PIRAMIDE, limite=ORCAMENTO_PONTOS):
+    """
+    Constrói os níveis de resolução de uma série regular.
+
+    O nível 0 é a série original. No nível ``k`` cada grupo de ``fator**k``
+    pontos vira dois pontos (mínimo e máximo, na ordem em que ocorrem), de modo
+    que picos e vales continuam visíveis na visão geral. Os níveis são gerados
+    até que um deles caiba em ``limite`` pontos.
+
+    Args:
+        valores (np.ndarray): Série com passo constante (NaN nas lacunas)
+        fator (int): Fator de agregação entre níveis
+        limite (int): Número de pontos do nível mais grosseiro
+
+    Returns:
+        list: Um array por nível; o nível ``k > 0`` tem passo ``fator**k / 2``
+    """
+    niveis = [np.asarray(valores, dtype=float)]
+    tamanho_grupo = fator
+    while len(niveis[-1]) > limite and tamanho_grupo < len(valores):
+        n_grupos = -(-len(valores) // tamanho_grupo)
+        grupos = np.full(n_grupos * tamanho_grupo, np.nan)
+        grupos[:len(valores)] = valores
+        grupos = grupos.reshape(n_grupos, tamanho_grupo)
+
+        vazios = np.isnan(grupos).all(axis=1)
+        i_min = np.where(np.isnan(grupos), np.inf, grupos).argmin(axis=1)
+        i_max = np.where(np.isnan(grupos), -np.inf, grupos).argmax(axis=1)
+        minimos = np.take_along_axis(grupos, i_min[:, None], axis=1)[:, 0]
+        maximos = np.take_along_axis(grupos, i_max[:, None], axis=1)[:, 0]
+
+        # Manter a ordem temporal entre o mínimo e o máximo de cada grupo
+        min_primeiro = i_min <= i_max
+        nivel = np.empty((n_grupos, 2))
+        nivel[:, 0] = np.where(min_primeiro, minimos, maximos)
+        nivel[:, 1] = np.where(min_primeiro, maximos, minimos)
+        nivel[vazios] = np.nan
+
+        niveis.append(nivel.ravel())
+        tamanho_grupo *= fator
+    return niveis
+
+def _gravar_blocos(pasta_serie, nivel, valores):
+    """Grava um nível da pirâmide em blocos JSON (NaN vira null)"""
+    arredondados = np.round(valores, 2)
+    for numero, inicio in enumerate(range(0, len(valores), PONTOS_POR_BLOCO)):
+        bloco = arredondados[inicio:inicio + PONTOS_POR_BLOCO]
+        y = [None if np.isnan(v) else float(v) for v in bloco]
+        caminho = pasta_serie / f'n{nivel}_{numero}.json'
+        caminho.write_text(json.dumps({'y': y}, separators=(',', ':')))
+
+def gerar_relatorio_interativo(df, reports_dir, coluna_serie='CODIGO', rotulos=None,
+                               coluna_valor='TEMPERATURA', titulo='Temperatura Horária'):
+    """
+    Gera o relatório HTML com as séries de ``df`` em pirâmides de resolução.
+
+    Args:
+        df (pd.DataFrame): Dados longos com DATA, ``coluna_serie`` e ``coluna_valor``
+        reports_dir (Path): Diretório de saída (o relatório vai para ``interativo/``)
+        coluna_serie (str): Coluna que identifica cada série
+        rotulos (dict): Rótulo exibido para cada série (padrão: o próprio identificador)
+        coluna_valor (str): Coluna com os valores
+        titulo (str): Título da página
+
+    Returns:
+        Path: Caminho do ``index.html`` gerado, ou None em caso de erro
+    """
+    try:
+        import plotly.offline
+
+        pasta = Path(reports_dir) / 'interativo'
+        if (pasta / 'dados').exists():
+            shutil.rmtree(pasta / 'dados')
+        (pasta / 'dados').mkdir(parents=True)
+
+        # Grade horária comum a todas as séries
+        horas = df['DATA'].dt.floor('h')
+        inicio, fim = horas.min(), horas.max()
+        n_horas = int((fim - inicio) / pd.Timedelta(hours=1)) + 1
+        passo_ms = 3600 * 1000
+
+        series = []
+        niveis = None
+        for serie, dados in df.groupby(coluna_serie, observed=True):
+            posicoes = ((horas.loc[dados.index] - inicio) / pd.Timedelta(hours=1)).astype(int)
+            valores = np.full(n_horas, np.nan)
+            valores[posicoes.to_numpy()] = dados[coluna_valor].to_numpy()
+
+            piramide = construir_piramide(valores)
+            pasta_serie = pasta / 'dados' / str(serie)
+            pasta_serie.mkdir()
+            for nivel, valores_nivel in enumerate(piramide):
+                _gravar_blocos(pasta_serie, nivel, valores_nivel)
+
+            if niveis is None:
+                niveis = [
+                    {'passo': passo_ms if k == 0 else passo_ms * FATOR_PIRAMIDE ** k // 2, 'pontos': len(v)}
+                    for k, v in enumerate(piramide)
+                ]
+            series.append({
+                'id': str(serie),
+                'rotulo': (rotulos or {}).get(serie, str(serie))
+            })
+
+        manifesto = {
+            't0': int(inicio.timestamp() * 1000),
+            'bloco': PONTOS_POR_BLOCO,
+            'niveis': niveis,
+            'series': series
+        }
+
+        # plotly.js local: a página não depende de rede
+        (pasta / 'plotly.min.js').write_text(plotly.offline.get_plotlyjs(), encoding='utf-8')
+        html = (
+            MODELO_HTML
+            .replace('__TITULO__', titulo)
+            .replace('__MANIFESTO__', json.dumps(manifesto, ensure_ascii=False))
+            .replace('__ORCAMENTO__', str(ORCAMENTO_PONTOS))
+        )
+        caminho = pasta / 'index.html'
+        caminho.write_text(html, encoding='utf-8')
+
+        logger.info(
+            f"Relatório interativo salvo em {caminho} ({len(series)} séries, "
+            f"{len(niveis)} níveis). Sirva a pasta com 'python -m http.server' para abrir."
+        )
+        return caminho
+
+    except Exception as e:
+        logger.error(f"Erro ao gerar relatório interativo: {str(e)}")
+        return None
+
+MODELO_HTML = """<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>__TITULO__</title>
+<script src="plotly.min.js"></script>
+<style>
+  body { margin: 0; display: flex; height: 100vh; font-family: sans-serif; }
+  #lateral { width: 280px; padding: 0.5rem; border-right: 1px solid #e9ecef; display: flex; flex-direction: column; }
+  #lateral select { flex: 1; width: 100%; }
+  #lateral input { width: 100%; margin-bottom: 0.5rem; box-sizing: border-box; }
+  #grafico { flex: 1; }
+  #status { font-size: 0.8rem; color: #6c757d; }
+</style>
+</head>
+<body>
+<div id="lateral">
+  <h3>__TITULO__</h3>
+  <input id="busca" placeholder="Filtrar séries...">
+  <select id="series" multiple></select>
+  <p id="status"></p>
+</div>
+<div id="grafico"></div>
+<script>
+const MANIFESTO = __MANIFESTO__;
+const ORCAMENTO = __ORCAMENTO__;
+const blocos = new Map();
+const grafico = document.getElementById('grafico');
+const seletor = document.getElementById('series');
+let janela = null;
+
+function carregarBloco(serie, nivel, numero) {
+  const chave = serie + '/' + nivel + '/' + numero;
+  if (!blocos.has(chave)) {
+    blocos.set(chave, fetch('dados/' + serie + '/n' + nivel + '_' + numero + '.json')
+      .then(r => r.json()).then(d => d.y));
+  }
+  return blocos.get(chave);
+}
+
+// Nível mais fino cuja janela visível cabe no orçamento de pontos
+function escolherNivel(inicio, fim) {
+  for (let n = 0; n < MANIFESTO.niveis.length; n++) {
+    if ((fim - inicio) / MANIFESTO.niveis[n].passo <= ORCAMENTO) return n;
+  }
+  return MANIFESTO.niveis.length - 1;
+}
+
+async function carregarJanela(serie, n, inicio, fim) {
+  const nivel = MANIFESTO.niveis[n];
+  const primeiro = Math.max(0, Math.floor((inicio - MANIFESTO.t0) / nivel.passo));
+  const ultimo = Math.min(nivel.pontos - 1, Math.ceil((fim - MANIFESTO.t0) / nivel.passo));
+  const pedidos = [];
+  for (let b = Math.floor(primeiro / MANIFESTO.bloco); b <= Math.floor(ultimo / MANIFESTO.bloco); b++) {
+    pedidos.push(carregarBloco(serie, n, b));
+  }
+  const base = Math.floor(primeiro / MANIFESTO.bloco) * MANIFESTO.bloco;
+  const y = [].concat(...(await Promise.all(pedidos))).slice(primeiro - base, ultimo - base + 1);
+  const x = y.map((_, k) => new Date(MANIFESTO.t0 + (primeiro + k) * nivel.passo).toISOString().slice(0, 19));
+  return {x, y};
+}
+
+function paraMs(texto) {
+  return Date.parse(String(texto).replace(' ', 'T') + 'Z');
+}
+
+async function desenhar() {
+  const selecionadas = Array.from(seletor.selectedOptions).map(o => o.value);
+  const ultimoNivel = MANIFESTO.niveis[MANIFESTO.niveis.length - 1];
+  const inicio = janela ? janela[0] : MANIFESTO.t0;
+  const fim = janela ? janela[1] : MANIFESTO.t0 + ultimoNivel.pontos * ultimoNivel.passo;
+  const n = escolherNivel(inicio, fim);
+
+  const tracos = await Promise.all(selecionadas.map(async id => {
+    const serie = MANIFESTO.series.find(s => s.id === id);
+    const dados = await carregarJanela(id, n, inicio, fim);
+    return {type: 'scattergl', mode: 'lines', name: serie.rotulo, x: dados.x, y: dados.y,
+            line: {width: 1}, connectgaps: false};
+  }));
+
+  await Plotly.react(grafico, tracos, {
+    uirevision: 'fixo',
+    margin: {t: 40, r: 20},
+    xaxis: {title: 'Data (UTC)'},
+    yaxis: {title: 'Temperatura (°C)'},
+    legend: {orientation: 'h'}
+  }, {responsive: true});
+
+  document.getElementById('status').textContent =
+    'Nível ' + n + ' de ' + (MANIFESTO.niveis.length - 1) + ' · ' + blocos.size + ' blocos em cache';
+}
+
+let espera = null;
+function aoMudarZoom(evento) {
+  if ('xaxis.range[0]' in evento) {
+    janela = [paraMs(evento['xaxis.range[0]']), paraMs(evento['xaxis.range[1]'])];
+  } else if ('xaxis.autorange' in evento) {
+    janela = null;
+  } else {
+    return;
+  }
+  clearTimeout(espera);
+  espera = setTimeout(desenhar, 150);
+}
+
+MANIFESTO.series.forEach((serie, i) => {
+  const opcao = new Option(serie.rotulo, serie.id, false, i < 5);
+  seletor.add(opcao);
+});
+document.getElementById('busca').addEventListener('input', evento => {
+  const termo = evento.target.value.toLowerCase();
+  Array.from(seletor.options).forEach(o => { o.hidden = !o.text.toLowerCase().includes(termo); });
+});
+seletor.addEventListener('change', desenhar);
+desenhar().then(() => grafico.on('plotly_relayout', aoMudarZoom));
+</script>
+</body>
+</html>
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description='Gera o relatório interativo das estações do INMET')
+    parser.add_argument('--dados', type=Path, default=PASTA_INMET, help='Pasta com os arquivos INMET_*.CSV')
+    parser.add_argument('--saida', type=Path, default=Path(__file__).resolve().parents[1] / 'reports')
+    parser.add_argument('--regiao', nargs='*', help='Siglas de região do INMET (N, NE, CO, SE, S)')
+    parser.add_argument('--uf', nargs='*', help='Siglas de UF')
+    args = parser.parse_args()
+
+    estacoes, df = carregar_estacoes_inmet(args.dados, regioes=args.regiao, estados=args.uf)
+    if df is None:
+        return
+
+    df = df.dropna(subset=['TEMPERATURA'])
+    rotulos = {
+        codigo: f"{linha['ESTADO']} - {linha['ESTACAO']} ({codigo})"
+        for codigo, linha in estacoes.iterrows()
+    }
+    gerar_relatorio_interativo(df, args.saida, rotulos=rotulos)
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
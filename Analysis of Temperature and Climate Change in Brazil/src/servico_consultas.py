@@ -0,0 +1,342 @@
+"""
+Serviço local de consultas agregadas sobre os dados horários do INMET.
+
+Os arquivos das estações são lidos uma única vez e ficam residentes em memória;
+cada consulta (medida, agrupamento e filtros) é respondida em JSON e o resultado
+fica em um cache LRU limitado pelo tamanho das respostas. Notebooks e relatórios
+consultam o mesmo processo aquecido em vez de recarregar os CSVs:
+
+    GET /consulta?medida=media&agrupar=ESTADO,HORA&mes=3
+    GET /consulta?medida=p95&agrupar=CODIGO&uf=SP,RJ
+    GET /estacoes
+    GET /estado
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+from data_processing import PASTA_INMET, VARIAVEIS_INMET, carregar_estacoes_inmet
+
+logger = logging.getLogger(__name__)
+
+PORTA_PADRAO = 8765
+
+# Tamanho máximo, em MB, das respostas guardadas no cache
+CACHE_MB_PADRAO = 64
+
+# Colunas de agrupamento (HORA, DIA, MES e ANO em UTC, como nos arquivos do INMET)
+AGRUPAMENTOS = ('REGIAO', 'ESTADO', 'CODIGO', 'ANO', 'MES', 'DIA', 'HORA', 'DIA_SEMANA')
+
+MEDIDAS = {
+    'media': 'mean',
+    'mediana': 'median',
+    'minima': 'min',
+    'maxima': 'max',
+    'desvio': 'std',
+    'contagem': 'count'
+}
+
+class CacheLRU:
+    """
+    Cache LRU limitado pela soma dos tamanhos, em bytes, dos valores guardados.
+
+    Valores maiores que o limite não são guardados; ao inserir, as entradas
+    usadas há mais tempo são descartadas até que o total caiba no limite.
+    """
+    def __init__(self, limite_bytes):
+        self.limite_bytes = limite_bytes
+        self.bytes = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave):
+        with self._trava:
+            valor = self._entradas.get(chave)
+            if valor is None:
+                self.faltas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave, valor):
+        tamanho = len(valor)
+        if tamanho > self.limite_bytes:
+            return
+        with self._trava:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            while self._entradas and self.bytes + tamanho > self.limite_bytes:
+                _, descartado = self._entradas.popitem(last=False)
+                self.bytes -= len(descartado)
+                self.descartes += 1
+            self._entradas[chave] = valor
+            self.bytes += tamanho
+
+    def estado(self):
+        with self._trava:
+            return {
+                'entradas': len(self._entradas),
+                'bytes': self.bytes,
+                'limite_bytes': self.limite_bytes,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'descartes': self.descartes
+            }
+
+def preparar_base(estacoes, df):
+    """
+    Monta a tabela residente: dados horários com região, UF e colunas de tempo.
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO (ver ``carregar_estacoes_inmet``)
+        df (pd.DataFrame): Dados horários com DATA, CODIGO e as variáveis
+
+    Returns:
+        pd.DataFrame: Dados com REGIAO, ESTADO, ANO, MES, DIA, HORA e DIA_SEMANA categóricos ou inteiros
+    """
+    base = df.copy()
+    codigos = base['CODIGO'].astype(str)
+    base['REGIAO'] = codigos.map(estacoes['REGIAO']).astype('category')
+    base['ESTADO'] = codigos.map(estacoes['ESTADO']).astype('category')
+    base['ANO'] = base['DATA'].dt.year.astype('int16')
+    base['MES'] = base['DATA'].dt.month.astype('int8')
+    base['DIA'] = base['DATA'].dt.day.astype('int8')
+    base['HORA'] = base['DATA'].dt.hour.astype('int8')
+    base['DIA_SEMANA'] = base['DATA'].dt.dayofweek.astype('int8')
+    return base
+
+def _lista(valor):
+    return [item.strip() for item in valor.split(',') if item.strip()] if valor else []
+
+def normalizar_consulta(parametros, variaveis):
+    """
+    Valida os parâmetros de uma consulta e os põe em forma canônica (chave do cache).
+
+    Args:
+        parametros (dict): Parâmetros da URL ({nome: valor})
+        variaveis (list): Variáveis disponíveis na tabela residente
+
+    Returns:
+        dict: medida, variavel, agrupar, inicio, fim, mes, hora, regiao, uf e estacao
+
+    Raises:
+        ValueError: Parâmetro desconhecido ou inválido
+    """
+    desconhecidos = set(parametros) - {
+        'medida', 'variavel', 'agrupar', 'inicio', 'fim', 'mes', 'hora', 'regiao', 'uf', 'estacao'
+    }
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    medida = parametros.get('medida', 'media').lower()
+    if medida not in MEDIDAS and not (medida[:1] == 'p' and medida[1:].isdigit() and int(medida[1:]) <= 100):
+        raise ValueError(f"Medida desconhecida: {medida} (opções: {', '.join(MEDIDAS)} ou p0-p100)")
+
+    variavel = parametros.get('variavel', 'TEMPERATURA').upper()
+    if variavel not in variaveis:
+        raise ValueError(f"Variável não carregada: {variavel} (disponíveis: {', '.join(variaveis)})")
+
+    agrupar = [coluna.upper() for coluna in _lista(parametros.get('agrupar'))]
+    invalidos = set(agrupar) - set(AGRUPAMENTOS)
+    if invalidos:
+        raise ValueError(f"Agrupamentos desconhecidos: {', '.join(sorted(invalidos))} (opções: {', '.join(AGRUPAMENTOS)})")
+
+    def datas(nome):
+        valor = parametros.get(nome)
+        return str(pd.Timestamp(valor).date()) if valor else None
+
+    return {
+        'medida': medida,
+        'variavel': variavel,
+        'agrupar': agrupar,
+        'inicio': datas('inicio'),
+        'fim': datas('fim'),
+        'mes': sorted(int(m) for m in _lista(parametros.get('mes'))),
+        'hora': sorted(int(h) for h in _lista(parametros.get('hora'))),
+        'regiao': sorted(r.upper() for r in _lista(parametros.get('regiao'))),
+        'uf': sorted(uf.upper() for uf in _lista(parametros.get('uf'))),
+        'estacao': sorted(e.upper() for e in _lista(parametros.get('estacao')))
+    }
+
+def executar_consulta(base, consulta):
+    """
+    Calcula uma consulta normalizada sobre a tabela residente.
+
+    Returns:
+        list: Um dict por grupo com as colunas de agrupamento, o valor e o número de registros
+    """
+    mascara = pd.Series(True, index=base.index)
+    if consulta['inicio']:
+        mascara &= base['DATA'] >= pd.Timestamp(consulta['inicio'])
+    if consulta['fim']:
+        mascara &= base['DATA'] < pd.Timestamp(consulta['fim']) + pd.Timedelta(days=1)
+    for coluna, chave in (('MES', 'mes'), ('HORA', 'hora'), ('REGIAO', 'regiao'),
+                          ('ESTADO', 'uf'), ('CODIGO', 'estacao')):
+        if consulta[chave]:
+            mascara &= base[coluna].isin(consulta[chave])
+
+    valores = base.loc[mascara, [*consulta['agrupar'], consulta['variavel']]].dropna()
+    medida = consulta['medida']
+
+    if consulta['agrupar']:
+        grupos = valores.groupby(consulta['agrupar'], observed=True)[consulta['variavel']]
+        if medida in MEDIDAS:
+            resultado = grupos.agg([MEDIDAS[medida], 'count'])
+        else:
+            resultado = pd.DataFrame({'valor': grupos.quantile(int(medida[1:]) / 100), 'count': grupos.count()})
+        resultado.columns = ['valor', 'registros']
+        resultado = resultado.reset_index()
+    else:
+        serie = valores[consulta['variavel']]
+        valor = getattr(serie, MEDIDAS[medida])() if medida in MEDIDAS else serie.quantile(int(medida[1:]) / 100)
+        resultado = pd.DataFrame({'valor': [valor], 'registros': [len(serie)]})
+
+    resultado = resultado.astype(object)
+    return resultado.where(resultado.notna(), None).to_dict('records')
+
+class ServicoConsultas:
+    """Tabela residente, cache de resultados e despacho das consultas"""
+
+    def __init__(self, estacoes, df, cache_mb=CACHE_MB_PADRAO):
+        inicio = time.perf_counter()
+        self.estacoes = estacoes
+        self.base = preparar_base(estacoes, df)
+        self.variaveis = [v for v in VARIAVEIS_INMET if v in self.base.columns]
+        self.cache = CacheLRU(int(cache_mb * 1024 ** 2))
+        logger.info(
+            f"Tabela residente: {len(self.base)} registros de {len(estacoes)} estações, "
+            f"{self.base.memory_usage(deep=True).sum() / 1024 ** 2:.0f} MB, "
+            f"preparada em {time.perf_counter() - inicio:.1f} s"
+        )
+
+    def consultar(self, parametros):
+        """Resposta JSON (bytes) de uma consulta, do cache quando possível"""
+        consulta = normalizar_consulta(parametros, self.variaveis)
+        chave = json.dumps(consulta, sort_keys=True)
+
+        resposta = self.cache.obter(chave)
+        if resposta is None:
+            inicio = time.perf_counter()
+            linhas = executar_consulta(self.base, consulta)
+            resposta = json.dumps(
+                {'consulta': consulta, 'linhas': linhas, 'segundos': time.perf_counter() - inicio},
+                ensure_ascii=False, default=str
+            ).encode()
+            self.cache.guardar(chave, resposta)
+        return resposta
+
+    def listar_estacoes(self):
+        estacoes = self.estacoes.reset_index().astype(object)
+        return json.dumps(
+            estacoes.where(estacoes.notna(), None).to_dict('records'), ensure_ascii=False, default=str
+        ).encode()
+
+    def estado(self):
+        # Cada consulta passa uma vez pelo cache: acertos e faltas são
+        # contados sob a trava do cache, seguros entre as threads do servidor
+        cache = self.cache.estado()
+        return json.dumps({
+            'registros': len(self.base),
+            'estacoes': len(self.estacoes),
+            'variaveis': self.variaveis,
+            'consultas': cache['acertos'] + cache['faltas'],
+            'cache': cache
+        }).encode()
+
+def _criar_manipulador(servico):
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            parametros = dict(urllib.parse.parse_qsl(url.query))
+            try:
+                if url.path == '/consulta':
+                    self._responder(200, servico.consultar(parametros))
+                elif url.path == '/estacoes':
+                    self._responder(200, servico.listar_estacoes())
+                elif url.path == '/estado':
+                    self._responder(200, servico.estado())
+                else:
+                    self._responder(404, json.dumps({'erro': f'Caminho desconhecido: {url.path}'}).encode())
+            except ValueError as e:
+                self._responder(400, json.dumps({'erro': str(e)}, ensure_ascii=False).encode())
+            except Exception as e:
+                logger.error(f"Erro ao responder {self.path}: {str(e)}")
+                self._responder(500, json.dumps({'erro': str(e)}, ensure_ascii=False).encode())
+
+        def _responder(self, status, corpo):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, formato, *args):
+            logger.debug(formato % args)
+
+    return Manipulador
+
+def servir(servico, host='127.0.0.1', porta=PORTA_PADRAO):
+    """Atende consultas HTTP até ser interrompido (uma thread por conexão)"""
+    servidor = ThreadingHTTPServer((host, porta), _criar_manipulador(servico))
+    logger.info(f"Serviço de consultas em http://{host}:{porta}/consulta")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+def consultar(url=f'http://127.0.0.1:{PORTA_PADRAO}', **parametros):
+    """
+    Cliente para notebooks: executa uma consulta no serviço e retorna um DataFrame.
+
+    Exemplo: ``consultar(medida='media', agrupar='ESTADO,HORA', mes=3)``
+    """
+    parametros = {
+        nome: ','.join(map(str, valor)) if isinstance(valor, (list, tuple)) else valor
+        for nome, valor in parametros.items()
+    }
+    endereco = f"{url.rstrip('/')}/consulta?{urllib.parse.urlencode(parametros)}"
+    with urllib.request.urlopen(endereco) as resposta:
+        return pd.DataFrame(json.loads(resposta.read())['linhas'])
+
+def main():
+    parser = argparse.ArgumentParser(description='Serviço local de consultas agregadas dos dados do INMET')
+    parser.add_argument('--dados', type=Path, default=PASTA_INMET, help='Pasta com os arquivos INMET_*.CSV')
+    parser.add_argument('--regiao', nargs='*', help='Siglas de região do INMET (N, NE, CO, SE, S) a carregar')
+    parser.add_argument('--uf', nargs='*', help='Siglas de UF a carregar')
+    parser.add_argument('--variaveis', nargs='*', default=['TEMPERATURA'], choices=VARIAVEIS_INMET,
+                        help='Variáveis horárias mantidas em memória')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--cache-mb', type=float, default=CACHE_MB_PADRAO,
+                        help='Tamanho máximo das respostas guardadas no cache')
+    parser.add_argument('--workers', type=int, default=1, help='Processos de leitura dos arquivos')
+    args = parser.parse_args()
+
+    estacoes, df = carregar_estacoes_inmet(
+        args.dados, regioes=args.regiao, estados=args.uf, variaveis=tuple(args.variaveis),
+        workers=args.workers
+    )
+    if df is None:
+        return
+    servir(ServicoConsultas(estacoes, df, args.cache_mb), args.host, args.porta)
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
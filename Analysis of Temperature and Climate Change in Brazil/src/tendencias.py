@@ -0,0 +1,316 @@
+"""
+Motor de tendências de longo prazo por estação e por região.
+
+As séries horárias são agregadas em médias mensais (anomalias em relação à
+climatologia de cada mês) ou anuais, organizadas em uma matriz (períodos x
+séries), e todas as séries são avaliadas de uma vez: tendência linear (OLS),
+teste de Mann-Kendall com correção para empates e estimador de Sen. As
+funções trabalham sobre colunas com lacunas (NaN) sem laços por estação
+(apenas blocos de colunas, para limitar a memória).
+"""
+
+import argparse
+import logging
+from math import erfc, sqrt
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import PASTA_INMET, SIGLAS_REGIOES, carregar_estacoes_inmet
+
+try:
+    from scipy.special import stdtr
+except ImportError:
+    stdtr = None
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIAS = {'mensal': 'MS', 'anual': 'YS'}
+
+# Fração mínima de horas com dados para que um mês/ano entre na série
+COBERTURA_MINIMA = 0.8
+
+# Períodos mínimos com dados para estimar a tendência de uma série
+PERIODOS_MINIMOS = 8
+
+# Nível de significância do teste de Mann-Kendall
+ALFA = 0.05
+
+# Pares de períodos x séries avaliados de uma vez no Mann-Kendall e no Sen
+BLOCO_PARES = 20_000_000
+
+_erfc = np.vectorize(erfc, otypes=[float])
+
+def _p_bilateral(z):
+    """Valor-p bilateral de uma estatística normal padrão"""
+    return _erfc(np.abs(z) / sqrt(2))
+
+def agregar_series(estacoes, df, frequencia='mensal', coluna='TEMPERATURA', cobertura=COBERTURA_MINIMA):
+    """
+    Agrega os dados horários em uma matriz de médias por período.
+
+    Meses (ou anos) com menos de ``cobertura`` das horas com dados ficam NaN.
+    Na frequência mensal, cada valor é a anomalia em relação à média daquele
+    mês do ano na própria estação, removendo o ciclo sazonal.
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO
+        df (pd.DataFrame): Dados longos com DATA, CODIGO e ``coluna``
+        frequencia (str): 'mensal' ou 'anual'
+
+    Returns:
+        pd.DataFrame: Períodos (índice) x estações (colunas)
+    """
+    if frequencia not in FREQUENCIAS:
+        raise ValueError(f"Frequência desconhecida: {frequencia}. Use um de {', '.join(FREQUENCIAS)}")
+
+    dados = df.dropna(subset=[coluna])
+    periodo = dados['DATA'].dt.to_period('M' if frequencia == 'mensal' else 'Y').dt.to_timestamp()
+    grupos = dados.groupby([periodo.rename('PERIODO'), dados['CODIGO'].astype(str)], observed=True)[coluna]
+    agregados = grupos.agg(['mean', 'count'])
+
+    # Horas esperadas em cada período, para a cobertura mínima
+    inicios = agregados.index.get_level_values('PERIODO')
+    fins = inicios + (pd.DateOffset(months=1) if frequencia == 'mensal' else pd.DateOffset(years=1))
+    horas = (fins - inicios) / pd.Timedelta(hours=1)
+    agregados.loc[agregados['count'].to_numpy() < cobertura * np.asarray(horas), 'mean'] = np.nan
+
+    matriz = agregados['mean'].unstack('CODIGO')
+    matriz = matriz.reindex(
+        index=pd.date_range(matriz.index.min(), matriz.index.max(), freq=FREQUENCIAS[frequencia]),
+        columns=[c for c in estacoes.index if c in matriz.columns]
+    )
+    if frequencia == 'mensal':
+        matriz = matriz - matriz.groupby(matriz.index.month).transform('mean')
+    return matriz
+
+def _tempo_em_anos(indice):
+    indice = pd.DatetimeIndex(indice)
+    return (indice.year + (indice.dayofyear - 1) / 365.25).to_numpy(dtype=float)
+
+def tendencia_ols(t, Y):
+    """
+    Regressão linear de cada coluna de ``Y`` contra ``t``, ignorando lacunas.
+
+    Returns:
+        dict: Arrays por coluna com inclinacao, intercepto, r2, p e n
+    """
+    validos = ~np.isnan(Y)
+    n = validos.sum(axis=0).astype(float)
+    T = np.where(validos, t[:, None], 0.0)
+    Yv = np.where(validos, Y, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media_t, media_y = T.sum(axis=0) / n, Yv.sum(axis=0) / n
+        dt = np.where(validos, t[:, None] - media_t, 0.0)
+        dy = np.where(validos, Y - media_y, 0.0)
+        sxx, sxy, syy = (dt ** 2).sum(axis=0), (dt * dy).sum(axis=0), (dy ** 2).sum(axis=0)
+        inclinacao = sxy / sxx
+        r2 = sxy ** 2 / (sxx * syy)
+        erro = np.sqrt(np.maximum(syy - inclinacao * sxy, 0) / (n - 2) / sxx)
+        estatistica = inclinacao / erro
+
+    estatistica = np.nan_to_num(estatistica, nan=0.0)
+    if stdtr is not None:
+        p = 2 * stdtr(np.maximum(n - 2, 1), -np.abs(estatistica))
+    else:
+        # Sem scipy, aproximação normal da distribuição t (boa a partir de ~30 períodos)
+        p = _p_bilateral(estatistica)
+    return {
+        'inclinacao': inclinacao,
+        'intercepto': media_y - inclinacao * media_t,
+        'r2': r2,
+        'p': p,
+        'n': n.astype(int)
+    }
+
+def _pares(n):
+    """Índices (i, j), i < j, de todos os pares de ``n`` períodos"""
+    return np.triu_indices(n, k=1)
+
+def _blocos_colunas(n_pares, n_colunas):
+    passo = max(1, BLOCO_PARES // max(1, n_pares))
+    return [slice(inicio, inicio + passo) for inicio in range(0, n_colunas, passo)]
+
+def _variancia_empates(Y):
+    """
+    Variância de S de Mann-Kendall com a correção para empates, por coluna,
+    vetorizada sobre todas as colunas: grupos de valores repetidos são
+    identificados nas colunas ordenadas.
+    """
+    validos = ~np.isnan(Y)
+    n = validos.sum(axis=0).astype(float)
+    ordenados = np.sort(Y, axis=0)  # NaN ao final de cada coluna
+
+    # Percorre as colunas em sequência: um grupo termina quando o valor muda
+    # ou a coluna acaba; NaN nunca forma grupo
+    valores = ordenados.T.ravel()
+    colunas = np.repeat(np.arange(Y.shape[1]), Y.shape[0])
+    mudou = np.ones(len(valores), dtype=bool)
+    mudou[1:] = (valores[1:] != valores[:-1]) | (colunas[1:] != colunas[:-1])
+    inicios = np.flatnonzero(mudou)
+    tamanhos = np.diff(np.append(inicios, len(valores))).astype(float)
+    em_grupo = (tamanhos > 1) & ~np.isnan(valores[inicios])
+    correcao = np.bincount(
+        colunas[inicios[em_grupo]],
+        weights=tamanhos[em_grupo] * (tamanhos[em_grupo] - 1) * (2 * tamanhos[em_grupo] + 5),
+        minlength=Y.shape[1]
+    )
+    return (n * (n - 1) * (2 * n + 5) - correcao) / 18
+
+def mann_kendall(Y):
+    """
+    Teste de Mann-Kendall de cada coluna de ``Y`` (períodos em ordem), ignorando lacunas.
+
+    Returns:
+        dict: Arrays por coluna com s, z, p e tau
+    """
+    i, j = _pares(Y.shape[0])
+    s = np.zeros(Y.shape[1])
+    comparaveis = np.zeros(Y.shape[1])
+    for bloco in _blocos_colunas(len(i), Y.shape[1]):
+        diferencas = Y[j, bloco] - Y[i, bloco]
+        s[bloco] = np.nansum(np.sign(diferencas), axis=0)
+        comparaveis[bloco] = (~np.isnan(diferencas)).sum(axis=0)
+
+    variancia = _variancia_empates(Y)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.where(s > 0, (s - 1) / np.sqrt(variancia), np.where(s < 0, (s + 1) / np.sqrt(variancia), 0.0))
+        tau = s / comparaveis
+    z = np.where(variancia > 0, z, np.nan)
+    return {'s': s, 'z': z, 'p': _p_bilateral(np.nan_to_num(z, nan=0.0)), 'tau': tau}
+
+def inclinacao_sen(t, Y):
+    """
+    Estimador de Sen (mediana das inclinações entre todos os pares) de cada coluna.
+
+    As inclinações dos n(n-1)/2 pares de um bloco de colunas (tamanho limitado
+    por ``BLOCO_PARES``) são calculadas de uma vez, uma linha por coluna, e a
+    mediana é obtida por seleção (``np.partition``) em vez de ordenação:
+    O(n²) por coluna em tempo e memória, contra O(n² log n) ordenando. As
+    lacunas de cada coluna são divididas entre -inf e +inf, o que coloca a
+    mediana das inclinações válidas de toda coluna nas duas posições centrais
+    do bloco; uma única seleção na posição central basta, e a posição anterior
+    é o máximo da metade inferior.
+
+    Returns:
+        np.ndarray: Inclinação por coluna, em unidades de ``Y`` por unidade de ``t``
+    """
+    i, j = _pares(len(t))
+    intervalos = t[j] - t[i]
+    inclinacoes = np.full(Y.shape[1], np.nan)
+    if len(i) == 0:
+        return inclinacoes
+
+    centro = len(i) // 2
+    for bloco in _blocos_colunas(len(i), Y.shape[1]):
+        # Uma linha contígua por coluna: a seleção percorre memória sequencial
+        colunas = np.ascontiguousarray(Y[:, bloco].T)
+        pares = np.take(colunas, j, axis=1)
+        pares -= np.take(colunas, i, axis=1)
+        pares /= intervalos
+        lacunas = np.isnan(pares)
+        quantidade = len(i) - lacunas.sum(axis=1)
+        abaixo = (len(i) - quantidade) // 2
+        if lacunas.any():
+            pares[lacunas] = np.inf
+            pares[lacunas & (np.cumsum(lacunas, axis=1, dtype=np.int32) <= abaixo[:, None])] = -np.inf
+
+        # Posições da mediana das válidas: ambas em {centro - 1, centro}
+        pares.partition(centro, axis=1)
+        central = pares[:, centro]
+        anterior = pares[:, :centro].max(axis=1) if centro > 0 else central
+        menor = (np.maximum(quantidade, 1) - 1) // 2 + abaixo
+        maior = quantidade // 2 + abaixo
+        mediana = (
+            np.where(maior == centro, central, anterior) + np.where(menor == centro, central, anterior)
+        ) / 2
+        inclinacoes[bloco] = np.where(quantidade > 0, mediana, np.nan)
+    return inclinacoes
+
+def avaliar_tendencias(matriz, periodos_minimos=PERIODOS_MINIMOS, alfa=ALFA):
+    """
+    Avalia todas as séries (colunas) de uma matriz períodos x séries em uma só chamada.
+
+    Returns:
+        pd.DataFrame: Uma linha por série com n, tendências em unidades por
+        década (OLS e Sen), r² e p da regressão, S, Z, tau e p de Mann-Kendall
+        e a indicação de significância
+    """
+    t = _tempo_em_anos(matriz.index)
+    Y = matriz.to_numpy(dtype=float)
+    ols = tendencia_ols(t, Y)
+    mk = mann_kendall(Y)
+    sen = inclinacao_sen(t, Y)
+
+    tabela = pd.DataFrame({
+        'n': ols['n'],
+        'ols_por_decada': ols['inclinacao'] * 10,
+        'r2': ols['r2'],
+        'p_ols': ols['p'],
+        'sen_por_decada': sen * 10,
+        'mk_s': mk['s'],
+        'mk_z': mk['z'],
+        'mk_tau': mk['tau'],
+        'mk_p': mk['p']
+    }, index=matriz.columns)
+    insuficientes = tabela['n'] < periodos_minimos
+    tabela.loc[insuficientes, tabela.columns.drop('n')] = np.nan
+    tabela['significativa'] = tabela['mk_p'] < alfa
+    return tabela
+
+def calcular_tendencias(estacoes, df, frequencia='mensal', coluna='TEMPERATURA'):
+    """
+    Tendências por estação e por região.
+
+    A série de cada região é a média das séries das suas estações no período
+    (anomalias, na frequência mensal).
+
+    Returns:
+        tuple: (tabela por estação com metadados, tabela por região)
+    """
+    matriz = agregar_series(estacoes, df, frequencia, coluna)
+    logger.info(f"Avaliando {matriz.shape[1]} estações em {matriz.shape[0]} períodos ({frequencia})")
+
+    por_estacao = avaliar_tendencias(matriz)
+    por_estacao = estacoes[['ESTACAO', 'ESTADO', 'REGIAO', 'LATITUDE', 'LONGITUDE']].join(
+        por_estacao, how='inner'
+    )
+
+    regioes = estacoes.loc[matriz.columns, 'REGIAO'].map(lambda r: SIGLAS_REGIOES.get(r, r))
+    matriz_regioes = matriz.T.groupby(regioes.to_numpy()).mean().T
+    por_regiao = avaliar_tendencias(matriz_regioes)
+    por_regiao['estacoes'] = regioes.value_counts()
+    return por_estacao, por_regiao
+
+def main():
+    parser = argparse.ArgumentParser(description='Tendências de temperatura por estação e região (OLS, Mann-Kendall, Sen)')
+    parser.add_argument('--dados', type=Path, default=PASTA_INMET, help='Pasta com os arquivos INMET_*.CSV')
+    parser.add_argument('--saida', type=Path, default=Path(__file__).resolve().parents[1] / 'reports' / 'tendencias')
+    parser.add_argument('--regiao', nargs='*', help='Siglas de região do INMET (N, NE, CO, SE, S)')
+    parser.add_argument('--uf', nargs='*', help='Siglas de UF')
+    parser.add_argument('--frequencia', choices=FREQUENCIAS, default='mensal')
+    parser.add_argument('--workers', type=int, default=1, help='Processos de leitura dos arquivos')
+    args = parser.parse_args()
+
+    from visualization import plot_mapa_tendencias, plot_ranking_tendencias
+
+    estacoes, df = carregar_estacoes_inmet(args.dados, regioes=args.regiao, estados=args.uf, workers=args.workers)
+    if df is None:
+        return
+
+    por_estacao, por_regiao = calcular_tendencias(estacoes, df, args.frequencia)
+    args.saida.mkdir(parents=True, exist_ok=True)
+    por_estacao.sort_values('sen_por_decada', ascending=False).to_csv(
+        args.saida / f'tendencias_estacoes_{args.frequencia}.csv', sep=';'
+    )
+    por_regiao.to_csv(args.saida / f'tendencias_regioes_{args.frequencia}.csv', sep=';')
+    logger.info(f"Tendências por região ({args.frequencia}, °C/década):\n{por_regiao.round(3)}")
+
+    plot_mapa_tendencias(por_estacao, args.saida, f'mapa_tendencias_{args.frequencia}.png')
+    plot_ranking_tendencias(por_estacao, args.saida, f'ranking_tendencias_{args.frequencia}.png')
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
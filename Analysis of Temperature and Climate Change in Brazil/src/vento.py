@@ -0,0 +1,348 @@
+"""
+Estatísticas circulares do vento e rosas dos ventos por estação.
+
+Direção (de onde o vento sopra, em graus a partir do norte) e velocidade
+horárias de todas as estações são reduzidas em uma única passagem: cada
+observação recebe um grupo (estação x mês x hora) e uma classe (setor de
+direção x faixa de velocidade), e as somas de seno e cosseno, as contagens, as
+velocidades e o histograma direção x velocidade são acumulados com
+``np.bincount``. Média circular, comprimento resultante e rosas dos ventos de
+qualquer recorte (estação, meses, horas) saem desses agregados por soma, sem
+reler as observações; as rosas são desenhadas diretamente dos histogramas.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from data_processing import PASTA_INMET, arquivos_inmet, carregar_estacoes_inmet, ler_cabecalho_inmet
+from instrumentacao import medir_etapa
+
+logger = logging.getLogger(__name__)
+
+VARIAVEIS_VENTO = ('VENTO_DIRECAO', 'VENTO_VELOCIDADE', 'VENTO_RAJADA')
+
+# Setores de direção da rosa (16: N, NNE, NE, ...)
+SETORES = 16
+
+# Limites das faixas de velocidade (m/s); abaixo do primeiro é calmaria, sem
+# direção definida, e não entra nas estatísticas circulares nem na rosa
+FAIXAS_VELOCIDADE = (0.5, 2.0, 4.0, 6.0, 8.0, 10.0)
+
+MESES = 12
+HORAS = 24
+
+# Eixos dos agregados, na ordem das dimensões dos arrays
+EIXOS = ('CODIGO', 'MES', 'HORA')
+
+# Somas acumuladas por grupo (estação x mês x hora)
+SOMAS = ('n', 'calmaria', 'cos', 'sen', 'u', 'v', 'velocidade')
+
+def rotulos_faixas(faixas=FAIXAS_VELOCIDADE):
+    """Rótulos das faixas de velocidade da rosa (sem a calmaria)"""
+    return [f'{inicio:g}-{fim:g} m/s' for inicio, fim in zip(faixas[:-1], faixas[1:])] + [f'≥ {faixas[-1]:g} m/s']
+
+@medir_etapa
+def agregar_vento(estacoes, df, setores=SETORES, faixas=FAIXAS_VELOCIDADE):
+    """
+    Reduz as observações horárias aos agregados por estação, mês e hora.
+
+    Horas e meses seguem o horário UTC dos arquivos do INMET.
+
+    Args:
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO
+        df (pd.DataFrame): Dados longos com DATA, CODIGO, VENTO_DIRECAO,
+            VENTO_VELOCIDADE e, opcionalmente, VENTO_RAJADA
+        setores (int): Setores de direção da rosa
+        faixas (tuple): Limites das faixas de velocidade (m/s)
+
+    Returns:
+        dict: 'estacoes' (códigos), 'meses', 'horas', 'faixas', as ``SOMAS``
+        (arrays estações x 12 x 24), 'rajada' (máxima, NaN sem dados) e 'histograma' (estações x
+        12 x 24 x setores x faixas)
+    """
+    codigos = pd.Index(estacoes.index.astype(str))
+    direcao = df['VENTO_DIRECAO'].to_numpy(dtype=float)
+    velocidade = df['VENTO_VELOCIDADE'].to_numpy(dtype=float)
+
+    # Posição da estação de cada observação, convertendo cada código uma só vez
+    categorias = df['CODIGO'].astype('category')
+    estacao = codigos.get_indexer(categorias.cat.categories.astype(str))[categorias.cat.codes.to_numpy()]
+    estacao[categorias.cat.codes.to_numpy() < 0] = -1
+
+    datas = df['DATA'].to_numpy(dtype='datetime64[h]')
+    mes = datas.astype('datetime64[M]').astype(int) % MESES
+    hora = (datas - datas.astype('datetime64[D]')).astype(int)
+    grupo = (estacao * MESES + mes) * HORAS + hora
+    grupos = len(codigos) * MESES * HORAS
+
+    validas = (estacao >= 0) & np.isfinite(direcao) & np.isfinite(velocidade) & (velocidade >= 0)
+    grupo_validas = grupo[validas]
+    direcao, velocidade = direcao[validas], velocidade[validas]
+    calmaria = velocidade < faixas[0]
+    angulo = np.radians(direcao)
+    cos, sen = np.where(calmaria, 0.0, np.cos(angulo)), np.where(calmaria, 0.0, np.sin(angulo))
+
+    def somar(pesos=None):
+        return np.bincount(grupo_validas, weights=pesos, minlength=grupos).reshape(len(codigos), MESES, HORAS)
+
+    agregados = {
+        'estacoes': codigos.to_numpy(),
+        'meses': np.arange(1, MESES + 1),
+        'horas': np.arange(HORAS),
+        'faixas': np.asarray(faixas, dtype=float),
+        'n': somar().astype(np.int64),
+        'calmaria': somar(calmaria.astype(float)).astype(np.int64),
+        'cos': somar(cos),
+        'sen': somar(sen),
+        'u': somar(velocidade * cos),
+        'v': somar(velocidade * sen),
+        'velocidade': somar(velocidade)
+    }
+
+    # Setor centrado em cada direção (o setor 0 vai de -meio setor a +meio setor do norte)
+    largura = 360 / setores
+    setor = (np.floor(((direcao + largura / 2) % 360) / largura)).astype(np.int64)
+    faixa = np.searchsorted(np.asarray(faixas), velocidade, side='right') - 1
+    classe = grupo_validas[~calmaria] * (setores * len(faixas)) + setor[~calmaria] * len(faixas) + faixa[~calmaria]
+    agregados['histograma'] = np.bincount(classe, minlength=grupos * setores * len(faixas)).astype(
+        np.int32
+    ).reshape(len(codigos), MESES, HORAS, setores, len(faixas))
+
+    rajada = np.full(grupos, np.nan)
+    if 'VENTO_RAJADA' in df.columns:
+        valores = df['VENTO_RAJADA'].to_numpy(dtype=float)
+        com_rajada = (estacao >= 0) & np.isfinite(valores)
+        np.fmax.at(rajada, grupo[com_rajada], valores[com_rajada])
+    agregados['rajada'] = rajada.reshape(len(codigos), MESES, HORAS)
+
+    logger.info(
+        f"Vento agregado: {int(validas.sum())} observações de {len(codigos)} estações "
+        f"({int(calmaria.sum())} calmarias)"
+    )
+    return agregados
+
+def recortar(agregados, estacoes=None, meses=None, horas=None):
+    """
+    Restringe os agregados a estações, meses (1-12) e horas UTC (0-23).
+
+    Returns:
+        dict: Agregados com as mesmas chaves, nos eixos selecionados
+    """
+    selecao = {'estacoes': [str(e) for e in estacoes] if estacoes is not None else None,
+               'meses': meses, 'horas': horas}
+    recorte = dict(agregados)
+    for eixo, (chave_eixo, valores) in enumerate(selecao.items()):
+        if valores is None:
+            continue
+        indice = pd.Index(agregados[chave_eixo]).get_indexer(list(valores))
+        if (indice < 0).any():
+            raise ValueError(f"Valores ausentes dos agregados de vento ({chave_eixo})")
+        for chave in (*SOMAS, 'rajada', 'histograma'):
+            recorte[chave] = np.take(recorte[chave], indice, axis=eixo)
+        recorte[chave_eixo] = agregados[chave_eixo][indice]
+    return recorte
+
+def _reduzir(agregados, por):
+    """Soma os agregados nos eixos fora de ``por``; retorna (somas, rajada, histograma)"""
+    desconhecidos = set(por) - set(EIXOS)
+    if desconhecidos:
+        raise ValueError(f"Eixos desconhecidos: {', '.join(sorted(desconhecidos))}. Use {', '.join(EIXOS)}")
+    eixos = tuple(i for i, nome in enumerate(EIXOS) if nome not in por)
+    somas = {chave: agregados[chave].sum(axis=eixos) for chave in SOMAS}
+    with np.errstate(all='ignore'):
+        rajada = np.fmax.reduce(agregados['rajada'], axis=eixos) if eixos else agregados['rajada']
+    return somas, rajada, agregados['histograma'].sum(axis=eixos)
+
+def estatisticas_circulares(somas):
+    """
+    Estatísticas circulares a partir das somas (arrays de mesma forma).
+
+    Calmarias contam no total e na velocidade média, mas não nas direções.
+
+    Returns:
+        dict: direcao_media (graus, de onde sopra), comprimento_resultante
+        (0 a 1), desvio_circular (graus), velocidade_media, velocidade_vetorial,
+        direcao_vetorial, constancia (vetorial sobre escalar) e fracao_calmaria
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        direcionais = somas['n'] - somas['calmaria']
+        comprimento = np.hypot(somas['cos'], somas['sen']) / direcionais
+        velocidade_media = somas['velocidade'] / somas['n']
+        velocidade_vetorial = np.hypot(somas['u'], somas['v']) / somas['n']
+        return {
+            'direcao_media': np.degrees(np.arctan2(somas['sen'], somas['cos'])) % 360,
+            'comprimento_resultante': comprimento,
+            'desvio_circular': np.degrees(np.sqrt(-2 * np.log(np.clip(comprimento, 1e-12, 1)))),
+            'velocidade_media': velocidade_media,
+            'velocidade_vetorial': velocidade_vetorial,
+            'direcao_vetorial': np.degrees(np.arctan2(somas['v'], somas['u'])) % 360,
+            'constancia': velocidade_vetorial / velocidade_media,
+            'fracao_calmaria': somas['calmaria'] / somas['n']
+        }
+
+def tabela_vento(agregados, por=('CODIGO',), estacoes=None):
+    """
+    Estatísticas do vento agrupadas por estação, mês e/ou hora.
+
+    Args:
+        agregados (dict): Resultado de ``agregar_vento`` (ou ``recortar``)
+        por (tuple): Eixos mantidos, entre ``EIXOS``; os demais são somados
+        estacoes (pd.DataFrame): Metadados juntados quando ``por`` inclui CODIGO
+
+    Returns:
+        pd.DataFrame: Uma linha por grupo com observações, com n, as
+        estatísticas circulares e a rajada máxima
+    """
+    por = [eixo for eixo in EIXOS if eixo in por]
+    somas, rajada, _ = _reduzir(agregados, por)
+    valores = {'n': somas['n'], **estatisticas_circulares(somas), 'rajada_maxima': rajada}
+
+    niveis = {'CODIGO': agregados['estacoes'], 'MES': agregados['meses'], 'HORA': agregados['horas']}
+    if por:
+        indice = pd.MultiIndex.from_product([niveis[eixo] for eixo in por], names=por)
+        tabela = pd.DataFrame({coluna: np.ravel(valor) for coluna, valor in valores.items()}, index=indice)
+        if len(por) == 1:
+            tabela.index = indice.get_level_values(0)
+    else:
+        tabela = pd.DataFrame({coluna: [float(valor)] for coluna, valor in valores.items()})
+    tabela = tabela[tabela['n'] > 0]
+
+    if estacoes is not None and 'CODIGO' in por:
+        metadados = estacoes[['ESTACAO', 'ESTADO', 'REGIAO', 'LATITUDE', 'LONGITUDE']]
+        tabela = tabela.join(metadados.set_axis(metadados.index.astype(str)))
+    return tabela
+
+def frequencias_rosa(agregados, por=('CODIGO',)):
+    """
+    Frequências (% do total de observações, calmarias incluídas no total) de
+    cada setor x faixa de velocidade.
+
+    Returns:
+        tuple: (frequências com forma (grupos de ``por``..., setores, faixas),
+        fração de calmaria de cada grupo em %)
+    """
+    por = [eixo for eixo in EIXOS if eixo in por]
+    somas, _, histograma = _reduzir(agregados, por)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        total = somas['n'][..., None, None]
+        return 100 * histograma / total, 100 * somas['calmaria'] / somas['n']
+
+def poligonos_rosas(frequencias, centros, raio=0.45, escala=None, largura_setor=0.85, pontos_arco=6):
+    """
+    Vértices das cunhas de várias rosas dos ventos, para uma única coleção de polígonos.
+
+    O norte fica para cima e as direções crescem no sentido horário; as faixas
+    de velocidade são empilhadas do centro para fora.
+
+    Args:
+        frequencias (np.ndarray): (rosas, setores, faixas)
+        centros (np.ndarray): (rosas, 2) com a posição de cada rosa
+        raio (float): Raio que corresponde à ``escala``
+        escala (np.ndarray | float): Frequência no raio máximo de cada rosa;
+            padrão: o maior setor de cada rosa
+        largura_setor (float): Fração do setor ocupada pela cunha
+        pontos_arco (int): Pontos de cada arco
+
+    Returns:
+        tuple: (vértices (cunhas, 2 * pontos_arco, 2), faixa de cada cunha)
+    """
+    rosas, setores, faixas = frequencias.shape
+    frequencias = np.nan_to_num(frequencias)
+    externos = np.cumsum(frequencias, axis=2)
+    if escala is None:
+        escala = externos[:, :, -1].max(axis=1)
+    escala = np.where(np.asarray(escala, dtype=float) > 0, escala, 1.0)
+    escala = np.broadcast_to(escala, (rosas,))[:, None, None]
+    externos = raio * externos / escala
+    internos = np.concatenate([np.zeros((rosas, setores, 1)), externos[:, :, :-1]], axis=2)
+
+    meia = np.pi / setores * largura_setor
+    angulos = (2 * np.pi * np.arange(setores) / setores)[:, None] + np.linspace(-meia, meia, pontos_arco)
+    seno, cosseno = np.sin(angulos)[None, :, None, :], np.cos(angulos)[None, :, None, :]
+    raios = np.concatenate([
+        np.broadcast_to(externos[..., None], (rosas, setores, faixas, pontos_arco)),
+        np.broadcast_to(internos[..., None], (rosas, setores, faixas, pontos_arco))[..., ::-1]
+    ], axis=3)
+    seno = np.concatenate([seno, seno[..., ::-1]], axis=3)
+    cosseno = np.concatenate([cosseno, cosseno[..., ::-1]], axis=3)
+    vertices = np.stack([
+        centros[:, 0, None, None, None] + raios * seno,
+        centros[:, 1, None, None, None] + raios * cosseno
+    ], axis=-1)
+
+    # Cunhas vazias não são desenhadas
+    visiveis = (frequencias > 0).reshape(-1)
+    faixa = np.broadcast_to(np.arange(faixas), (rosas, setores, faixas)).reshape(-1)
+    return vertices.reshape(-1, 2 * pontos_arco, 2)[visiveis], faixa[visiveis]
+
+def salvar_agregados(agregados, caminho):
+    """Grava os agregados em um .npz comprimido"""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(caminho, **{**agregados, 'estacoes': agregados['estacoes'].astype(str)})
+    logger.info(f"Agregados de vento gravados em {caminho} ({caminho.stat().st_size / 1024:.0f} KB)")
+    return caminho
+
+def carregar_agregados(caminho):
+    """Lê os agregados gravados por ``salvar_agregados``"""
+    with np.load(caminho) as arquivo:
+        return {chave: arquivo[chave] for chave in arquivo.files}
+
+def ler_estacoes(pasta_dados=PASTA_INMET, regioes=None, estados=None):
+    """Estações selecionadas, só pelos cabeçalhos dos arquivos (para reusar agregados)"""
+    estacoes = pd.DataFrame([ler_cabecalho_inmet(arquivo) for arquivo in arquivos_inmet(pasta_dados)])
+    if estacoes.empty:
+        return None
+    if regioes:
+        estacoes = estacoes[estacoes['REGIAO'].isin(regioes)]
+    if estados:
+        estacoes = estacoes[estacoes['ESTADO'].isin(estados)]
+    return estacoes.drop_duplicates('CODIGO').set_index('CODIGO')
+
+def main():
+    parser = argparse.ArgumentParser(description='Estatísticas circulares do vento e rosas dos ventos das estações do INMET')
+    parser.add_argument('--dados', type=Path, default=PASTA_INMET, help='Pasta com os arquivos INMET_*.CSV')
+    parser.add_argument('--saida', type=Path, default=Path(__file__).resolve().parents[1] / 'reports' / 'vento')
+    parser.add_argument('--regiao', nargs='*', help='Siglas de região do INMET (N, NE, CO, SE, S)')
+    parser.add_argument('--uf', nargs='*', help='Siglas de UF')
+    parser.add_argument('--meses', nargs='*', type=int, help='Meses das rosas e da tabela (1-12)')
+    parser.add_argument('--horas', nargs='*', type=int, help='Horas UTC das rosas e da tabela (0-23)')
+    parser.add_argument('--por-folha', type=int, default=100, help='Rosas por folha')
+    parser.add_argument('--reusar', action='store_true',
+                        help='Usa os agregados gravados em --saida em vez de reler os arquivos')
+    parser.add_argument('--workers', type=int, default=1, help='Processos de leitura dos arquivos')
+    args = parser.parse_args()
+
+    from visualization import plot_folhas_rosas_ventos
+
+    caminho_agregados = args.saida / 'agregados_vento.npz'
+    if args.reusar and caminho_agregados.exists():
+        estacoes = ler_estacoes(args.dados, args.regiao, args.uf)
+        agregados = carregar_agregados(caminho_agregados)
+        estacoes = estacoes[estacoes.index.isin(agregados['estacoes'])]
+        agregados = recortar(agregados, estacoes=estacoes.index)
+    else:
+        estacoes, df = carregar_estacoes_inmet(
+            args.dados, regioes=args.regiao, estados=args.uf, variaveis=VARIAVEIS_VENTO, workers=args.workers
+        )
+        if df is None:
+            return
+        agregados = agregar_vento(estacoes, df)
+        salvar_agregados(agregados, caminho_agregados)
+        del df
+
+    agregados = recortar(agregados, meses=args.meses, horas=args.horas)
+    tabela = tabela_vento(agregados, ('CODIGO',), estacoes)
+    tabela.round(3).to_csv(args.saida / 'vento_estacoes.csv', sep=';')
+    tabela_vento(agregados, ('CODIGO', 'MES')).round(3).to_csv(args.saida / 'vento_estacoes_meses.csv', sep=';')
+    tabela_vento(agregados, ('CODIGO', 'HORA')).round(3).to_csv(args.saida / 'vento_estacoes_horas.csv', sep=';')
+
+    plot_folhas_rosas_ventos(agregados, estacoes, args.saida, por_folha=args.por_folha)
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -4,20 +4,227 @@ Contém funções para gerar gráficos e visualizações interativas.
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 import numpy as np
+import functools
+import importlib
+import io
 import logging
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from instrumentacao import medir_etapa, registrar_saida, registrar_saida_adiada
+from perfis_saida import PERFIS_SAIDA, definir_perfil_saida, obter_perfil_saida
 
 logger = logging.getLogger(__name__)
 
+class _ModuloTardio:
+    """
+    Importa um módulo no primeiro acesso a um de seus atributos.
+
+    O matplotlib e o seaborn (que traz o scipy.stats) respondem pela maior
+    parte do tempo de importação deste módulo; com o carregamento tardio,
+    processos que só usam os perfis ou os agregados não pagam esse custo.
+    """
+    def __init__(self, nome):
+        self._nome = nome
+        self._modulo = None
+
+    def __getattr__(self, atributo):
+        if self._modulo is None:
+            self._modulo = importlib.import_module(self._nome)
+        return getattr(self._modulo, atributo)
+
+plt = _ModuloTardio('matplotlib.pyplot')
+sns = _ModuloTardio('seaborn')
+
+_estilo_configurado = False
+
+# Formatos codificados pelo PIL a partir do buffer RGBA da figura
+FORMATOS_RASTER = {'png': 'PNG', 'webp': 'WEBP'}
+
+# Gravação em segundo plano: a figura é rasterizada em memória e a codificação
+# PNG/WebP (zlib e libwebp liberam o GIL) corre em threads enquanto o próximo
+# gráfico é desenhado; no máximo ``limite`` imagens aguardam gravação
+_gravacao = {'executor': None, 'workers': 0, 'limite': 0, 'pendentes': deque()}
+
+# Modelos de figura reaproveitados entre entidades: {nome: (fig, artistas)}
+_modelos = {}
+
+# Modo anomalia do gráfico em andamento (ver ``aceita_anomalia``)
+_modo = {'anomalia': False}
+
+TIPOS_ESTADO_CAPITAL = ['ESTADO', 'CAPITAL']
+
+# Mesma ordem (alfabética) produzida pelo pivot_table
+DIAS_SEMANA = sorted(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
+
 def configurar_estilo():
-    """Configura o estilo dos gráficos"""
+    """Configura o estilo dos gráficos (uma única vez por processo)"""
+    global _estilo_configurado
+    if _estilo_configurado:
+        return
     sns.set_style("whitegrid")
     plt.rcParams['figure.figsize'] = (12, 6)
     plt.rcParams['axes.titlesize'] = 14
     plt.rcParams['axes.labelsize'] = 12
+    _estilo_configurado = True
+
+def obter_modelo(nome, construtor):
+    """
+    Retorna o modelo de figura ``nome``, construindo-o na primeira chamada.
+
+    Gráficos com o mesmo layout para todas as entidades (por exemplo, um por
+    UF) constroem figura, eixos, localizadores e legenda uma única vez; a cada
+    entidade apenas os dados e os títulos dos artistas são trocados.
+
+    Args:
+        nome (str): Identificador do tipo de gráfico
+        construtor (callable): Função sem argumentos que retorna (fig, artistas)
+
+    Returns:
+        tuple: (Figure, dict com os artistas atualizáveis)
+    """
+    modelo = _modelos.get(nome)
+    if modelo is None or not plt.fignum_exists(modelo[0].number):
+        modelo = construtor()
+        _modelos[nome] = modelo
+    return modelo
+
+def descartar_modelos():
+    """Fecha as figuras de todos os modelos construídos"""
+    for fig, _ in _modelos.values():
+        plt.close(fig)
+    _modelos.clear()
+
+def _cmap_centrado(nome_cmap, vmin, vmax, centro):
+    """Recorta um colormap divergente para centralizá-lo em ``centro`` (como no seaborn)"""
+    cmap = plt.get_cmap(nome_cmap)
+    amplitude = max(vmax - centro, centro - vmin)
+    if not np.isfinite(amplitude) or amplitude <= 0:
+        return cmap
+    cmin, cmax = (np.array([vmin, vmax]) - (centro - amplitude)) / (2 * amplitude)
+    from matplotlib.colors import ListedColormap
+    return ListedColormap(cmap(np.linspace(cmin, cmax, 256)))
+
+def usar_anomalias(dados):
+    """
+    Troca a TEMPERATURA pela ANOMALIA precomputada (ver climatologia.py).
+
+    Args:
+        dados: DataFrame carregado com ``anomalia=True`` ou dict de DataFrames
+
+    Returns:
+        Mesmo tipo de ``dados``, com TEMPERATURA igual à ANOMALIA
+    """
+    if isinstance(dados, dict):
+        return {chave: usar_anomalias(df) for chave, df in dados.items()}
+    if dados.attrs.get('anomalia'):
+        return dados
+    if 'ANOMALIA' not in dados.columns:
+        raise ValueError("Dados sem a coluna ANOMALIA; carregue-os com anomalia=True")
+    dados = dados.assign(TEMPERATURA=dados['ANOMALIA'])
+    dados.attrs['anomalia'] = True
+    return dados
+
+def aceita_anomalia(funcao):
+    """
+    Acrescenta a opção ``anomalia`` a um gráfico de temperatura.
+
+    Com ``anomalia=True`` o gráfico é desenhado sobre as anomalias
+    precomputadas em vez da temperatura; ``salvar_grafico`` acrescenta
+    ``_anomalia`` ao nome do arquivo e ajusta títulos e rótulos.
+    """
+    @functools.wraps(funcao)
+    def envoltorio(dados, *args, anomalia=False, **kwargs):
+        if not anomalia:
+            return funcao(dados, *args, **kwargs)
+        try:
+            dados = usar_anomalias(dados)
+        except ValueError as e:
+            logger.error(f"Erro ao gerar {funcao.__name__} em modo anomalia: {str(e)}")
+            return None
+        _modo['anomalia'] = True
+        try:
+            return funcao(dados, *args, **kwargs)
+        finally:
+            _modo['anomalia'] = False
+    return envoltorio
+
+def _rotular_anomalia(fig):
+    """
+    Troca "temperatura" por "anomalia de temperatura" nos títulos e rótulos.
+
+    Returns:
+        list: Pares (setter, texto original), para desfazer a troca
+    """
+    textos = []
+    if getattr(fig, '_suptitle', None) is not None:
+        textos.append((fig._suptitle.get_text, fig._suptitle.set_text))
+    for ax in fig.axes:
+        textos.extend([
+            (ax.get_title, ax.set_title), (ax.get_xlabel, ax.set_xlabel), (ax.get_ylabel, ax.set_ylabel)
+        ])
+    originais = []
+    for obter, definir in textos:
+        texto = obter()
+        novo = re.sub(
+            r'[Tt]emperatura', lambda m: 'Anomalia de temperatura' if m.start() == 0 else 'anomalia de temperatura', texto
+        )
+        if novo != texto:
+            definir(novo)
+            originais.append((definir, texto))
+    return originais
+
+@medir_etapa
+def calcular_agregados_regiao(df):
+    """
+    Calcula os agregados compartilhados pelos gráficos de uma região.
+
+    Args:
+        df (pd.DataFrame): Dados da região com TEMPERATURA, HORA e DIA_SEMANA
+
+    Returns:
+        dict: 'por_hora' (média e desvio por hora) e 'por_dia_hora' (pivot dia × hora)
+    """
+    return {
+        'por_hora': df.groupby('HORA')['TEMPERATURA'].agg(['mean', 'std']),
+        'por_dia_hora': df.pivot_table(
+            values='TEMPERATURA',
+            index='DIA_SEMANA',
+            columns='HORA',
+            aggfunc='mean'
+        )
+    }
+
+@medir_etapa
+def calcular_agregados_estado_capital(df):
+    """
+    Calcula os agregados compartilhados pelos gráficos estado-capital.
+
+    Args:
+        df (pd.DataFrame): Dados combinados com TIPO, TEMPERATURA, HORA e DIA_SEMANA
+
+    Returns:
+        dict: 'por_tipo' (estatísticas por TIPO), 'por_tipo_hora' (média e desvio
+        por TIPO e hora) e 'por_tipo_dia_hora' (pivot TIPO/dia × hora)
+    """
+    grupos = df.groupby('TIPO')['TEMPERATURA']
+    por_tipo = grupos.agg(['mean', 'median', 'std', 'min', 'max'])
+    por_tipo['q25'] = grupos.quantile(0.25)
+    por_tipo['q75'] = grupos.quantile(0.75)
+    return {
+        'por_tipo': por_tipo,
+        'por_tipo_hora': df.groupby(['TIPO', 'HORA'])['TEMPERATURA'].agg(['mean', 'std']),
+        'por_tipo_dia_hora': df.pivot_table(
+            values='TEMPERATURA',
+            index=['TIPO', 'DIA_SEMANA'],
+            columns='HORA',
+            aggfunc='mean'
+        )
+    }
 
 def criar_diretorio_reports():
     """Cria o diretório reports se não existir"""
@@ -25,18 +232,131 @@ def criar_diretorio_reports():
     reports_dir.mkdir(exist_ok=True)
     return reports_dir
 
-def salvar_grafico(plt, reports_dir, nome_arquivo, fechar=True):
-    """Salva o gráfico com tratamento de erros"""
+def configurar_gravacao(workers=0, limite=4):
+    """
+    Ativa a gravação em segundo plano dos formatos raster.
+
+    Args:
+        workers (int): Threads de gravação; 0 para gravar de forma síncrona
+        limite (int): Imagens aguardando gravação antes de ``salvar_grafico`` bloquear
+    """
+    aguardar_gravacoes()
+    _gravacao['limite'] = max(1, limite)
+    if workers == _gravacao['workers']:
+        return
+    if _gravacao['executor'] is not None:
+        _gravacao['executor'].shutdown()
+    _gravacao['executor'] = ThreadPoolExecutor(workers, thread_name_prefix='gravacao') if workers else None
+    _gravacao['workers'] = workers
+
+def aguardar_gravacoes():
+    """Espera as gravações pendentes; retorna os caminhos gravados com sucesso"""
+    gravados = []
+    while _gravacao['pendentes']:
+        caminho = _gravacao['pendentes'].popleft().result()
+        if caminho is not None:
+            gravados.append(caminho)
+    return gravados
+
+def _gravar_imagem(rgba, tamanho, caminho, formato, perfil, nome_perfil, registrar):
+    """Codifica o buffer RGBA de uma figura e grava o arquivo (executada nas threads de gravação)"""
+    from PIL import Image
+
+    try:
+        inicio = time.perf_counter()
+        imagem = Image.frombuffer('RGBA', tamanho, rgba, 'raw', 'RGBA', 0, 1)
+        imagem.save(caminho, format=formato, dpi=(perfil['dpi'], perfil['dpi']),
+                    **perfil.get('pil_kwargs', {}))
+        duracao = time.perf_counter() - inicio
+
+        registrar(caminho)
+        logger.info(
+            f"Gráfico salvo em {caminho} ({nome_perfil}, {caminho.stat().st_size / 1024:.0f} KB, "
+            f"{duracao * 1000:.0f} ms em segundo plano)"
+        )
+        return caminho
+    except Exception as e:
+        logger.error(f"Erro ao gravar gráfico {caminho}: {str(e)}")
+        return None
+
+def _salvar_em_segundo_plano(fig, caminho, nome_perfil, perfil):
+    """Rasteriza a figura em memória e entrega a codificação às threads de gravação"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='rgba', dpi=perfil['dpi'], bbox_inches=perfil['bbox_inches'])
+    tamanho = (fig.canvas.renderer.width, fig.canvas.renderer.height)
+
+    # Contrapressão: não acumular mais que ``limite`` imagens em memória
+    pendentes = _gravacao['pendentes']
+    while len(pendentes) >= _gravacao['limite']:
+        pendentes.popleft().result()
+    pendentes.append(_gravacao['executor'].submit(
+        _gravar_imagem, buffer.getbuffer(), tamanho, caminho,
+        FORMATOS_RASTER[perfil['formato']], perfil, nome_perfil, registrar_saida_adiada()
+    ))
+
+@medir_etapa
+def salvar_grafico(figura, reports_dir, nome_arquivo, fechar=True):
+    """
+    Salva o gráfico conforme o perfil de saída atual, com tratamento de erros.
+
+    O layout é ajustado uma única vez (``tight_layout`` ou, em perfis com
+    ``bbox_inches='tight'``, o recorte do savefig) e a extensão de
+    ``nome_arquivo`` é substituída pelo formato do perfil. O tempo de codificação de cada
+    arquivo é registrado no log. Com a gravação em segundo plano ativa
+    (``configurar_gravacao``) e um perfil raster, o arquivo só existe depois
+    de ``aguardar_gravacoes``.
+
+    Args:
+        figura: Módulo ``pyplot`` (usa a figura atual) ou uma ``Figure``
+        reports_dir (Path): Diretório de saída
+        nome_arquivo (str): Nome do arquivo
+        fechar (bool): Fecha a figura após salvar
+
+    Returns:
+        Path: Caminho do arquivo salvo, ou None em caso de erro
+    """
     try:
-        plt.tight_layout()
-        caminho = reports_dir / nome_arquivo
-        plt.savefig(caminho, dpi=300, bbox_inches='tight')
-        logger.info(f"Gráfico salvo em {caminho}")
+        fig = figura.gcf() if hasattr(figura, 'gcf') else figura
+        nome_perfil, perfil = obter_perfil_saida()
+        caminho = (Path(reports_dir) / nome_arquivo).with_suffix(f".{perfil['formato']}")
+        originais = []
+        if _modo['anomalia']:
+            caminho = caminho.with_stem(f'{caminho.stem}_anomalia')
+            originais = _rotular_anomalia(fig)
+        # Um único ajuste de layout: perfis com ``bbox_inches='tight'`` já
+        # recortam a figura no savefig
+        if perfil['bbox_inches'] != 'tight':
+            fig.tight_layout()
+
+        if _gravacao['executor'] is not None and perfil['formato'] in FORMATOS_RASTER:
+            _salvar_em_segundo_plano(fig, caminho, nome_perfil, perfil)
+        else:
+            opcoes = {'dpi': perfil['dpi'], 'bbox_inches': perfil['bbox_inches']}
+            if 'pil_kwargs' in perfil:
+                opcoes['pil_kwargs'] = perfil['pil_kwargs']
+
+            inicio = time.perf_counter()
+            fig.savefig(caminho, **opcoes)
+            duracao = time.perf_counter() - inicio
+
+            registrar_saida(caminho)
+            tamanho = caminho.stat().st_size / 1024
+            logger.info(
+                f"Gráfico salvo em {caminho} ({nome_perfil}, {tamanho:.0f} KB, "
+                f"{duracao * 1000:.0f} ms)"
+            )
+        # Modelos reaproveitados voltam aos rótulos originais
+        for definir, texto in originais:
+            definir(texto)
         if fechar:
-            plt.close()
+            plt.close(fig)
+        return caminho
     except Exception as e:
         logger.error(f"Erro ao salvar gráfico {nome_arquivo}: {str(e)}")
+        return None
 
+@medir_etapa
+@aceita_anomalia
 def plot_distribuicao_temperatura(df, regiao, reports_dir):
     """Gera gráfico de distribuição de temperatura para uma região"""
     try:
@@ -58,6 +378,8 @@ def plot_distribuicao_temperatura(df, regiao, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar gráfico de distribuição para {regiao}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_serie_temporal(df, regiao, reports_dir):
     """Gera gráfico de série temporal para uma região"""
     try:
@@ -75,6 +397,8 @@ def plot_serie_temporal(df, regiao, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar série temporal para {regiao}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_media_movel(df, regiao, reports_dir, janela=7):
     """Gera gráfico de média móvel para uma região"""
     try:
@@ -97,13 +421,16 @@ def plot_media_movel(df, regiao, reports_dir, janela=7):
     except Exception as e:
         logger.error(f"Erro ao gerar média móvel para {regiao}: {str(e)}")
 
-def plot_variacao_diaria(df, regiao, reports_dir):
+@medir_etapa
+@aceita_anomalia
+def plot_variacao_diaria(df, regiao, reports_dir, agregados=None):
     """Gera gráfico de variação diária de temperatura"""
     try:
         configurar_estilo()
         plt.figure(figsize=(12, 6))
         
-        media_por_hora = df.groupby('HORA')['TEMPERATURA'].agg(['mean', 'std']).reset_index()
+        agregados = agregados or calcular_agregados_regiao(df)
+        media_por_hora = agregados['por_hora'].reset_index()
         
         plt.errorbar(
             media_por_hora['HORA'],
@@ -125,18 +452,16 @@ def plot_variacao_diaria(df, regiao, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar variação diária para {regiao}: {str(e)}")
 
-def plot_heatmap_semanal(df, regiao, reports_dir):
+@medir_etapa
+@aceita_anomalia
+def plot_heatmap_semanal(df, regiao, reports_dir, agregados=None):
     """Gera heatmap de temperatura por dia da semana e hora"""
     try:
         configurar_estilo()
         plt.figure(figsize=(15, 8))
         
-        pivot = df.pivot_table(
-            values='TEMPERATURA',
-            index='DIA_SEMANA',
-            columns='HORA',
-            aggfunc='mean'
-        )
+        agregados = agregados or calcular_agregados_regiao(df)
+        pivot = agregados['por_dia_hora']
         
         sns.heatmap(pivot, cmap='RdYlBu_r', center=pivot.mean().mean(), annot=True, fmt='.1f')
         plt.title(f'Heatmap de Temperatura - {regiao}')
@@ -148,6 +473,8 @@ def plot_heatmap_semanal(df, regiao, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar heatmap semanal para {regiao}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_comparacao_regioes(dfs_dict, reports_dir):
     """Gera gráfico comparativo entre regiões"""
     try:
@@ -174,6 +501,8 @@ def plot_comparacao_regioes(dfs_dict, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar comparação entre regiões: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_correlacao_temperatura_hora(df, regiao, reports_dir):
     """Gera gráfico de correlação entre temperatura e hora do dia"""
     try:
@@ -190,6 +519,8 @@ def plot_correlacao_temperatura_hora(df, regiao, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar correlação temperatura-hora para {regiao}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_extremos_temperatura(df, regiao, reports_dir):
     """Gera gráfico de valores extremos de temperatura"""
     try:
@@ -229,6 +560,8 @@ def analise_estatistica(df):
         logger.error(f"Erro ao calcular estatísticas: {str(e)}")
         return {}
 
+@medir_etapa
+@aceita_anomalia
 def plot_comparacao_estados(dfs_dict, reports_dir):
     """Gera gráfico comparativo entre estados"""
     try:
@@ -263,6 +596,8 @@ def plot_comparacao_estados(dfs_dict, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar comparação entre estados: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_mapa_calor_estados(dfs_dict, reports_dir):
     """Gera mapa de calor das temperaturas médias por estado"""
     try:
@@ -297,6 +632,202 @@ def plot_mapa_calor_estados(dfs_dict, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar mapa de calor dos estados: {str(e)}")
 
+@medir_etapa
+def plot_mapa_interpolado(grade, latitudes, longitudes, estacoes, reports_dir, nome_arquivo,
+                          titulo='Temperatura interpolada', rotulo='Temperatura (°C)'):
+    """
+    Gera o mapa de uma grade interpolada (ver ``espacial.interpolar_idw``) com as estações.
+
+    Args:
+        grade (np.ndarray): Valores (latitudes, longitudes); NaN fora do alcance das estações
+        latitudes, longitudes (array): Eixos da grade, em graus
+        estacoes (pd.DataFrame): Estações usadas, com LATITUDE e LONGITUDE
+        reports_dir (Path): Diretório de saída
+        nome_arquivo (str): Nome do arquivo
+        titulo (str): Título do mapa
+        rotulo (str): Rótulo da barra de cores
+    """
+    try:
+        configurar_estilo()
+        fig, ax = plt.subplots(figsize=(10, 10))
+        malha = ax.pcolormesh(longitudes, latitudes, grade, cmap='RdYlBu_r', shading='nearest')
+        ax.scatter(estacoes['LONGITUDE'], estacoes['LATITUDE'], s=6, c='black', alpha=0.6,
+                   label=f'{len(estacoes)} estações')
+        fig.colorbar(malha, ax=ax, shrink=0.7, label=rotulo)
+        ax.set_aspect('equal')
+        ax.set_title(titulo)
+        ax.set_xlabel('Longitude')
+        ax.set_ylabel('Latitude')
+        ax.legend(loc='lower left')
+
+        salvar_grafico(fig, reports_dir, nome_arquivo)
+
+    except Exception as e:
+        logger.error(f"Erro ao gerar mapa interpolado {nome_arquivo}: {str(e)}")
+
+@medir_etapa
+def plot_mapa_tendencias(tabela, reports_dir, nome_arquivo='mapa_tendencias.png'):
+    """
+    Gera o mapa das tendências de Sen por estação (ver ``tendencias.calcular_tendencias``).
+
+    Estações com tendência significativa pelo teste de Mann-Kendall aparecem
+    preenchidas; as demais, apenas contornadas.
+    """
+    try:
+        configurar_estilo()
+        tabela = tabela.dropna(subset=['sen_por_decada', 'LATITUDE', 'LONGITUDE'])
+        limite = np.nanpercentile(np.abs(tabela['sen_por_decada']), 95) or 1.0
+        fig, ax = plt.subplots(figsize=(10, 10))
+
+        from matplotlib.colors import Normalize
+        normalizacao = Normalize(-limite, limite)
+        cmap = plt.get_cmap('RdBu_r')
+
+        fracas = tabela[~tabela['significativa'].astype(bool)]
+        ax.scatter(
+            fracas['LONGITUDE'], fracas['LATITUDE'], s=40, linewidths=1.2, facecolors='none',
+            edgecolors=cmap(normalizacao(fracas['sen_por_decada'].to_numpy())), label='não significativa'
+        )
+        fortes = tabela[tabela['significativa'].astype(bool)]
+        pontos = ax.scatter(
+            fortes['LONGITUDE'], fortes['LATITUDE'], c=fortes['sen_por_decada'], cmap=cmap,
+            norm=normalizacao, s=40, label='significativa (Mann-Kendall)'
+        )
+        fig.colorbar(pontos, ax=ax, shrink=0.7, label='Tendência de Sen (°C/década)')
+        ax.set_aspect('equal')
+        ax.set_title('Tendência de temperatura por estação')
+        ax.set_xlabel('Longitude')
+        ax.set_ylabel('Latitude')
+        ax.legend(loc='lower left')
+
+        salvar_grafico(fig, reports_dir, nome_arquivo)
+
+    except Exception as e:
+        logger.error(f"Erro ao gerar mapa de tendências: {str(e)}")
+
+@medir_etapa
+def plot_ranking_tendencias(tabela, reports_dir, nome_arquivo='ranking_tendencias.png', quantidade=15):
+    """Gera o ranking das estações com maior aquecimento e maior resfriamento (tendência de Sen)"""
+    try:
+        configurar_estilo()
+        ordenada = tabela.dropna(subset=['sen_por_decada']).sort_values('sen_por_decada')
+        extremos = pd.concat([ordenada.head(quantidade), ordenada.tail(quantidade)]).drop_duplicates()
+        rotulos = [f"{linha['ESTADO']} - {linha['ESTACAO']}" for _, linha in extremos.iterrows()]
+        cores = np.where(extremos['sen_por_decada'] > 0, '#d6604d', '#4393c3')
+        transparencia = np.where(extremos['significativa'], 1.0, 0.4)
+
+        fig, ax = plt.subplots(figsize=(10, max(6, 0.3 * len(extremos))))
+        barras = ax.barh(range(len(extremos)), extremos['sen_por_decada'], color=cores)
+        for barra, alfa in zip(barras, transparencia):
+            barra.set_alpha(alfa)
+        ax.set_yticks(range(len(extremos)))
+        ax.set_yticklabels(rotulos, fontsize=8)
+        ax.axvline(0, color='black', linewidth=0.8)
+        ax.set_title('Estações com maiores tendências (barras claras: não significativas)')
+        ax.set_xlabel('Tendência de Sen (°C/década)')
+
+        salvar_grafico(fig, reports_dir, nome_arquivo)
+
+    except Exception as e:
+        logger.error(f"Erro ao gerar ranking de tendências: {str(e)}")
+
+@medir_etapa
+def plot_folhas_rosas_ventos(agregados, estacoes, reports_dir, por_folha=100, colunas=None,
+                             nome_arquivo='rosas_ventos_{folha:02d}.png', titulo='Rosas dos ventos'):
+    """
+    Gera folhas com a rosa dos ventos de cada estação (ver ``vento.agregar_vento``).
+
+    As rosas saem dos histogramas direção x velocidade precomputados: as cunhas
+    de todas as estações de uma folha formam uma única coleção de polígonos,
+    desenhada de uma vez. Cada rosa tem escala própria (o maior setor toca o
+    círculo externo), anotada com a frequência desse setor e a calmaria.
+
+    Args:
+        agregados (dict): Agregados de vento, já recortados nos meses e horas desejados
+        estacoes (pd.DataFrame): Estações indexadas por CODIGO, com ESTACAO, ESTADO e REGIAO
+        reports_dir (Path): Diretório de saída
+        por_folha (int): Rosas por folha
+        colunas (int): Rosas por linha; padrão: folha aproximadamente quadrada
+        nome_arquivo (str): Modelo do nome de cada folha (campo ``folha``)
+        titulo (str): Título das folhas
+
+    Returns:
+        list: Caminhos das folhas salvas
+    """
+    from matplotlib.collections import LineCollection, PolyCollection
+    from matplotlib.patches import Patch
+    from vento import frequencias_rosa, poligonos_rosas, rotulos_faixas
+
+    caminhos = []
+    try:
+        configurar_estilo()
+        Path(reports_dir).mkdir(parents=True, exist_ok=True)
+        frequencias, calmaria = frequencias_rosa(agregados)
+        codigos = pd.Index(agregados['estacoes'])
+        metadados = estacoes.set_axis(estacoes.index.astype(str)).reindex(codigos)
+        ordem = np.lexsort([
+            metadados['ESTACAO'].fillna('').to_numpy(dtype=str),
+            metadados['ESTADO'].fillna('').to_numpy(dtype=str),
+            metadados['REGIAO'].fillna('').to_numpy(dtype=str)
+        ])
+
+        cores = plt.get_cmap('viridis')(np.linspace(0, 0.95, frequencias.shape[-1]))
+        colunas = colunas or int(np.ceil(np.sqrt(por_folha)))
+        total_folhas = -(-len(ordem) // por_folha)
+        circulo = np.linspace(0, 2 * np.pi, 65)
+        raio = 0.42
+        # Espaço acima de cada rosa para o nome da estação e a anotação
+        altura_linha = 1.25
+
+        for folha in range(total_folhas):
+            posicoes = ordem[folha * por_folha:(folha + 1) * por_folha]
+            linhas = -(-len(posicoes) // colunas)
+            centros = np.column_stack([
+                np.arange(len(posicoes)) % colunas, -altura_linha * (np.arange(len(posicoes)) // colunas)
+            ]).astype(float)
+
+            fig, ax = plt.subplots(figsize=(1.6 * colunas, 1.6 * altura_linha * linhas + 1.0))
+            vertices, faixa = poligonos_rosas(frequencias[posicoes], centros, raio=raio)
+            ax.add_collection(PolyCollection(vertices, facecolors=cores[faixa], edgecolors='none'))
+
+            # Círculos de referência (metade e totalidade do maior setor)
+            aneis = [
+                np.column_stack([x + r * np.sin(circulo), y + r * np.cos(circulo)])
+                for x, y in centros for r in (raio / 2, raio)
+            ]
+            ax.add_collection(LineCollection(aneis, colors='#bbbbbb', linewidths=0.4, zorder=0))
+
+            maximos = np.nan_to_num(frequencias[posicoes]).sum(axis=2).max(axis=1)
+            for (x, y), posicao, maximo in zip(centros, posicoes, maximos):
+                linha = metadados.iloc[posicao]
+                ax.text(x, y + raio + 0.13, f"{linha['ESTADO']} - {str(linha['ESTACAO'])[:20]}",
+                        ha='center', va='bottom', fontsize=5.5)
+                legenda = (
+                    f'máx {maximo:.0f}% · calm. {calmaria[posicao]:.0f}%'
+                    if np.isfinite(calmaria[posicao]) else 'sem dados'
+                )
+                ax.text(x, y + raio + 0.03, legenda, ha='center', va='bottom', fontsize=4.5, color='#555555')
+
+            ax.set_xlim(-0.5, colunas - 0.5)
+            ax.set_ylim(-altura_linha * (linhas - 1) - raio - 0.05, raio + 0.3)
+            ax.set_aspect('equal')
+            ax.axis('off')
+            ax.set_title(f'{titulo} (folha {folha + 1}/{total_folhas})')
+            ax.legend(
+                handles=[Patch(color=cor, label=rotulo) for cor, rotulo in zip(cores, rotulos_faixas(agregados['faixas']))],
+                loc='upper center', bbox_to_anchor=(0.5, 0), ncol=len(cores), fontsize=7, frameon=False
+            )
+
+            caminho = salvar_grafico(fig, reports_dir, nome_arquivo.format(folha=folha + 1))
+            if caminho is not None:
+                caminhos.append(caminho)
+
+    except Exception as e:
+        logger.error(f"Erro ao gerar folhas de rosas dos ventos: {str(e)}")
+    return caminhos
+
+@medir_etapa
+@aceita_anomalia
 def plot_serie_temporal_estados(df, regiao, reports_dir):
     """Gera gráfico de série temporal para cada estado de uma região"""
     try:
@@ -321,6 +852,8 @@ def plot_serie_temporal_estados(df, regiao, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar série temporal por estados para {regiao}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_estatisticas_estados(dfs_dict, reports_dir):
     """Gera gráfico de estatísticas por estado"""
     try:
@@ -364,56 +897,76 @@ def plot_estatisticas_estados(dfs_dict, reports_dir):
             axes[1].tick_params(axis='x', rotation=45)
             axes[1].grid(True)
             
-            plt.tight_layout()
             salvar_grafico(plt, reports_dir, 'temp_estatisticas_estados.png')
         
     except Exception as e:
         logger.error(f"Erro ao gerar estatísticas por estado: {str(e)}")
 
-def plot_radar_estado_capital(df, estado, reports_dir):
+def _modelo_radar_estado_capital():
+    """Constrói o modelo do gráfico de radar estado-capital"""
+    categorias = ['Média', 'Máxima', 'Mínima', 'Amplitude', 'Desvio']
+    angulos = np.linspace(0, 2*np.pi, len(categorias), endpoint=False)
+    angulos = np.concatenate((angulos, [angulos[0]]))  # Fechar o polígono
+    vazio = np.zeros_like(angulos)
+
+    fig = plt.figure(figsize=(10, 10))
+    ax = fig.add_subplot(111, projection='polar')
+    linha_estado, = ax.plot(angulos, vazio, 'o-', label='Estado')
+    linha_capital, = ax.plot(angulos, vazio, 'o-', label='Capital')
+    area_estado, = ax.fill(angulos, vazio, alpha=0.25)
+    area_capital, = ax.fill(angulos, vazio, alpha=0.25)
+
+    ax.set_xticks(angulos[:-1])
+    ax.set_xticklabels(categorias)
+    titulo = ax.set_title('')
+    ax.legend(bbox_to_anchor=(0.95, 0.95))
+
+    return fig, {
+        'ax': ax,
+        'angulos': angulos,
+        'titulo': titulo,
+        'linhas': {'ESTADO': linha_estado, 'CAPITAL': linha_capital},
+        'areas': {'ESTADO': area_estado, 'CAPITAL': area_capital}
+    }
+
+@medir_etapa
+@aceita_anomalia
+def plot_radar_estado_capital(df, estado, reports_dir, agregados=None):
     """Gera gráfico de radar comparando métricas entre estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            plt.figure(figsize=(10, 10))
-            
+            fig, artistas = obter_modelo('radar_estado_capital', _modelo_radar_estado_capital)
+
             # Calcular métricas
-            metricas = {
-                'Média': df.groupby('TIPO')['TEMPERATURA'].mean(),
-                'Máxima': df.groupby('TIPO')['TEMPERATURA'].max(),
-                'Mínima': df.groupby('TIPO')['TEMPERATURA'].min(),
-                'Amplitude': df.groupby('TIPO')['TEMPERATURA'].agg(lambda x: x.max() - x.min()),
-                'Desvio': df.groupby('TIPO')['TEMPERATURA'].std()
-            }
-            
-            # Preparar dados para o radar
-            categorias = list(metricas.keys())
-            valores_estado = [metricas[m]['ESTADO'] for m in categorias]
-            valores_capital = [metricas[m]['CAPITAL'] for m in categorias]
-            
-            # Criar gráfico radar
-            angulos = np.linspace(0, 2*np.pi, len(categorias), endpoint=False)
-            angulos = np.concatenate((angulos, [angulos[0]]))  # Fechar o polígono
-            
-            valores_estado = np.concatenate((valores_estado, [valores_estado[0]]))
-            valores_capital = np.concatenate((valores_capital, [valores_capital[0]]))
-            
-            ax = plt.subplot(111, projection='polar')
-            ax.plot(angulos, valores_estado, 'o-', label='Estado')
-            ax.plot(angulos, valores_capital, 'o-', label='Capital')
-            ax.fill(angulos, valores_estado, alpha=0.25)
-            ax.fill(angulos, valores_capital, alpha=0.25)
-            
-            ax.set_xticks(angulos[:-1])
-            ax.set_xticklabels(categorias)
-            plt.title(f'Comparação de Métricas - {estado}')
-            plt.legend(bbox_to_anchor=(0.95, 0.95))
-            
-            salvar_grafico(plt, reports_dir, f'radar_estado_capital_{estado.lower()}.png')
-            
+            por_tipo = (agregados or calcular_agregados_estado_capital(df))['por_tipo']
+            metricas = pd.DataFrame({
+                'Média': por_tipo['mean'],
+                'Máxima': por_tipo['max'],
+                'Mínima': por_tipo['min'],
+                'Amplitude': por_tipo['max'] - por_tipo['min'],
+                'Desvio': por_tipo['std']
+            })
+
+            # Atualizar os polígonos de cada tipo
+            angulos = artistas['angulos']
+            for tipo in TIPOS_ESTADO_CAPITAL:
+                valores = metricas.loc[tipo].to_numpy()
+                valores = np.concatenate((valores, [valores[0]]))
+                artistas['linhas'][tipo].set_ydata(valores)
+                artistas['areas'][tipo].set_xy(np.column_stack((angulos, valores)))
+
+            artistas['ax'].relim()
+            artistas['ax'].autoscale_view()
+            artistas['titulo'].set_text(f'Comparação de Métricas - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'radar_estado_capital_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
         logger.error(f"Erro ao gerar radar para {estado}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_violino_estado_capital(df, estado, reports_dir):
     """Gera gráfico de violino comparando distribuições entre estado e capital"""
     try:
@@ -431,56 +984,85 @@ def plot_violino_estado_capital(df, estado, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar violino para {estado}: {str(e)}")
 
-def plot_ciclo_diario_estado_capital(df, estado, reports_dir):
+def _modelo_ciclo_diario_estado_capital():
+    """Constrói o modelo do gráfico de ciclo diário estado-capital"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    linhas = {tipo: ax.plot([], [], 'o-', label=tipo)[0] for tipo in TIPOS_ESTADO_CAPITAL}
+    titulo = ax.set_title('')
+    ax.set_xlabel('Hora do Dia')
+    ax.set_ylabel('Temperatura Média (°C)')
+    ax.grid(True)
+    ax.legend()
+    return fig, {'ax': ax, 'titulo': titulo, 'linhas': linhas}
+
+@medir_etapa
+@aceita_anomalia
+def plot_ciclo_diario_estado_capital(df, estado, reports_dir, agregados=None):
     """Gera gráfico de ciclo diário comparando estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            plt.figure(figsize=(12, 6))
-            
-            for tipo in ['ESTADO', 'CAPITAL']:
-                dados = df[df['TIPO'] == tipo]
-                media_hora = dados.groupby('HORA')['TEMPERATURA'].mean()
-                plt.plot(media_hora.index, media_hora.values, 'o-', label=tipo)
-            
-            plt.title(f'Ciclo Diário de Temperatura - {estado}')
-            plt.xlabel('Hora do Dia')
-            plt.ylabel('Temperatura Média (°C)')
-            plt.grid(True)
-            plt.legend()
-            
-            salvar_grafico(plt, reports_dir, f'ciclo_diario_{estado.lower()}.png')
-            
+            fig, artistas = obter_modelo('ciclo_diario_estado_capital', _modelo_ciclo_diario_estado_capital)
+
+            por_tipo_hora = (agregados or calcular_agregados_estado_capital(df))['por_tipo_hora']
+            for tipo in TIPOS_ESTADO_CAPITAL:
+                media_hora = por_tipo_hora.loc[tipo, 'mean']
+                artistas['linhas'][tipo].set_data(media_hora.index, media_hora.values)
+
+            artistas['ax'].relim()
+            artistas['ax'].autoscale_view()
+            artistas['titulo'].set_text(f'Ciclo Diário de Temperatura - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'ciclo_diario_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
         logger.error(f"Erro ao gerar ciclo diário para {estado}: {str(e)}")
 
-def plot_calor_horario_estado_capital(df, estado, reports_dir):
+def _modelo_calor_horario_estado_capital():
+    """Constrói o modelo do mapa de calor horário estado-capital"""
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
+    vazio = pd.DataFrame(0.0, index=DIAS_SEMANA, columns=range(24))
+    vazio.index.name = 'DIA_SEMANA'
+    vazio.columns.name = 'HORA'
+
+    malhas = {}
+    for tipo, ax in zip(TIPOS_ESTADO_CAPITAL, [ax1, ax2]):
+        sns.heatmap(vazio, ax=ax, cmap='RdYlBu_r')
+        ax.set_title(f'Temperatura por Hora - {tipo}')
+        malhas[tipo] = ax.collections[0]
+
+    titulo = fig.suptitle('')
+    return fig, {'titulo': titulo, 'malhas': malhas}
+
+@medir_etapa
+@aceita_anomalia
+def plot_calor_horario_estado_capital(df, estado, reports_dir, agregados=None):
     """Gera mapa de calor horário comparando estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 8))
-            
-            for tipo, ax in zip(['ESTADO', 'CAPITAL'], [ax1, ax2]):
-                dados = df[df['TIPO'] == tipo]
-                pivot = dados.pivot_table(
-                    values='TEMPERATURA',
-                    index='DIA_SEMANA',
-                    columns='HORA',
-                    aggfunc='mean'
-                )
-                
-                sns.heatmap(pivot, ax=ax, cmap='RdYlBu_r', center=pivot.mean().mean())
-                ax.set_title(f'Temperatura por Hora - {tipo}')
-                
-            plt.suptitle(f'Comparação de Padrões Horários - {estado}')
-            plt.tight_layout()
-            
-            salvar_grafico(plt, reports_dir, f'calor_horario_{estado.lower()}.png')
-            
+            fig, artistas = obter_modelo('calor_horario_estado_capital', _modelo_calor_horario_estado_capital)
+
+            por_tipo_dia_hora = (agregados or calcular_agregados_estado_capital(df))['por_tipo_dia_hora']
+            for tipo in TIPOS_ESTADO_CAPITAL:
+                pivot = por_tipo_dia_hora.loc[tipo].reindex(index=DIAS_SEMANA, columns=range(24))
+
+                valores = np.ma.masked_invalid(pivot.to_numpy())
+                vmin, vmax = valores.min(), valores.max()
+                malha = artistas['malhas'][tipo]
+                malha.set_array(valores)
+                malha.set_cmap(_cmap_centrado('RdYlBu_r', vmin, vmax, pivot.mean().mean()))
+                malha.set_clim(vmin, vmax)
+
+            artistas['titulo'].set_text(f'Comparação de Padrões Horários - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'calor_horario_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
         logger.error(f"Erro ao gerar mapa de calor horário para {estado}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_densidade_estado_capital(df, estado, reports_dir):
     """Gera gráfico de densidade comparando estado e capital"""
     try:
@@ -502,6 +1084,8 @@ def plot_densidade_estado_capital(df, estado, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar densidade para {estado}: {str(e)}")
 
+@medir_etapa
+@aceita_anomalia
 def plot_boxen_estado_capital(df, estado, reports_dir):
     """Gera boxenplot comparando estado e capital"""
     try:
@@ -519,117 +1103,208 @@ def plot_boxen_estado_capital(df, estado, reports_dir):
     except Exception as e:
         logger.error(f"Erro ao gerar boxenplot para {estado}: {str(e)}")
 
+def _modelo_regressao_estado_capital():
+    """Constrói o modelo do gráfico de regressão estado-capital"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    pontos = ax.scatter([], [], alpha=0.5)
+    regressao, = ax.plot([], [], "r--", alpha=0.8)
+    igualdade, = ax.plot([], [], 'k--', alpha=0.3, label='Linha de Igualdade')
+    titulo = ax.set_title('')
+    ax.set_xlabel('Temperatura Estado (°C)')
+    ax.set_ylabel('Temperatura Capital (°C)')
+    ax.legend()
+    return fig, {
+        'ax': ax,
+        'titulo': titulo,
+        'pontos': pontos,
+        'regressao': regressao,
+        'igualdade': igualdade
+    }
+
+@medir_etapa
+@aceita_anomalia
 def plot_regressao_estado_capital(df, estado, reports_dir):
     """Gera gráfico de regressão comparando estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            plt.figure(figsize=(10, 6))
-            
+            fig, artistas = obter_modelo('regressao_estado_capital', _modelo_regressao_estado_capital)
+
             dados_estado = df[df['TIPO'] == 'ESTADO']['TEMPERATURA'].values
             dados_capital = df[df['TIPO'] == 'CAPITAL']['TEMPERATURA'].values
-            
-            plt.scatter(dados_estado, dados_capital, alpha=0.5)
-            
-            # Adicionar linha de regressão
+
+            pontos = np.column_stack((dados_estado, dados_capital))
+            artistas['pontos'].set_offsets(pontos)
+
+            # Linha de regressão e linha de igualdade
             z = np.polyfit(dados_estado, dados_capital, 1)
-            p = np.poly1d(z)
-            plt.plot(dados_estado, p(dados_estado), "r--", alpha=0.8)
-            
-            plt.title(f'Correlação Estado-Capital - {estado}')
-            plt.xlabel('Temperatura Estado (°C)')
-            plt.ylabel('Temperatura Capital (°C)')
-            
-            # Adicionar linha de igualdade
-            plt.plot([min(dados_estado), max(dados_estado)],
-                    [min(dados_estado), max(dados_estado)],
-                    'k--', alpha=0.3, label='Linha de Igualdade')
-            
-            plt.legend()
-            
-            salvar_grafico(plt, reports_dir, f'regressao_{estado.lower()}.png')
-            
+            extremos = np.array([dados_estado.min(), dados_estado.max()])
+            artistas['regressao'].set_data(extremos, np.poly1d(z)(extremos))
+            artistas['igualdade'].set_data(extremos, extremos)
+
+            # Os limites vêm dos pontos, que contêm as duas linhas
+            ax = artistas['ax']
+            ax.ignore_existing_data_limits = True
+            ax.update_datalim(pontos)
+            ax.autoscale_view()
+            artistas['titulo'].set_text(f'Correlação Estado-Capital - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'regressao_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
         logger.error(f"Erro ao gerar regressão para {estado}: {str(e)}")
 
-def plot_barras_estado_capital(df, estado, reports_dir):
+def _modelo_barras_estado_capital():
+    """Constrói o modelo do gráfico de barras estado-capital"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    vazio = pd.DataFrame(
+        0.0,
+        index=pd.Index(sorted(TIPOS_ESTADO_CAPITAL), name='TIPO'),
+        columns=['Média', 'Mediana', 'Desvio', 'IQR']
+    )
+    vazio.plot(kind='bar', width=0.8, ax=ax)
+    titulo = ax.set_title('')
+    ax.set_xlabel('Região')
+    ax.set_ylabel('Temperatura (°C)')
+    ax.legend(title='Métrica')
+    ax.grid(True, alpha=0.3)
+    return fig, {
+        'ax': ax,
+        'titulo': titulo,
+        'barras': dict(zip(vazio.columns, ax.containers)),
+        'ordem': list(vazio.index)
+    }
+
+@medir_etapa
+@aceita_anomalia
+def plot_barras_estado_capital(df, estado, reports_dir, agregados=None):
     """Gera gráfico de barras comparando métricas entre estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            plt.figure(figsize=(12, 6))
-            
+            fig, artistas = obter_modelo('barras_estado_capital', _modelo_barras_estado_capital)
+
+            por_tipo = (agregados or calcular_agregados_estado_capital(df))['por_tipo']
             metricas = {
-                'Média': df.groupby('TIPO')['TEMPERATURA'].mean(),
-                'Mediana': df.groupby('TIPO')['TEMPERATURA'].median(),
-                'Desvio': df.groupby('TIPO')['TEMPERATURA'].std(),
-                'IQR': df.groupby('TIPO')['TEMPERATURA'].agg(lambda x: np.percentile(x, 75) - np.percentile(x, 25))
+                'Média': por_tipo['mean'],
+                'Mediana': por_tipo['median'],
+                'Desvio': por_tipo['std'],
+                'IQR': por_tipo['q75'] - por_tipo['q25']
             }
-            
-            dados_plot = pd.DataFrame(metricas)
-            
-            dados_plot.plot(kind='bar', width=0.8)
-            plt.title(f'Métricas de Temperatura - {estado}')
-            plt.xlabel('Região')
-            plt.ylabel('Temperatura (°C)')
-            plt.legend(title='Métrica')
-            plt.grid(True, alpha=0.3)
-            
-            salvar_grafico(plt, reports_dir, f'barras_{estado.lower()}.png')
-            
+
+            dados_plot = pd.DataFrame(metricas).reindex(artistas['ordem'])
+            for metrica, barras in artistas['barras'].items():
+                for barra, valor in zip(barras, dados_plot[metrica]):
+                    barra.set_height(valor)
+
+            artistas['ax'].relim()
+            artistas['ax'].autoscale_view()
+            artistas['titulo'].set_text(f'Métricas de Temperatura - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'barras_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
         logger.error(f"Erro ao gerar barras para {estado}: {str(e)}")
 
-def plot_area_estado_capital(df, estado, reports_dir):
+def _modelo_area_estado_capital():
+    """Constrói o modelo do gráfico de área estado-capital"""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    faixas, linhas = {}, {}
+    for tipo in TIPOS_ESTADO_CAPITAL:
+        faixas[tipo] = ax.fill_between([0, 1], [0, 0], [0, 0], alpha=0.3, label=f'{tipo} (±1 DP)')
+        linhas[tipo], = ax.plot([], [], label=tipo)
+    titulo = ax.set_title('')
+    ax.set_xlabel('Hora do Dia')
+    ax.set_ylabel('Temperatura (°C)')
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    return fig, {'ax': ax, 'titulo': titulo, 'faixas': faixas, 'linhas': linhas}
+
+@medir_etapa
+@aceita_anomalia
+def plot_area_estado_capital(df, estado, reports_dir, agregados=None):
     """Gera gráfico de área comparando variação temporal entre estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            plt.figure(figsize=(12, 6))
-            
-            for tipo in ['ESTADO', 'CAPITAL']:
-                dados = df[df['TIPO'] == tipo]
-                plt.fill_between(dados['HORA'], 
-                               dados.groupby('HORA')['TEMPERATURA'].mean() - dados.groupby('HORA')['TEMPERATURA'].std(),
-                               dados.groupby('HORA')['TEMPERATURA'].mean() + dados.groupby('HORA')['TEMPERATURA'].std(),
-                               alpha=0.3, label=f'{tipo} (±1 DP)')
-                plt.plot(dados.groupby('HORA')['TEMPERATURA'].mean(), label=tipo)
-            
-            plt.title(f'Variação Diária com Incerteza - {estado}')
-            plt.xlabel('Hora do Dia')
-            plt.ylabel('Temperatura (°C)')
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            
-            salvar_grafico(plt, reports_dir, f'area_{estado.lower()}.png')
-            
+            fig, artistas = obter_modelo('area_estado_capital', _modelo_area_estado_capital)
+
+            ax = artistas['ax']
+            por_tipo_hora = (agregados or calcular_agregados_estado_capital(df))['por_tipo_hora']
+            poligonos = []
+            for tipo in TIPOS_ESTADO_CAPITAL:
+                estatisticas = por_tipo_hora.loc[tipo]
+                horas = estatisticas.index.to_numpy()
+                inferior = (estatisticas['mean'] - estatisticas['std']).to_numpy()
+                superior = (estatisticas['mean'] + estatisticas['std']).to_numpy()
+
+                poligono = np.column_stack((
+                    np.concatenate((horas, horas[::-1])),
+                    np.concatenate((inferior, superior[::-1]))
+                ))
+                artistas['faixas'][tipo].set_verts([poligono])
+                artistas['linhas'][tipo].set_data(horas, estatisticas['mean'].to_numpy())
+                poligonos.append(poligono)
+
+            # As faixas contêm as linhas: os limites vêm apenas dos polígonos
+            ax.ignore_existing_data_limits = True
+            ax.update_datalim(np.concatenate(poligonos))
+            ax.autoscale_view()
+            artistas['titulo'].set_text(f'Variação Diária com Incerteza - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'area_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
         logger.error(f"Erro ao gerar área para {estado}: {str(e)}")
 
-def plot_polar_estado_capital(df, estado, reports_dir):
+def _modelo_polar_estado_capital():
+    """Constrói o modelo do gráfico polar estado-capital"""
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 7), subplot_kw={'projection': 'polar'})
+
+    # Converter horas para ângulos
+    angulos = np.linspace(0, 2*np.pi, 24, endpoint=False)
+    vazio = np.zeros_like(angulos)
+
+    eixos, linhas, areas = {}, {}, {}
+    for tipo, ax in zip(TIPOS_ESTADO_CAPITAL, [ax1, ax2]):
+        linhas[tipo], = ax.plot(angulos, vazio)
+        areas[tipo], = ax.fill(angulos, vazio, alpha=0.25)
+        ax.set_title(f'{tipo}')
+        ax.set_xticks(angulos)
+        ax.set_xticklabels([f'{h:02d}h' for h in range(24)], fontsize=8)
+        eixos[tipo] = ax
+
+    titulo = fig.suptitle('')
+    return fig, {
+        'angulos': angulos,
+        'titulo': titulo,
+        'eixos': eixos,
+        'linhas': linhas,
+        'areas': areas
+    }
+
+@medir_etapa
+@aceita_anomalia
+def plot_polar_estado_capital(df, estado, reports_dir, agregados=None):
     """Gera gráfico polar comparando padrões horários entre estado e capital"""
     try:
         if 'TIPO' in df.columns:
             configurar_estilo()
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 7), subplot_kw={'projection': 'polar'})
-            
-            for tipo, ax in zip(['ESTADO', 'CAPITAL'], [ax1, ax2]):
-                dados = df[df['TIPO'] == tipo]
-                medias = dados.groupby('HORA')['TEMPERATURA'].mean()
-                
-                # Converter horas para ângulos
-                angulos = np.linspace(0, 2*np.pi, 24, endpoint=False)
-                
-                # Plotar dados
-                ax.plot(angulos, medias.values)
-                ax.fill(angulos, medias.values, alpha=0.25)
-                ax.set_title(f'{tipo}')
-                ax.set_xticks(angulos)
-                ax.set_xticklabels([f'{h:02d}h' for h in range(24)], fontsize=8)
-                
-            plt.suptitle(f'Padrão Horário de Temperatura - {estado}')
-            
-            salvar_grafico(plt, reports_dir, f'polar_{estado.lower()}.png')
-            
+            fig, artistas = obter_modelo('polar_estado_capital', _modelo_polar_estado_capital)
+
+            angulos = artistas['angulos']
+            por_tipo_hora = (agregados or calcular_agregados_estado_capital(df))['por_tipo_hora']
+            for tipo in TIPOS_ESTADO_CAPITAL:
+                medias = por_tipo_hora.loc[tipo, 'mean'].reindex(range(24))
+
+                artistas['linhas'][tipo].set_ydata(medias.values)
+                artistas['areas'][tipo].set_xy(np.column_stack((angulos, medias.values)))
+                artistas['eixos'][tipo].relim()
+                artistas['eixos'][tipo].autoscale_view()
+
+            artistas['titulo'].set_text(f'Padrão Horário de Temperatura - {estado}')
+
+            salvar_grafico(fig, reports_dir, f'polar_{estado.lower()}.png', fechar=False)
+
     except Exception as e:
-        logger.error(f"Erro ao gerar polar para {estado}: {str(e)}")
+        logger.error(f"Erro ao gerar polar para {estado}: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import instrumentacao
+
+
+@pytest.fixture(autouse=True)
+def registros_limpos():
+    instrumentacao.coletar_registros()
+    yield
+    instrumentacao.coletar_registros()
+
+
+def test_etapas_sem_medida_de_memoria(monkeypatch):
+    # Plataformas sem ``resource`` (Windows) e sem psutil
+    monkeypatch.setattr(instrumentacao, 'resource', None)
+    monkeypatch.setitem(sys.modules, 'psutil', None)
+    assert instrumentacao.pico_rss_mb() is None
+
+    with instrumentacao.etapa('carregar', 'SP', linhas_entrada=10) as registro:
+        registro['linhas_saida'] = 5
+
+    registros = instrumentacao.coletar_registros()
+    assert registros[0]['aumento_pico_rss_mb'] is None
+    resumo = instrumentacao.resumir(registros)
+    assert resumo[0]['aumento_pico_rss_mb'] is None
+    assert 'carregar' in instrumentacao.formatar_tabela(resumo)
+
+
+@pytest.mark.skipif(instrumentacao.resource is None, reason="plataforma sem resource")
+def test_etapas_com_medida_de_memoria():
+    with instrumentacao.etapa('carregar'):
+        pass
+
+    resumo = instrumentacao.resumir(instrumentacao.coletar_registros())
+    assert resumo[0]['aumento_pico_rss_mb'] >= 0
@@ -0,0 +1,36 @@
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from servico_consultas import ServicoConsultas
+
+
+def _servico():
+    estacoes = pd.DataFrame(
+        {'REGIAO': ['SE', 'S'], 'ESTADO': ['SP', 'RS']},
+        index=pd.Index(['A001', 'A002'], name='CODIGO')
+    )
+    datas = pd.date_range('2020-01-01', periods=48, freq='h')
+    df = pd.DataFrame({
+        'DATA': np.tile(datas, 2),
+        'CODIGO': np.repeat(['A001', 'A002'], len(datas)),
+        'TEMPERATURA': np.arange(2 * len(datas), dtype=float)
+    })
+    return ServicoConsultas(estacoes, df)
+
+
+def test_estado_conta_consultas_concorrentes():
+    servico = _servico()
+    parametros = [{'medida': 'media', 'hora': str(hora % 24)} for hora in range(400)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(servico.consultar, parametros))
+
+    estado = json.loads(servico.estado())
+    assert estado['consultas'] == len(parametros)
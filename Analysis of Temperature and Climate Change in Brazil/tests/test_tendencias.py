@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import tendencias
+
+
+def _sen_por_coluna(t, y):
+    """Referência direta: mediana das inclinações válidas de todos os pares"""
+    i, j = np.triu_indices(len(t), k=1)
+    inclinacoes = (y[j] - y[i]) / (t[j] - t[i])
+    inclinacoes = inclinacoes[~np.isnan(inclinacoes)]
+    return np.median(inclinacoes) if len(inclinacoes) else np.nan
+
+
+@pytest.mark.parametrize('periodos', [2, 3, 8, 37, 60])
+@pytest.mark.parametrize('fracao_lacunas', [0.0, 0.3, 0.9])
+def test_inclinacao_sen_igual_a_mediana_dos_pares(periodos, fracao_lacunas):
+    rng = np.random.default_rng(periodos)
+    t = 2000 + np.arange(periodos) / 12
+    Y = rng.normal(size=(periodos, 25)).round(1) + 0.05 * np.arange(periodos)[:, None]
+    Y[rng.random(Y.shape) < fracao_lacunas] = np.nan
+    Y[:, 0] = np.nan
+
+    esperado = [_sen_por_coluna(t, Y[:, coluna]) for coluna in range(Y.shape[1])]
+
+    np.testing.assert_allclose(tendencias.inclinacao_sen(t, Y), esperado, rtol=1e-12)
+
+
+def test_inclinacao_sen_em_blocos(monkeypatch):
+    rng = np.random.default_rng(0)
+    t = np.arange(30, dtype=float)
+    Y = rng.normal(size=(30, 12))
+    Y[rng.random(Y.shape) < 0.2] = np.nan
+    completo = tendencias.inclinacao_sen(t, Y)
+
+    monkeypatch.setattr(tendencias, 'BLOCO_PARES', 1000)
+
+    np.testing.assert_array_equal(tendencias.inclinacao_sen(t, Y), completo)
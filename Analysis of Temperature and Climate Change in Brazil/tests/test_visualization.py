@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+import perfis_saida
+import visualization
+
+
+@pytest.fixture
+def passes_layout(monkeypatch):
+    """Conta os ajustes de layout: ``tight_layout`` e o recorte ``bbox_inches='tight'``"""
+    contagem = []
+    for nome in ('tight_layout', 'get_tightbbox'):
+        original = getattr(Figure, nome)
+
+        def contar(self, *args, _original=original, _nome=nome, **kwargs):
+            contagem.append(_nome)
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(Figure, nome, contar)
+    return contagem
+
+
+def _figura():
+    fig, (ax1, ax2) = plt.subplots(1, 2)
+    fig.suptitle('Temperatura')
+    ax1.set_xlabel('Ano')
+    ax2.set_ylabel('°C')
+    return fig
+
+
+@pytest.mark.parametrize('nome_perfil', list(perfis_saida.PERFIS_SAIDA))
+def test_salvar_grafico_ajusta_layout_uma_vez(tmp_path, monkeypatch, passes_layout, nome_perfil):
+    monkeypatch.setattr(perfis_saida, '_perfil_saida', nome_perfil)
+
+    caminho = visualization.salvar_grafico(_figura(), tmp_path, 'grafico.png')
+
+    assert caminho.exists()
+    assert len(passes_layout) == 1
+
+
+def test_perfil_com_recorte_nao_repete_layout(tmp_path, monkeypatch, passes_layout):
+    perfil = dict(perfis_saida.PERFIS_SAIDA['print'], bbox_inches='tight')
+    monkeypatch.setitem(perfis_saida.PERFIS_SAIDA, 'recortado', perfil)
+    monkeypatch.setattr(perfis_saida, '_perfil_saida', 'recortado')
+
+    caminho = visualization.salvar_grafico(_figura(), tmp_path, 'grafico.png')
+
+    assert caminho.exists()
+    assert passes_layout == ['get_tightbbox']
+
+
+def test_perfil_do_ambiente_desconhecido_usa_print(monkeypatch, caplog):
+    monkeypatch.setenv('PERFIL_SAIDA', 'web2')
+
+    assert perfis_saida._perfil_do_ambiente() == 'print'
+    assert 'web2' in caplog.text
+
+
+def test_perfil_do_ambiente(monkeypatch):
+    monkeypatch.setenv('PERFIL_SAIDA', 'web')
+
+    assert perfis_saida._perfil_do_ambiente() == 'web'
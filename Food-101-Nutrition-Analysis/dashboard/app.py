@@ -4,7 +4,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 import seaborn as sns
 import numpy as np
+import os
 from pathlib import Path
+from filter_index import FilterIndex
+from nutrition_model import NutritionModel
+from meal_optimizer import MealOptimizer
+from similarity_index import SimilarityIndex
+from table_view import sort_order, page_positions, gradient_styles
 
 # Configuração da página
 st.set_page_config(
@@ -168,79 +174,153 @@ nutrient_names = {
     "sodium": "Sódio"
 }
 
-# Load and cache data
+# Caminho do dataset (FOOD101_DATA_PATH permite apontar para outro catálogo,
+# como os catálogos sintéticos do teste de carga)
+DATA_PATH = Path(os.environ.get(
+    "FOOD101_DATA_PATH",
+    Path(__file__).parents[1] / "data" / "nutrition.csv"
+))
+
+# Bases de comparação dos valores nutricionais
+BASES_VALORES = {
+    'referencia': 'Porção de referência',
+    '100g': 'Por 100 g'
+}
+
+# Modelo com todas as porções; scores derivados vêm do cache em disco e o
+# modelo é compartilhado por todas as sessões do processo
+@st.cache_resource
+def load_model():
+    model = NutritionModel.load(DATA_PATH, cache_dir=DATA_PATH.parent / "cache")
+    for view in model.views.values():
+        # Traduzir nomes dos alimentos
+        view['label_pt'] = view['label'].map(food_translations)
+    return model
+
+# Load data (compartilhado entre sessões: não modificar)
+def load_data(base='referencia'):
+    return load_model().view(base)
+
+# Índice dos filtros: construído uma vez por processo e compartilhado entre sessões
+@st.cache_resource
+def load_filter_index(base='referencia'):
+    return FilterIndex(load_data(base))
+
+# Índice de similaridade entre perfis nutricionais, também compartilhado
+@st.cache_resource
+def load_similarity_index(base='referencia'):
+    return SimilarityIndex(load_data(base))
+
+# Ordenação de todo o dataset por coluna, reaproveitada por todas as páginas
+@st.cache_resource
+def load_sort_order(base, column, ascending):
+    return sort_order(load_data(base), column, ascending)
+
+# Posições de linhas recebidas como bytes (chave barata de hash para o cache)
+def positions_from_key(key):
+    return np.frombuffer(key, dtype=np.intp)
+
+# Nomes exibidos: tradução quando existe, senão o rótulo original
+@st.cache_resource
+def food_names(base='referencia'):
+    df = load_data(base)
+    return df['label_pt'].fillna(df['label'])
+
+# Sugestões de refeições, guardadas por base, candidatos e limites
 @st.cache_data
-def load_data():
-    data_path = Path(__file__).parents[1] / "data" / "nutrition.csv"
-    df = pd.read_csv(data_path)
-    df = df.groupby('label').first().reset_index()
-    
-    # Traduzir nomes dos alimentos
-    df['label_pt'] = df['label'].map(food_translations)
-    
-    # Calcular métricas de qualidade nutricional
-    df['protein_density'] = (df['protein'] / df['calories'] * 100).round(2)
-    df['fiber_density'] = (df['fiber'] / df['calories'] * 100).round(2)
-    df['carb_density'] = (df['carbohydrates'] / df['calories'] * 100).round(2)
-    
-    # Score nutricional (0-100)
-    max_values = {
-        'protein_density': 20,  # 20g proteína por 100kcal é excelente
-        'fiber_density': 10,    # 10g fibra por 100kcal é excelente
-        'sugars': 25,          # Limite máximo de açúcar
-        'sodium': 2300,        # Limite máximo de sódio
-    }
-    
-    # Calcular scores individuais (0-100)
-    df['protein_score'] = (df['protein_density'] / max_values['protein_density'] * 100).clip(0, 100)
-    df['fiber_score'] = (df['fiber_density'] / max_values['fiber_density'] * 100).clip(0, 100)
-    df['sugar_score'] = ((max_values['sugars'] - df['sugars']) / max_values['sugars'] * 100).clip(0, 100)
-    df['sodium_score'] = ((max_values['sodium'] - df['sodium']) / max_values['sodium'] * 100).clip(0, 100)
-    
-    # Score final (prioriza proteína e fibra, penaliza açúcar e sódio)
-    df['nutrition_score'] = (
-        df['protein_score'] * 0.35 +
-        df['fiber_score'] * 0.35 +
-        df['sugar_score'] * 0.15 +
-        df['sodium_score'] * 0.15
-    ).round(1)
-    
-    # Classificar alimentos
-    df['recomendacao'] = pd.qcut(
-        df['nutrition_score'],
-        q=4,
-        labels=['Evitar', 'Consumo Moderado', 'Bom', 'Excelente']
+def suggest_meals(base, positions, size, limits, top_n=10):
+    candidates = load_data(base).iloc[positions_from_key(positions)]
+    meals = MealOptimizer(candidates).best_meals(size, dict(limits), top_n)
+    names = candidates['label_pt'].fillna(candidates['label']).to_numpy()
+    meals.insert(0, 'combinacao', [' + '.join(names[list(items)]) for items in meals['items']])
+    return meals.drop(columns='items')
+
+# Figuras Plotly memorizadas pelas entradas: só são refeitas quando os
+# alimentos filtrados (ou a seleção) mudam
+@st.cache_data
+def top_profile_figure(base, positions, perfil):
+    df_filtered = load_data(base).iloc[positions_from_key(positions)]
+    df_perfil = df_filtered[df_filtered['perfil_nutricional'] == perfil]
+    if len(df_perfil) == 0:
+        return None
+
+    # Top alimentos do perfil (até 5)
+    top_n = min(5, len(df_perfil))
+    top_foods = df_perfil.nlargest(top_n, 'nutrition_score')
+    return px.bar(
+        top_foods,
+        x='nutrition_score',
+        y='label_pt',
+        orientation='h',
+        color='calories',
+        title=f'Top {top_n} Alimentos - {perfil}',
+        labels={
+            'nutrition_score': 'Score Nutricional',
+            'label_pt': 'Alimento',
+            'calories': 'Calorias'
+        }
     )
-    
-    # Categorizar por tipo principal de nutriente
-    conditions = [
-        (df['protein_density'] > 15),                    # Alto em proteína
-        (df['fiber_density'] > 7),                       # Alto em fibra
-        (df['fiber'] >= 6),                             # Rico em fibra (baseado em RDA)
-        (df['carb_density'] > 50) & (df['fiber'] >= 4), # Rico em carboidratos complexos
-        (df['sugars'] < 5),                             # Baixo açúcar
-    ]
-    choices = [
-        'Rico em Proteína',
-        'Alto em Fibra',
-        'Rico em Fibra',
-        'Rico em Carboidratos Complexos',
-        'Baixo Açúcar'
-    ]
-    df['perfil_nutricional'] = np.select(conditions, choices, default='Balanceado')
-    
-    return df
 
-# Load data
-df = load_data()
+@st.cache_data
+def similar_foods_figure(base, referencia, positions=None):
+    df = load_data(base)
+    nomes_alimentos = food_names(base)
+    vizinhos, distancias = load_similarity_index(base).query(
+        referencia,
+        k=5,
+        candidates=None if positions is None else positions_from_key(positions)
+    )
+    if len(vizinhos) == 0:
+        return None
+
+    df_semelhantes = df.iloc[vizinhos].assign(
+        nome=nomes_alimentos.iloc[vizinhos].to_numpy(),
+        similaridade=(100 / (1 + distancias)).round(1)
+    )
+    return px.bar(
+        df_semelhantes,
+        x='similaridade',
+        y='nome',
+        orientation='h',
+        color='calories',
+        title=f'Top {len(vizinhos)} Alimentos Semelhantes - {nomes_alimentos.iloc[referencia]}',
+        labels={
+            'similaridade': 'Similaridade',
+            'nome': 'Alimento',
+            'calories': 'Calorias'
+        }
+    )
+
+@st.cache_data
+def comparison_figure(df_comparison):
+    return px.bar(
+        df_comparison,
+        x='Alimento',
+        y=['Calorias', 'Proteína', 'Fibra', 'Açúcares'],
+        title='Comparação Nutricional',
+        barmode='group'
+    )
 
 # Sidebar com filtros
 with st.sidebar:
     st.title("🔍 Filtros Nutricionais")
+
+    # Base dos valores: porção de referência ou por 100 g
+    st.subheader("Porção")
+    base = st.radio(
+        "Base dos valores",
+        options=list(BASES_VALORES),
+        format_func=BASES_VALORES.get,
+        horizontal=True
+    )
+
+    # Load data
+    df = load_data(base)
+    filter_index = load_filter_index(base)
     
     # Filtro de recomendação
     st.subheader("Recomendação")
-    opcoes_recomendacao = sorted(df['recomendacao'].unique())
+    opcoes_recomendacao = filter_index.options['recomendacao']
     recomendacoes = st.multiselect(
         "Nível de Recomendação",
         options=opcoes_recomendacao,
@@ -249,17 +329,20 @@ with st.sidebar:
     
     # Filtros de calorias
     st.subheader("Calorias")
+    # Padrão de 500 kcal limitado à faixa da base (na base por 100 g o máximo é menor)
+    cal_minimo = int(filter_index.ranges['calories'][0])
+    cal_maximo = int(filter_index.ranges['calories'][1])
     cal_max = st.slider(
         "Limite de Calorias (kcal)",
-        min_value=int(df['calories'].min()),
-        max_value=int(df['calories'].max()),
-        value=500,
+        min_value=cal_minimo,
+        max_value=cal_maximo,
+        value=min(max(500, cal_minimo), cal_maximo),
         help="Filtrar alimentos até este valor calórico"
     )
     
     # Perfil nutricional
     st.subheader("Perfil Nutricional")
-    opcoes_perfil = sorted(df['perfil_nutricional'].unique())
+    opcoes_perfil = filter_index.options['perfil_nutricional']
     perfis = st.multiselect(
         "Tipo de Alimento",
         options=opcoes_perfil,
@@ -274,14 +357,14 @@ with st.sidebar:
         min_protein = st.number_input(
             "Mín. Proteína (g)",
             min_value=0.0,
-            max_value=float(df['protein'].max()),
+            max_value=float(filter_index.ranges['protein'][1]),
             value=0.0,
             step=1.0
         )
         min_fiber = st.number_input(
             "Mín. Fibra (g)",
             min_value=0.0,
-            max_value=float(df['fiber'].max()),
+            max_value=float(filter_index.ranges['fiber'][1]),
             value=0.0,
             step=1.0
         )
@@ -290,36 +373,32 @@ with st.sidebar:
         max_sugar = st.number_input(
             "Máx. Açúcar (g)",
             min_value=0.0,
-            max_value=float(df['sugars'].max()),
-            value=float(df['sugars'].max()),
+            max_value=float(filter_index.ranges['sugars'][1]),
+            value=float(filter_index.ranges['sugars'][1]),
             step=1.0
         )
         max_sodium = st.number_input(
             "Máx. Sódio (mg)",
             min_value=0.0,
-            max_value=float(df['sodium'].max()),
-            value=float(df['sodium'].max()),
+            max_value=float(filter_index.ranges['sodium'][1]),
+            value=float(filter_index.ranges['sodium'][1]),
             step=100.0
         )
 
-# Aplicar filtros
-df_filtered = df.copy()  # Começar com todos os dados
-
-# Aplicar filtros somente se foram selecionados
-if recomendacoes:
-    df_filtered = df_filtered[df_filtered['recomendacao'].isin(recomendacoes)]
-
-if perfis:
-    df_filtered = df_filtered[df_filtered['perfil_nutricional'].isin(perfis)]
+# Aplicar filtros pelo índice (seleções vazias não filtram)
+categorias = {'recomendacao': recomendacoes, 'perfil_nutricional': perfis}
+limites = {
+    'calories': (None, cal_max),
+    'protein': (min_protein, None),
+    'fiber': (min_fiber, None),
+    'sugars': (None, max_sugar),
+    'sodium': (None, max_sodium)
+}
+posicoes_filtradas = filter_index.query(categories=categorias, ranges=limites)
+df_filtered = df.iloc[posicoes_filtradas]
 
-# Aplicar demais filtros
-df_filtered = df_filtered[
-    (df_filtered['calories'] <= cal_max) &
-    (df_filtered['protein'] >= min_protein) &
-    (df_filtered['fiber'] >= min_fiber) &
-    (df_filtered['sugars'] <= max_sugar) &
-    (df_filtered['sodium'] <= max_sodium)
-]
+# Chave dos alimentos filtrados para as figuras e buscas em cache
+chave_filtrados = posicoes_filtradas.tobytes()
 
 # Verificar se há resultados após filtros
 if len(df_filtered) == 0:
@@ -342,168 +421,255 @@ with col3:
 st.header("🏆 Melhores Escolhas por Perfil")
 
 # Se nenhum perfil foi selecionado, mostrar todos
-perfis_para_mostrar = perfis if perfis else sorted(df['perfil_nutricional'].unique())
+perfis_para_mostrar = perfis if perfis else opcoes_perfil
 
 # Agrupar por perfil nutricional
 for perfil in perfis_para_mostrar:
     st.subheader(f"📌 {perfil}")
-    df_perfil = df_filtered[df_filtered['perfil_nutricional'] == perfil]
-    
-    if len(df_perfil) > 0:
-        # Top alimentos do perfil (até 5)
-        top_n = min(5, len(df_perfil))
-        top_foods = df_perfil.nlargest(top_n, 'nutrition_score')
-        fig = px.bar(
-            top_foods,
-            x='nutrition_score',
-            y='label_pt',
-            orientation='h',
-            color='calories',
-            title=f'Top {top_n} Alimentos - {perfil}',
-            labels={
-                'nutrition_score': 'Score Nutricional',
-                'label_pt': 'Alimento',
-                'calories': 'Calorias'
-            }
+    fig = top_profile_figure(base, chave_filtrados, perfil)
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+
+# Alimentos com perfil nutricional semelhante
+@st.fragment
+def secao_semelhantes(base, chave_filtrados):
+    st.header("🔁 Alimentos Semelhantes")
+    nomes_alimentos = food_names(base)
+    ordem_nomes = np.argsort(nomes_alimentos.to_numpy(dtype=str), kind='stable')
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        referencia = st.selectbox(
+            "Encontrar alimentos semelhantes a",
+            options=ordem_nomes.tolist(),
+            format_func=lambda posicao: nomes_alimentos.iloc[posicao]
+        )
+    with col2:
+        restringir = st.checkbox(
+            "Apenas alimentos filtrados",
+            value=True,
+            help="Restringe a busca aos alimentos que atendem aos filtros da barra lateral"
         )
+
+    fig = similar_foods_figure(base, referencia, chave_filtrados if restringir else None)
+    if fig is not None:
         st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Nenhum outro alimento atende aos filtros selecionados.")
+
+secao_semelhantes(base, chave_filtrados)
 
 # Análise de Combinações Personalizadas
-st.header("🤝 Análise de Combinações")
+@st.fragment
+def secao_combinacoes(df_filtered, cal_max, min_protein, min_fiber):
+    st.header("🤝 Análise de Combinações")
 
-# Interface para seleção de alimentos
-col1, col2 = st.columns(2)
+    # Alimentos sem tradução aparecem com o rótulo original
+    df_filtered = df_filtered.assign(label_pt=df_filtered['label_pt'].fillna(df_filtered['label']))
 
-with col1:
-    st.subheader("Primeiro Alimento")
-    # Criar lista de opções com opção padrão
-    opcoes_alimento1 = ["Selecione um alimento..."] + list(df_filtered['label_pt'].dropna().sort_values())
-    alimento1 = st.selectbox(
-        "Selecione o primeiro alimento",
-        options=opcoes_alimento1,
-        key='alimento1'
-    )
+    # Interface para seleção de alimentos
+    col1, col2 = st.columns(2)
 
-with col2:
-    st.subheader("Segundo Alimento")
-    # Criar lista de opções com opção padrão
-    if alimento1 and alimento1 != "Selecione um alimento...":
-        opcoes_alimento2 = ["Selecione um alimento..."] + list(df_filtered[
-            (df_filtered['label_pt'] != alimento1) & 
-            (df_filtered['label_pt'].notna())
-        ]['label_pt'].sort_values())
-    else:
-        opcoes_alimento2 = ["Selecione um alimento..."]
-    
-    alimento2 = st.selectbox(
-        "Selecione o segundo alimento",
-        options=opcoes_alimento2,
-        key='alimento2'
-    )
+    with col1:
+        st.subheader("Primeiro Alimento")
+        # Criar lista de opções com opção padrão
+        opcoes_alimento1 = ["Selecione um alimento..."] + list(df_filtered['label_pt'].dropna().sort_values())
+        alimento1 = st.selectbox(
+            "Selecione o primeiro alimento",
+            options=opcoes_alimento1,
+            key='alimento1'
+        )
 
-# Analisar combinação selecionada
-if (alimento1 != "Selecione um alimento..." and 
-    alimento2 != "Selecione um alimento..." and 
-    alimento1 and alimento2):
-    # Buscar dados dos alimentos selecionados
-    item1 = df_filtered[df_filtered['label_pt'] == alimento1].iloc[0]
-    item2 = df_filtered[df_filtered['label_pt'] == alimento2].iloc[0]
-    
-    # Calcular métricas da combinação
-    calorias_total = item1['calories'] + item2['calories']
-    proteina_total = item1['protein'] + item2['protein']
-    fibra_total = item1['fiber'] + item2['fiber']
-    score_medio = (item1['nutrition_score'] + item2['nutrition_score']) / 2
-    
-    # Mostrar análise da combinação
-    st.subheader("📊 Análise da Combinação")
-    
-    # Métricas principais
-    col1, col2, col3, col4 = st.columns(4)
+    with col2:
+        st.subheader("Segundo Alimento")
+        # Criar lista de opções com opção padrão
+        if alimento1 and alimento1 != "Selecione um alimento...":
+            opcoes_alimento2 = ["Selecione um alimento..."] + list(df_filtered[
+                (df_filtered['label_pt'] != alimento1) & 
+                (df_filtered['label_pt'].notna())
+            ]['label_pt'].sort_values())
+        else:
+            opcoes_alimento2 = ["Selecione um alimento..."]
+        
+        alimento2 = st.selectbox(
+            "Selecione o segundo alimento",
+            options=opcoes_alimento2,
+            key='alimento2'
+        )
+
+    # Analisar combinação selecionada
+    if (alimento1 != "Selecione um alimento..." and 
+        alimento2 != "Selecione um alimento..." and 
+        alimento1 and alimento2):
+        # Buscar dados dos alimentos selecionados
+        item1 = df_filtered[df_filtered['label_pt'] == alimento1].iloc[0]
+        item2 = df_filtered[df_filtered['label_pt'] == alimento2].iloc[0]
+        
+        # Calcular métricas da combinação
+        calorias_total = item1['calories'] + item2['calories']
+        proteina_total = item1['protein'] + item2['protein']
+        fibra_total = item1['fiber'] + item2['fiber']
+        score_medio = (item1['nutrition_score'] + item2['nutrition_score']) / 2
+        
+        # Mostrar análise da combinação
+        st.subheader("📊 Análise da Combinação")
+        
+        # Métricas principais
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Calorias Totais", f"{calorias_total:.0f} kcal")
+        with col2:
+            st.metric("Proteína Total", f"{proteina_total:.1f}g")
+        with col3:
+            st.metric("Fibra Total", f"{fibra_total:.1f}g")
+        with col4:
+            st.metric("Score Médio", f"{score_medio:.1f}")
+        
+        # Detalhamento nutricional
+        st.write("**Detalhamento por Alimento:**")
+        
+        # Criar DataFrame comparativo
+        comparison_data = {
+            'Alimento': [item1['label_pt'], item2['label_pt']],
+            'Calorias': [item1['calories'], item2['calories']],
+            'Proteína': [item1['protein'], item2['protein']],
+            'Fibra': [item1['fiber'], item2['fiber']],
+            'Açúcares': [item1['sugars'], item2['sugars']],
+            'Sódio': [item1['sodium'], item2['sodium']],
+            'Score': [item1['nutrition_score'], item2['nutrition_score']]
+        }
+        df_comparison = pd.DataFrame(comparison_data)
+        
+        # Gráfico comparativo
+        st.plotly_chart(comparison_figure(df_comparison), use_container_width=True)
+        
+        # Avaliação da combinação
+        st.subheader("💡 Avaliação da Combinação")
+        
+        # Análise calórica
+        if calorias_total <= cal_max:
+            st.success(f"✅ Combinação dentro do limite calórico ({cal_max} kcal)")
+        else:
+            st.warning(f"⚠️ Combinação excede o limite calórico ({cal_max} kcal)")
+        
+        # Análise proteica
+        if proteina_total >= min_protein:
+            st.success(f"✅ Atinge o mínimo de proteína desejado ({min_protein}g)")
+        else:
+            st.info(f"ℹ️ Abaixo do mínimo de proteína desejado ({min_protein}g)")
+        
+        # Análise de fibras
+        if fibra_total >= min_fiber:
+            st.success(f"✅ Atinge o mínimo de fibra desejado ({min_fiber}g)")
+        else:
+            st.info(f"ℹ️ Abaixo do mínimo de fibra desejado ({min_fiber}g)")
+        
+        # Score nutricional
+        if score_medio >= 70:
+            st.success("🌟 Excelente combinação nutricional!")
+        elif score_medio >= 50:
+            st.info("✨ Boa combinação nutricional")
+        else:
+            st.warning("⚠️ Combinação com potencial para melhorias")
+
+secao_combinacoes(df_filtered, cal_max, min_protein, min_fiber)
+
+# Sugestões de combinações: os limites da barra lateral valem para o total da refeição
+@st.fragment
+def secao_sugestoes(base, categorias, limites):
+    st.subheader("🔎 Sugestões de Combinações")
+    col1, col2 = st.columns(2)
     with col1:
-        st.metric("Calorias Totais", f"{calorias_total:.0f} kcal")
+        tamanho_refeicao = st.slider(
+            "Alimentos por refeição",
+            min_value=2,
+            max_value=6,
+            value=2,
+            help="Pares e trios são avaliados por completo; refeições maiores usam busca com poda"
+        )
     with col2:
-        st.metric("Proteína Total", f"{proteina_total:.1f}g")
-    with col3:
-        st.metric("Fibra Total", f"{fibra_total:.1f}g")
-    with col4:
-        st.metric("Score Médio", f"{score_medio:.1f}")
-    
-    # Detalhamento nutricional
-    st.write("**Detalhamento por Alimento:**")
-    
-    # Criar DataFrame comparativo
-    comparison_data = {
-        'Alimento': [item1['label_pt'], item2['label_pt']],
-        'Calorias': [item1['calories'], item2['calories']],
-        'Proteína': [item1['protein'], item2['protein']],
-        'Fibra': [item1['fiber'], item2['fiber']],
-        'Açúcares': [item1['sugars'], item2['sugars']],
-        'Sódio': [item1['sodium'], item2['sodium']],
-        'Score': [item1['nutrition_score'], item2['nutrition_score']]
-    }
-    df_comparison = pd.DataFrame(comparison_data)
-    
-    # Gráfico comparativo
-    fig = px.bar(
-        df_comparison,
-        x='Alimento',
-        y=['Calorias', 'Proteína', 'Fibra', 'Açúcares'],
-        title='Comparação Nutricional',
-        barmode='group'
+        quantidade_sugestoes = st.slider("Quantidade de sugestões", min_value=5, max_value=20, value=10)
+
+    # Candidatos: perfis e recomendações selecionados, sem exceder sozinhos os limites máximos
+    candidatos = load_filter_index(base).query(
+        categories=categorias,
+        ranges={column: (None, high) for column, (low, high) in limites.items() if high is not None}
     )
-    st.plotly_chart(fig, use_container_width=True)
-    
-    # Avaliação da combinação
-    st.subheader("💡 Avaliação da Combinação")
-    
-    # Análise calórica
-    if calorias_total <= cal_max:
-        st.success(f"✅ Combinação dentro do limite calórico ({cal_max} kcal)")
-    else:
-        st.warning(f"⚠️ Combinação excede o limite calórico ({cal_max} kcal)")
-    
-    # Análise proteica
-    if proteina_total >= min_protein:
-        st.success(f"✅ Atinge o mínimo de proteína desejado ({min_protein}g)")
-    else:
-        st.info(f"ℹ️ Abaixo do mínimo de proteína desejado ({min_protein}g)")
-    
-    # Análise de fibras
-    if fibra_total >= min_fiber:
-        st.success(f"✅ Atinge o mínimo de fibra desejado ({min_fiber}g)")
-    else:
-        st.info(f"ℹ️ Abaixo do mínimo de fibra desejado ({min_fiber}g)")
-    
-    # Score nutricional
-    if score_medio >= 70:
-        st.success("🌟 Excelente combinação nutricional!")
-    elif score_medio >= 50:
-        st.info("✨ Boa combinação nutricional")
-    else:
-        st.warning("⚠️ Combinação com potencial para melhorias")
-
-# Tabela detalhada
-st.header("📋 Detalhamento Nutricional")
-if st.checkbox("Mostrar tabela completa"):
-    cols_to_show = [
-        'label_pt', 'calories', 'protein', 'fiber', 'sugars', 'sodium',
-        'nutrition_score', 'perfil_nutricional', 'recomendacao'
-    ]
-    
-    df_display = df_filtered[cols_to_show].copy()
-    df_display.columns = [
-        'Alimento', 'Calorias', 'Proteína (g)', 'Fibras (g)', 
-        'Açúcares (g)', 'Sódio (mg)', 'Score', 'Perfil', 'Recomendação'
-    ]
-    
-    df_display = df_display.sort_values('Score', ascending=False)
-    
-    st.dataframe(
-        df_display.style.background_gradient(subset=['Score'], cmap='RdYlGn'),
-        use_container_width=True
+    sugestoes = suggest_meals(
+        base,
+        candidatos.tobytes(),
+        tamanho_refeicao,
+        tuple(limites.items()),
+        quantidade_sugestoes
     )
 
+    if len(sugestoes) == 0:
+        st.info("Nenhuma combinação atende aos limites da barra lateral. Tente ajustar os critérios.")
+    else:
+        df_sugestoes = sugestoes[[
+            'combinacao', 'calories', 'protein', 'fiber', 'sugars', 'sodium', 'nutrition_score'
+        ]].copy()
+        df_sugestoes.columns = [
+            'Combinação', 'Calorias', 'Proteína (g)', 'Fibras (g)',
+            'Açúcares (g)', 'Sódio (mg)', 'Score Médio'
+        ]
+        st.dataframe(df_sugestoes.round(1), use_container_width=True, hide_index=True)
+
+secao_sugestoes(base, categorias, limites)
+
+# Tabela detalhada: ordenada e paginada no servidor, só a página visível é enviada
+COLUNAS_TABELA = {
+    'label_pt': 'Alimento',
+    'calories': 'Calorias',
+    'protein': 'Proteína (g)',
+    'fiber': 'Fibras (g)',
+    'sugars': 'Açúcares (g)',
+    'sodium': 'Sódio (mg)',
+    'nutrition_score': 'Score',
+    'perfil_nutricional': 'Perfil',
+    'recomendacao': 'Recomendação'
+}
+
+@st.fragment
+def secao_tabela(base, posicoes_filtradas):
+    st.header("📋 Detalhamento Nutricional")
+    if st.checkbox("Mostrar tabela completa"):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            ordenar_por = st.selectbox(
+                "Ordenar por",
+                options=list(COLUNAS_TABELA),
+                index=list(COLUNAS_TABELA).index('nutrition_score'),
+                format_func=COLUNAS_TABELA.get
+            )
+        with col2:
+            crescente = st.checkbox("Ordem crescente", value=False)
+        with col3:
+            linhas_por_pagina = st.selectbox("Linhas por página", options=[25, 50, 100])
+        total_paginas = max(1, -(-len(posicoes_filtradas) // linhas_por_pagina))
+        with col4:
+            pagina = st.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1)
+
+        df = load_data(base)
+        posicoes_pagina = page_positions(
+            load_sort_order(base, ordenar_por, crescente),
+            posicoes_filtradas,
+            int(pagina),
+            linhas_por_pagina
+        )
+        df_display = df.iloc[posicoes_pagina][list(COLUNAS_TABELA)].rename(columns=COLUNAS_TABELA)
+
+        # Escala de cores calculada sobre todos os filtrados, aplicada só à página
+        scores = df['nutrition_score'].to_numpy(dtype=float)[posicoes_filtradas]
+        estilos = gradient_styles(df_display['Score'].to_numpy(), np.nanmin(scores), np.nanmax(scores))
+        st.dataframe(
+            df_display.style.apply(lambda _: estilos, subset=['Score']),
+            use_container_width=True
+        )
+        st.caption(f"Página {int(pagina)} de {total_paginas} · {len(posicoes_filtradas)} alimentos")
+
+secao_tabela(base, posicoes_filtradas)
+
 # Guia de uso
 st.header("ℹ️ Como Usar este Dashboard")
 st.write("""
@@ -514,5 +680,6 @@ st.write("""
   - 🟣 Rico em Fibra: ≥6g fibra (baseado em RDA)
   - 🟣 Rico em Carboidratos Complexos: >50% calorias de carboidratos e ≥4g fibra
   - ⚪ Balanceado: Bom equilíbrio geral
-- **Combinações**: Sugestões de pares de alimentos que se complementam nutricionalmente mantendo baixas calorias
+- **Alimentos Semelhantes**: Os mais próximos em calorias, macronutrientes, fibras, açúcares e sódio (valores normalizados)
+- **Combinações**: Sugestões de pares, trios ou refeições maiores com o melhor score médio dentro dos limites da barra lateral
 """)
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+# Filtros de faixa da barra lateral: coluna -> limite aplicado pelo widget
+RANGE_FILTERS = {
+    'calories': 'max',
+    'protein': 'min',
+    'fiber': 'min',
+    'sugars': 'max',
+    'sodium': 'max'
+}
+
+CATEGORY_FILTERS = ('recomendacao', 'perfil_nutricional')
+
+
+class FilterIndex:
+    """
+    Precomputed index for the sidebar filters
+
+    Built once per dataset: each range column is kept sorted together with its
+    argsort positions, and each value of the categorical columns gets a packed
+    bitmap of its rows. A filter combination is then resolved by binary search
+    on the most selective range, followed by vectorized checks of the other
+    conditions on the candidate rows only.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Dataset with the range and categorical filter columns
+    range_columns : iterable
+        Numeric columns filtered by a minimum and/or maximum
+    category_columns : iterable
+        Categorical columns filtered by a set of values
+    """
+
+    def __init__(self, df, range_columns=RANGE_FILTERS, category_columns=CATEGORY_FILTERS):
+        self.size = len(df)
+        self.values = {}
+        self.sorted_values = {}
+        self.order = {}
+        self.valid = {}
+        self.ranges = {}
+        for column in range_columns:
+            values = df[column].to_numpy(dtype=float)
+            order = np.argsort(values, kind='stable')  # NaN ficam no final
+            self.values[column] = values
+            self.order[column] = order
+            self.sorted_values[column] = values[order]
+            self.valid[column] = int(np.count_nonzero(~np.isnan(values)))
+            self.ranges[column] = (np.nanmin(values), np.nanmax(values)) if self.valid[column] else (0.0, 0.0)
+
+        self.bitmaps = {}
+        self.options = {}
+        for column in category_columns:
+            codes, uniques = pd.factorize(df[column])
+            self.bitmaps[column] = {
+                str(value): np.packbits(codes == code) for code, value in enumerate(uniques)
+            }
+            self.options[column] = sorted(self.bitmaps[column])
+
+    def _range_bounds(self, column, low=None, high=None):
+        """Slice [start, stop) of the sorted column within [low, high]"""
+        sorted_values = self.sorted_values[column]
+        stop = self.valid[column]
+        start = 0 if low is None else int(np.searchsorted(sorted_values[:stop], low, side='left'))
+        if high is not None:
+            stop = int(np.searchsorted(sorted_values[:stop], high, side='right'))
+        return start, max(start, stop)
+
+    def _category_bitmap(self, categories):
+        """Packed bitmap of the rows matching every categorical filter (None if no filter)"""
+        selection = None
+        for column, values in categories.items():
+            if not values:
+                continue
+            bitmap = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+            for value in values:
+                if str(value) in self.bitmaps[column]:
+                    bitmap |= self.bitmaps[column][str(value)]
+            selection = bitmap if selection is None else selection & bitmap
+        return selection
+
+    def query(self, categories=None, ranges=None):
+        """
+        Positions of the rows matching all filters, in dataset order
+
+        Parameters:
+        -----------
+        categories : dict
+            {column: selected values}; an empty selection does not filter
+        ranges : dict
+            {column: (low, high)}; None bounds are open
+
+        Returns:
+        --------
+        np.ndarray
+            Row positions (for ``df.iloc``)
+        """
+        ranges = {column: bounds for column, bounds in (ranges or {}).items() if bounds is not None}
+        bitmap = self._category_bitmap(categories or {})
+
+        if ranges:
+            # Faixa mais seletiva por busca binária; as demais só nos candidatos
+            bounds = {column: self._range_bounds(column, *limits) for column, limits in ranges.items()}
+            first = min(bounds, key=lambda column: bounds[column][1] - bounds[column][0])
+            start, stop = bounds[first]
+            candidates = np.sort(self.order[first][start:stop])
+            for column, (low, high) in ranges.items():
+                if column == first or len(candidates) == 0:
+                    continue
+                values = self.values[column][candidates]
+                keep = ~np.isnan(values)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                candidates = candidates[keep]
+        elif bitmap is not None:
+            return np.flatnonzero(np.unpackbits(bitmap, count=self.size))
+        else:
+            return np.arange(self.size)
+
+        if bitmap is not None and len(candidates):
+            bits = (bitmap[candidates >> 3] >> (7 - (candidates & 7))) & 1
+            candidates = candidates[bits.astype(bool)]
+        return candidates
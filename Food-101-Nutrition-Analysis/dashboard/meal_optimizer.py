@@ -0,0 +1,249 @@
+from math import comb
+
+import numpy as np
+import pandas as pd
+
+# Nutrientes somados na refeição (os mesmos limites da barra lateral)
+MEAL_NUTRIENTS = ['calories', 'protein', 'fiber', 'sugars', 'sodium']
+
+# Até este tamanho a busca é exaustiva (broadcasting com poda pelos limites);
+# acima dele, ou com candidatos demais, branch and bound limitado pela
+# mochila de calorias
+EXHAUSTIVE_MAX_SIZE = 3
+EXHAUSTIVE_MAX_COMBINATIONS = 1_000_000
+
+# Extensões (refeição parcial x alimento) avaliadas por iteração do branch and bound
+CHUNK_ELEMENTS = 1_000_000
+
+# Células da tabela da mochila; acima disso, só uma linha a cada tantas é guardada
+KNAPSACK_MAX_CELLS = 5_000_000
+
+# Folga para erros de arredondamento ao comparar limitantes e scores
+TOLERANCE = 1e-9
+
+
+class MealOptimizer:
+    """
+    Search of the food combinations with the best average nutrition score
+
+    A meal is a set of distinct foods whose summed nutrients must respect the
+    limits (the sidebar filters applied to the meal totals). Nutrients are
+    assumed non-negative, so a partial meal above a maximum is discarded with
+    all its extensions. Pairs and triples of small candidate sets are
+    enumerated exhaustively with NumPy broadcasting; larger meals or catalogs
+    use a best-first branch and bound whose upper bound comes from a 0/1
+    knapsack DP over the calorie budget.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Candidate foods with the ``MEAL_NUTRIENTS`` and score columns
+    score_column : str
+        Column maximized (averaged over the foods of the meal)
+    """
+
+    def __init__(self, df, score_column='nutrition_score'):
+        values = df[MEAL_NUTRIENTS].to_numpy(dtype=float)
+        scores = df[score_column].to_numpy(dtype=float)
+        valid = np.isfinite(values).all(axis=1) & np.isfinite(scores)
+        self.positions = np.flatnonzero(valid)
+        self.values = values[valid]
+        self.scores = scores[valid]
+
+    @staticmethod
+    def _limits(limits):
+        """Arrays of lower and upper limits in ``MEAL_NUTRIENTS`` order"""
+        low = np.full(len(MEAL_NUTRIENTS), -np.inf)
+        high = np.full(len(MEAL_NUTRIENTS), np.inf)
+        for column, bounds in (limits or {}).items():
+            if bounds is None:
+                continue
+            position = MEAL_NUTRIENTS.index(column)
+            if bounds[0] is not None:
+                low[position] = bounds[0]
+            if bounds[1] is not None:
+                high[position] = bounds[1]
+        return low, high
+
+    @staticmethod
+    def _feasible(totals, remaining, low, high, top_sums):
+        """Partial meals that can still reach every limit with ``remaining`` more foods"""
+        return (totals <= high).all(axis=1) & (totals + top_sums[remaining] >= low).all(axis=1)
+
+    @staticmethod
+    def _extend(items, last, totals, score, values, scores):
+        """Every extension of the meals by a food of index greater than its last"""
+        parent, food = np.nonzero(np.arange(len(scores))[None, :] > last[:, None])
+        return parent, food, totals[parent] + values[food], score[parent] + scores[food]
+
+    @staticmethod
+    def _top(items, totals, score, top_n):
+        """Best ``top_n`` meals; ties ordered by the foods' indices"""
+        if len(score) > top_n:
+            # Só os que empatam ou superam o top_n-ésimo score vão para a ordenação
+            threshold = np.partition(score, len(score) - top_n)[len(score) - top_n]
+            keep = score >= threshold
+            items, totals, score = items[keep], totals[keep], score[keep]
+        keys = [items[:, column] for column in reversed(range(items.shape[1]))] + [-score]
+        order = np.lexsort(keys)[:top_n]
+        return items[order], totals[order], score[order]
+
+    def _exhaustive(self, values, scores, size, low, high, top_sums):
+        items = np.arange(len(scores))[:, None]
+        totals, score = values, scores
+        keep = self._feasible(totals, size - 1, low, high, top_sums)
+        items, totals, score = items[keep], totals[keep], score[keep]
+        for count in range(1, size):
+            parent, food, totals, score = self._extend(items, items[:, -1], totals, score, values, scores)
+            keep = self._feasible(totals, size - count - 1, low, high, top_sums)
+            items = np.column_stack([items[parent[keep]], food[keep]])
+            totals, score = totals[keep], score[keep]
+        return items, totals, score
+
+    @staticmethod
+    def _knapsack(values, scores, size, capacity):
+        """
+        Best score sum of ``r`` foods taken from index ``i`` onwards within a
+        calorie budget, with calories rounded down so the bound never
+        underestimates a feasible completion
+
+        Returns ``(table, step)``: ``table[i // step, r, b]`` holds the bound
+        for foods from index ``(i // step) * step`` onwards, a superset of
+        those from ``i``, so it stays valid when rows are skipped to save
+        memory.
+        """
+        n = len(scores)
+        step = max(1, -(-(n + 1) * size * (capacity + 1) // KNAPSACK_MAX_CELLS))
+        weights = np.floor(values[:, 0]).astype(int)
+        table = np.full(((n + step) // step, size, capacity + 1), -np.inf)
+        current = np.full((size, capacity + 1), -np.inf)
+        current[0] = 0.0
+        table[n // step] = current
+        for i in range(n - 1, -1, -1):
+            weight = weights[i]
+            if weight <= capacity:
+                taken = scores[i] + current[:-1, :capacity + 1 - weight]
+                np.maximum(current[1:, weight:], taken, out=current[1:, weight:])
+            if i % step == 0:
+                table[i // step] = current
+        return table, step
+
+    def _branch_and_bound(self, values, scores, size, low, high, top_sums, top_n):
+        calories = high[0] if np.isfinite(high[0]) else top_sums[size, 0]
+        capacity = int(np.floor(calories))
+        table, step = self._knapsack(values, scores, size, capacity)
+        chunk_size = max(1, CHUNK_ELEMENTS // len(scores))
+
+        def bound(last, count, totals, score):
+            budget = np.floor(np.maximum(calories - totals[:, 0], 0)).astype(int)
+            return score + table[(last + 1) // step, size - count, budget]
+
+        # Fronteira: refeições parciais (itens completados com -1)
+        n = len(scores)
+        keep = self._feasible(values, size - 1, low, high, top_sums)
+        first = np.flatnonzero(keep)
+        items = np.full((len(first), size), -1)
+        items[:, 0] = first
+        count = np.ones(len(first), dtype=int)
+        totals, score = values[first], scores[first]
+        limit = bound(first, count, totals, score)
+
+        best_items = np.empty((0, size), dtype=int)
+        best_totals = np.empty((0, len(MEAL_NUTRIENTS)))
+        best_score = np.empty(0)
+        threshold = -np.inf
+
+        while len(limit):
+            # Expandir primeiro as refeições de maior limitante
+            if len(limit) > chunk_size:
+                chunk = np.argpartition(-limit, chunk_size)[:chunk_size]
+            else:
+                chunk = np.arange(len(limit))
+            rest = np.ones(len(limit), dtype=bool)
+            rest[chunk] = False
+
+            last = items[chunk, count[chunk] - 1]
+            parent, food, new_totals, new_score = self._extend(
+                items[chunk], last, totals[chunk], score[chunk], values, scores
+            )
+            new_count = count[chunk][parent] + 1
+            new_items = items[chunk][parent]
+            new_items[np.arange(len(food)), new_count - 1] = food
+            keep = self._feasible(new_totals, size - new_count, low, high, top_sums)
+
+            # Refeições completas entram no ranking
+            complete = keep & (new_count == size) & (new_totals >= low).all(axis=1)
+            if complete.any():
+                best_items, best_totals, best_score = self._top(
+                    np.concatenate([best_items, new_items[complete]]),
+                    np.concatenate([best_totals, new_totals[complete]]),
+                    np.concatenate([best_score, new_score[complete]]),
+                    top_n
+                )
+                if len(best_score) == top_n:
+                    threshold = best_score[-1]
+
+            partial = keep & (new_count < size)
+            new_limit = bound(food[partial], new_count[partial], new_totals[partial], new_score[partial])
+            items = np.concatenate([items[rest], new_items[partial]])
+            count = np.concatenate([count[rest], new_count[partial]])
+            totals = np.concatenate([totals[rest], new_totals[partial]])
+            score = np.concatenate([score[rest], new_score[partial]])
+            limit = np.concatenate([limit[rest], new_limit])
+
+            # Descartar o que não pode superar a pior refeição do ranking
+            promising = limit + TOLERANCE >= threshold
+            items, count, totals = items[promising], count[promising], totals[promising]
+            score, limit = score[promising], limit[promising]
+
+        return best_items, best_totals, best_score
+
+    def best_meals(self, size, limits=None, top_n=10):
+        """
+        Best meals of ``size`` distinct foods within the limits
+
+        Parameters:
+        -----------
+        size : int
+            Number of foods per meal
+        limits : dict
+            {column: (low, high)} applied to the meal totals; None bounds are open
+        top_n : int
+            Number of meals returned
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per meal, best first: ``items`` (tuple of row positions in
+            the original frame), the summed ``MEAL_NUTRIENTS`` and the average
+            ``nutrition_score``
+        """
+        low, high = self._limits(limits)
+
+        # Alimentos que sozinhos excedem algum máximo nunca entram numa refeição
+        candidates = np.flatnonzero((self.values <= high).all(axis=1))
+        values, scores = self.values[candidates], self.scores[candidates]
+
+        if size < 1 or size > len(candidates) or top_n < 1:
+            items = np.empty((0, max(size, 0)), dtype=int)
+            totals, score = np.empty((0, len(MEAL_NUTRIENTS))), np.empty(0)
+        else:
+            # Maior soma possível de cada nutriente com r alimentos
+            top_sums = np.vstack([
+                np.zeros(len(MEAL_NUTRIENTS)),
+                np.cumsum(-np.sort(-values, axis=0), axis=0)[:size]
+            ])
+            # Um único alimento: a busca exaustiva é só o filtro pelos limites
+            if size == 1 or (
+                size <= EXHAUSTIVE_MAX_SIZE and comb(len(candidates), size) <= EXHAUSTIVE_MAX_COMBINATIONS
+            ):
+                items, totals, score = self._exhaustive(values, scores, size, low, high, top_sums)
+                complete = (totals >= low).all(axis=1)
+                items, totals, score = self._top(items[complete], totals[complete], score[complete], top_n)
+            else:
+                items, totals, score = self._branch_and_bound(values, scores, size, low, high, top_sums, top_n)
+
+        meals = pd.DataFrame(totals, columns=MEAL_NUTRIENTS)
+        meals.insert(0, 'items', [tuple(self.positions[candidates[row]]) for row in items])
+        meals['nutrition_score'] = score / max(size, 1)
+        return meals
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+# Pipeline de features compartilhado com os scripts e o notebook
+sys.path.append(str(Path(__file__).parents[1] / "scripts"))
+from feature_pipeline import (
+    CACHE_DIR, FEATURE_TABLES, derive_features, load_features, per_100g, portion_view,
+    reference_view
+)
+
+# Visões pré-calculadas: porção de referência (a primeira de cada alimento no
+# CSV, como o dashboard sempre usou) e valores por 100 g
+VIEWS = tuple(name for name in FEATURE_TABLES if name != 'portions')
+
+
+class NutritionModel:
+    """
+    Columnar nutrition model that keeps every portion size of each food
+
+    ``portions`` holds all CSV rows (label, weight and nutrients). Per-100g
+    values are derived from all portions of a food at once (sum of nutrient
+    over sum of weight), and any portion size is a vectorized rescaling of
+    them. The precomputed views come from the feature artifact of
+    ``feature_pipeline``, so new server processes load them instead of
+    recomputing.
+
+    Parameters:
+    -----------
+    portions : pd.DataFrame
+        Every row of ``nutrition.csv``
+    views : dict
+        Precomputed views ({name: frame with derived scores}); computed if None
+    """
+
+    def __init__(self, portions, views=None):
+        self.portions = portions
+        self.labels, self.per_100g = per_100g(portions)
+        self.views = views if views is not None else {name: self._build_view(name) for name in VIEWS}
+
+    def _build_view(self, name):
+        if name == 'referencia':
+            return derive_features(reference_view(self.portions))
+        if name == '100g':
+            return self.at_portion(100)
+        raise ValueError(f"Unknown view: {name}")
+
+    def view(self, name='referencia'):
+        """Precomputed view (shared: do not modify in place)"""
+        return self.views[name]
+
+    def at_portion(self, weight):
+        """
+        Every food at the same portion size, with derived scores
+
+        Parameters:
+        -----------
+        weight : float
+            Portion size in grams
+
+        Returns:
+        --------
+        pd.DataFrame
+            One row per food, nutrients scaled from the per-100g values
+        """
+        return derive_features(portion_view(self.labels, self.per_100g, weight))
+
+    def portions_of(self, label):
+        """All portion sizes of a food, as in the CSV"""
+        return self.portions[self.portions['label'] == label]
+
+    @classmethod
+    def load(cls, data_path, cache_dir=CACHE_DIR):
+        """
+        Load the model from the feature artifact of this CSV content
+
+        Parameters:
+        -----------
+        data_path : Path
+            Path of ``nutrition.csv``
+        cache_dir : Path
+            Folder of the feature artifacts (None computes without storing)
+        """
+        if cache_dir is None:
+            return cls(pd.read_csv(data_path).dropna().reset_index(drop=True))
+        features = load_features(data_path, cache_dir)
+        # Cópias: as tabelas de load_features são compartilhadas no processo
+        return cls(features['portions'], views={name: features[name].copy() for name in VIEWS})
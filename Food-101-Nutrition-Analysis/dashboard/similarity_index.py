@@ -0,0 +1,67 @@
+import numpy as np
+
+# Nutrientes que formam o perfil de cada alimento
+PROFILE_NUTRIENTS = ['calories', 'protein', 'carbohydrates', 'fats', 'fiber', 'sugars', 'sodium']
+
+
+class SimilarityIndex:
+    """
+    Exact nearest-neighbour index over the nutrient profiles
+
+    Each food becomes a vector of z-scored nutrients (so sodium in mg does not
+    dominate grams of fiber), kept in one contiguous matrix. A query is a
+    single vectorized distance computation followed by a partial sort, which
+    for catalogs of this size is faster than a tree and needs no extra
+    dependency.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Dataset with the profile nutrient columns
+    columns : list
+        Nutrients used in the profile
+    """
+
+    def __init__(self, df, columns=PROFILE_NUTRIENTS):
+        values = df[columns].to_numpy(dtype=float)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0)
+        std[~(std > 0)] = 1.0
+        # Nutriente ausente fica na média (não aproxima nem afasta)
+        self.vectors = np.nan_to_num((values - mean) / std)
+        self.size = len(df)
+
+    def query(self, position, k=5, candidates=None):
+        """
+        Most similar foods to the one at ``position``
+
+        Parameters:
+        -----------
+        position : int
+            Row position of the reference food
+        k : int
+            Number of neighbours returned
+        candidates : np.ndarray
+            Row positions allowed in the result (None allows every food)
+
+        Returns:
+        --------
+        tuple
+            (positions, distances) of the neighbours, closest first; the
+            reference food itself is never returned
+        """
+        if candidates is None:
+            candidates = np.arange(self.size)
+        candidates = np.asarray(candidates)
+        candidates = candidates[candidates != position]
+        if len(candidates) == 0 or k < 1:
+            return np.empty(0, dtype=int), np.empty(0)
+
+        differences = self.vectors[candidates] - self.vectors[position]
+        distances = np.sqrt(np.einsum('ij,ij->i', differences, differences))
+        if len(candidates) > k:
+            nearest = np.argpartition(distances, k - 1)[:k]
+        else:
+            nearest = np.arange(len(candidates))
+        nearest = nearest[np.lexsort((candidates[nearest], distances[nearest]))]
+        return candidates[nearest], distances[nearest]
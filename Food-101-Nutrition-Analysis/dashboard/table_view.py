@@ -0,0 +1,115 @@
+from functools import lru_cache
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+# Resolução da tabela de cores (entradas amostradas do colormap)
+LUT_SIZE = 256
+
+# Mesmo limiar de luminância do Styler.background_gradient do pandas
+TEXT_COLOR_THRESHOLD = 0.408
+
+
+def sort_order(df, column, ascending=True):
+    """
+    Row positions of the whole dataset sorted by a column
+
+    Computed once per dataset and column; a filtered, sorted view is then
+    obtained by masking this order instead of sorting again. Missing values
+    go last in both directions.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Complete dataset
+    column : str
+        Column used for sorting (numeric, categorical or text)
+    ascending : bool
+        Sort direction
+
+    Returns:
+    --------
+    np.ndarray
+        Row positions (for ``df.iloc``)
+    """
+    series = df[column]
+    if pd.api.types.is_numeric_dtype(series):
+        keys = series.to_numpy(dtype=float)
+    else:
+        # Categorias seguem a ordem das categorias; texto, a ordem alfabética
+        ordered = isinstance(series.dtype, pd.CategoricalDtype) and series.cat.ordered
+        codes = series.cat.codes.to_numpy() if ordered else pd.factorize(series, sort=True)[0]
+        keys = np.where(codes < 0, np.nan, codes).astype(float)
+    return np.argsort(keys if ascending else -keys, kind='stable')
+
+
+def page_positions(order, selected, page, page_size):
+    """
+    Positions of one page of the selected rows, in the given order
+
+    Parameters:
+    -----------
+    order : np.ndarray
+        Sorted positions of the whole dataset (``sort_order``)
+    selected : np.ndarray
+        Positions of the rows passing the filters
+    page : int
+        Page number, starting at 1
+    page_size : int
+        Rows per page
+
+    Returns:
+    --------
+    np.ndarray
+        Row positions of the page
+    """
+    mask = np.zeros(len(order), dtype=bool)
+    mask[selected] = True
+    start = (page - 1) * page_size
+    return order[mask[order]][start:start + page_size]
+
+
+@lru_cache(maxsize=None)
+def _colormap_lut(cmap):
+    """Background colors (hex) and text colors sampled from a colormap"""
+    rgba = matplotlib.colormaps[cmap](np.linspace(0, 1, LUT_SIZE))
+    hex_colors = np.array([matplotlib.colors.to_hex(color) for color in rgba])
+
+    # Luminância relativa (WCAG), como no pandas
+    linear = np.where(rgba[:, :3] <= 0.04045, rgba[:, :3] / 12.92, ((rgba[:, :3] + 0.055) / 1.055) ** 2.4)
+    luminance = linear @ np.array([0.2126, 0.7152, 0.0722])
+    text_colors = np.where(luminance < TEXT_COLOR_THRESHOLD, '#f1f1f1', '#000000')
+    return hex_colors, text_colors
+
+
+def gradient_styles(values, vmin, vmax, cmap='RdYlGn'):
+    """
+    CSS background gradient for a column, by vectorized colormap lookup
+
+    Parameters:
+    -----------
+    values : np.ndarray
+        Values of the visible rows
+    vmin, vmax : float
+        Range mapped to the ends of the colormap (the whole selection, so
+        colors do not change between pages)
+    cmap : str
+        Matplotlib colormap name
+
+    Returns:
+    --------
+    np.ndarray
+        One CSS string per value (empty for missing values)
+    """
+    hex_colors, text_colors = _colormap_lut(cmap)
+    values = np.asarray(values, dtype=float)
+    span = vmax - vmin if vmax > vmin else 1.0
+    scaled = np.clip((values - vmin) / span, 0, 1)
+    index = np.nan_to_num(scaled * (LUT_SIZE - 1)).round().astype(int)
+    styles = np.char.add(
+        np.char.add('background-color: ', hex_colors[index]),
+        np.char.add(';color: ', text_colors[index])
+    ).astype(object)
+    styles[np.isnan(values)] = ''
+    return styles
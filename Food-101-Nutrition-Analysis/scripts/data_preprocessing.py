@@ -1,48 +1,37 @@
-import pandas as pd
-import numpy as np
-from pathlib import Path
+from nutrition_rules import DEFAULT_RULES, filter_mask
+from feature_pipeline import STATS_TABLE, category_stats, load_features
 
 def load_and_preprocess_data():
     """
     Load and preprocess the nutrition dataset
-    """
-    # Get the data path
-    data_path = Path(__file__).parents[1] / "data" / "nutrition.csv"
-    
-    # Load the data
-    df = pd.read_csv(data_path)
-    
-    # Basic cleaning
-    df = df.dropna()  # Remove any null values
     
-    # Create derived features
-    df['protein_ratio'] = df['protein'] / df['calories']
-    df['fat_ratio'] = df['fat'] / df['calories']
-    df['carb_ratio'] = df['carbohydrates'] / df['calories']
-    
-    # Create nutrient density score (higher is better)
-    df['nutrient_density'] = (
-        (df['protein'] * 4) +  # 4 calories per gram of protein
-        (df['carbohydrates'] * 4) +  # 4 calories per gram of carbs
-        (df['fat'] * 9)  # 9 calories per gram of fat
-    ) / df['calories']
-    
-    return df
+    Reads the feature artifact (cleaned rows with every derived feature:
+    ratios, scores, recommendation, profile and nutrient density), built by
+    ``feature_pipeline`` on first use
+    """
+    # Copy: the artifact tables are shared within the process
+    return load_features()['portions'].copy()
 
-def get_food_category_stats(df):
+def get_food_category_stats(df=None, category='perfil_nutricional'):
     """
     Calculate statistics for each food category
-    """
-    stats = df.groupby('category').agg({
-        'calories': ['mean', 'std'],
-        'protein': ['mean', 'std'],
-        'fat': ['mean', 'std'],
-        'carbohydrates': ['mean', 'std']
-    }).round(2)
     
-    return stats
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Dataset to aggregate; None returns the aggregate precomputed in the
+        feature artifact (all portions by nutritional profile)
+    category : str
+        Column used as category (the dataset has no 'category' column; the
+        nutritional profile is the default)
+    """
+    if df is None and category == 'perfil_nutricional':
+        return load_features()[STATS_TABLE].copy()
+    if df is None:
+        df = load_features()['portions']
+    return category_stats(df, category)
 
-def get_healthy_foods(df, criteria='balanced'):
+def get_healthy_foods(df, criteria='balanced', rules=DEFAULT_RULES):
     """
     Get list of healthy foods based on different criteria
     
@@ -52,16 +41,8 @@ def get_healthy_foods(df, criteria='balanced'):
         'balanced' - foods with good balance of nutrients
         'high_protein' - foods with high protein content
         'low_calorie' - foods with low calories
+        (any filter of ``rules['filters']``; unknown criteria return all foods)
+    rules : dict
+        Rule specification with the filter definitions
     """
-    if criteria == 'balanced':
-        return df[
-            (df['protein_ratio'] >= 0.15) &  # At least 15% protein
-            (df['fat_ratio'] <= 0.30) &      # No more than 30% fat
-            (df['carb_ratio'] <= 0.55)       # No more than 55% carbs
-        ]
-    elif criteria == 'high_protein':
-        return df[df['protein_ratio'] >= 0.25]  # At least 25% protein
-    elif criteria == 'low_calorie':
-        return df[df['calories'] <= df['calories'].quantile(0.25)]  # Bottom 25% calories
-    
-    return df
+    return df[filter_mask(df, criteria, rules)]
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from nutrition_rules import DEFAULT_RULES, NUTRITION_SCHEMA, RuleEngine
+
+DATA_PATH = Path(__file__).parents[1] / "data" / "nutrition.csv"
+CACHE_DIR = Path(__file__).parents[1] / "data" / "cache"
+
+# Versão do pipeline: alterá-la invalida os artefatos gravados
+FEATURE_VERSION = 1
+
+NUTRIENTS = ['calories', 'protein', 'carbohydrates', 'fats', 'fiber', 'sugars', 'sodium']
+
+# Esquema tipado de todas as colunas das tabelas de features
+FEATURE_SCHEMA = {
+    **NUTRITION_SCHEMA,
+    'protein_density': 'float',
+    'fiber_density': 'float',
+    'carb_density': 'float',
+    'protein_ratio': 'float',
+    'fat_ratio': 'float',
+    'carb_ratio': 'float',
+    'protein_score': 'float',
+    'fiber_score': 'float',
+    'sugar_score': 'float',
+    'sodium_score': 'float',
+    'nutrition_score': 'float',
+    'recomendacao': 'category',
+    'perfil_nutricional': 'str',
+    'nutrient_density': 'float'
+}
+
+# Tabelas do artefato: todas as porções (scripts e notebook), as visões do
+# dashboard (porção de referência e por 100 g) e o agregado por categoria
+FEATURE_TABLES = ('portions', 'referencia', '100g')
+STATS_TABLE = 'category_stats'
+
+# Estatísticas por categoria pré-calculadas no artefato
+CATEGORY_STATS = {
+    'calories': ['mean', 'std'],
+    'protein': ['mean', 'std'],
+    'fats': ['mean', 'std'],
+    'carbohydrates': ['mean', 'std']
+}
+
+
+def per_100g(portions):
+    """
+    Nutrients per 100 g of each food, from all of its portions
+
+    Parameters:
+    -----------
+    portions : pd.DataFrame
+        Every portion row (label, weight and nutrients)
+
+    Returns:
+    --------
+    tuple
+        (sorted labels, array labels x ``NUTRIENTS``): sum of each nutrient
+        over the sum of the weights, times 100
+    """
+    labels, codes = np.unique(portions['label'].to_numpy(dtype=str), return_inverse=True)
+    values = portions[NUTRIENTS].to_numpy(dtype=float)
+    weights = np.bincount(codes, weights=portions['weight'].to_numpy(dtype=float))
+    totals = np.column_stack([np.bincount(codes, weights=column) for column in values.T])
+    return labels, totals / weights[:, None] * 100
+
+
+def reference_view(portions):
+    """First portion of each food (as listed in the CSV), sorted by label"""
+    first = portions.groupby('label', sort=True).head(1)
+    return first.sort_values('label', kind='stable').reset_index(drop=True)
+
+
+def portion_view(labels, values_100g, weight):
+    """Every food at the same portion size, scaled from the per-100g values"""
+    df = pd.DataFrame(values_100g * (weight / 100), columns=NUTRIENTS)
+    df.insert(0, 'label', labels)
+    df.insert(1, 'weight', float(weight))
+    return df
+
+
+def _apply_schema(df):
+    """Cast the columns to the types of ``FEATURE_SCHEMA``"""
+    unknown = [column for column in df.columns if column not in FEATURE_SCHEMA]
+    if unknown:
+        raise ValueError(f"Columns missing from FEATURE_SCHEMA: {unknown}")
+    for column in df.columns:
+        dtype = FEATURE_SCHEMA[column]
+        if dtype == 'float':
+            df[column] = df[column].astype(float)
+        elif dtype == 'str':
+            df[column] = df[column].astype(str)
+        elif dtype == 'category' and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            raise ValueError(f"Column '{column}' should be categorical")
+    return df
+
+
+def derive_features(df, engine=None):
+    """
+    Every derived column of a table, in one vectorized pass
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Table with the dataset columns
+    engine : RuleEngine
+        Compiled ``DEFAULT_RULES`` (compiled here if None)
+
+    Returns:
+    --------
+    pd.DataFrame
+        Same rows with the rule columns and the nutrient density, typed by
+        ``FEATURE_SCHEMA``
+    """
+    engine = engine or RuleEngine({'rules': DEFAULT_RULES})
+    df = pd.concat([df, engine.evaluate(df)['rules']], axis=1)
+
+    # Calorias dos macronutrientes sobre as calorias totais (maior é melhor)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['nutrient_density'] = (
+            df['protein'].to_numpy(dtype=float) * 4 +        # 4 kcal por grama de proteína
+            df['carbohydrates'].to_numpy(dtype=float) * 4 +  # 4 kcal por grama de carboidrato
+            df['fats'].to_numpy(dtype=float) * 9             # 9 kcal por grama de gordura
+        ) / df['calories'].to_numpy(dtype=float)
+    return _apply_schema(df)
+
+
+def category_stats(df, category='perfil_nutricional'):
+    """Mean and standard deviation of the main nutrients per category"""
+    return df.groupby(category).agg(CATEGORY_STATS).round(2)
+
+
+def build_features(raw):
+    """
+    Compute every table of the artifact from the raw catalog
+
+    Parameters:
+    -----------
+    raw : pd.DataFrame
+        Contents of ``nutrition.csv``
+
+    Returns:
+    --------
+    dict
+        {table name: pd.DataFrame}
+    """
+    missing = [column for column in NUTRITION_SCHEMA if column not in raw.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {missing}")
+    portions = raw[list(NUTRITION_SCHEMA)].dropna().reset_index(drop=True)
+    labels, values_100g = per_100g(portions)
+
+    engine = RuleEngine({'rules': DEFAULT_RULES})
+    tables = {
+        'portions': derive_features(portions, engine),
+        'referencia': derive_features(reference_view(portions), engine),
+        '100g': derive_features(portion_view(labels, values_100g, 100), engine)
+    }
+    tables[STATS_TABLE] = category_stats(tables['portions'])
+    return tables
+
+
+def _digest(content):
+    """Key of an artifact: catalog content, rules and pipeline version"""
+    rules = json.dumps(DEFAULT_RULES, sort_keys=True, ensure_ascii=False).encode()
+    return hashlib.sha256(content + rules + str(FEATURE_VERSION).encode()).hexdigest()[:16]
+
+
+def _write_table(df, folder, name):
+    """Store a table as one array per column; returns its manifest entry"""
+    arrays, entry = {}, {'rows': len(df), 'columns': [], 'categories': {}}
+    for position, column in enumerate(df.columns):
+        series = df[column]
+        key = f"c{position}"
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            arrays[key] = series.cat.codes.to_numpy()
+            entry['categories'][str(column)] = {
+                'values': [str(value) for value in series.cat.categories],
+                'ordered': bool(series.cat.ordered)
+            }
+        elif pd.api.types.is_numeric_dtype(series):
+            arrays[key] = series.to_numpy()
+        else:
+            arrays[key] = series.to_numpy(dtype=str)
+        entry['columns'].append(list(column) if isinstance(column, tuple) else column)
+    if df.index.name is not None:
+        arrays['index'] = df.index.to_numpy(dtype=str)
+        entry['index'] = df.index.name
+    np.savez(folder / f"{name}.npz", **arrays)
+    return entry
+
+
+def _read_table(folder, name, entry):
+    arrays = np.load(folder / f"{name}.npz")
+    columns = {}
+    for position, column in enumerate(entry['columns']):
+        values = arrays[f"c{position}"]
+        label = column if isinstance(column, str) else tuple(column)
+        if isinstance(column, str) and column in entry['categories']:
+            categories = entry['categories'][column]
+            values = pd.Categorical.from_codes(values, categories['values'], ordered=categories['ordered'])
+        columns[label] = values
+    df = pd.DataFrame(columns)
+    if any(isinstance(column, list) for column in entry['columns']):
+        df.columns = pd.MultiIndex.from_tuples(df.columns)
+    if 'index' in entry:
+        df.index = pd.Index(arrays['index'], name=entry['index'])
+    return df
+
+
+def materialize(data_path=DATA_PATH, cache_dir=CACHE_DIR):
+    """
+    Build the feature artifact of a catalog, unless it is already on disk
+
+    The artifact is a folder named after the content hash of the CSV, the
+    rules and ``FEATURE_VERSION``, with one ``.npz`` file per table (one
+    array per column) and a ``manifest.json`` with the typed schema.
+
+    Parameters:
+    -----------
+    data_path : Path
+        Path of ``nutrition.csv``
+    cache_dir : Path
+        Folder of the artifacts
+
+    Returns:
+    --------
+    Path
+        Folder of the artifact
+    """
+    content = Path(data_path).read_bytes()
+    folder = Path(cache_dir) / f"features_{_digest(content)}"
+    if (folder / "manifest.json").exists():
+        return folder
+
+    tables = build_features(pd.read_csv(data_path))
+    temporary = Path(cache_dir) / f".{folder.name}.{os.getpid()}.tmp"
+    temporary.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'version': FEATURE_VERSION,
+        'source': str(data_path),
+        'schema': FEATURE_SCHEMA,
+        'tables': {name: _write_table(table, temporary, name) for name, table in tables.items()}
+    }
+    # Manifesto por último: sua presença indica artefato completo
+    (temporary / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False))
+    try:
+        temporary.rename(folder)
+    except OSError:
+        shutil.rmtree(temporary, ignore_errors=True)  # outro processo gravou antes
+
+    # Remover artefatos e caches de versões anteriores
+    for old in Path(cache_dir).iterdir():
+        if old.name.startswith("features_") and old != folder:
+            shutil.rmtree(old, ignore_errors=True)
+        elif old.name.startswith("nutrition_") and old.suffix == ".pkl":
+            old.unlink()
+    return folder
+
+
+@lru_cache(maxsize=4)
+def _load(folder):
+    manifest = json.loads((folder / "manifest.json").read_text())
+    if manifest['version'] != FEATURE_VERSION or manifest['schema'] != FEATURE_SCHEMA:
+        raise ValueError(f"Artifact {folder} does not match the current schema")
+    return {name: _read_table(folder, name, entry) for name, entry in manifest['tables'].items()}
+
+
+def load_features(data_path=DATA_PATH, cache_dir=CACHE_DIR):
+    """
+    Feature tables of a catalog, from its artifact (built if needed)
+
+    Tables are cached per process and shared between callers: copy them
+    before modifying.
+
+    Parameters:
+    -----------
+    data_path : Path
+        Path of ``nutrition.csv``
+    cache_dir : Path
+        Folder of the artifacts
+
+    Returns:
+    --------
+    dict
+        {'portions', 'referencia', '100g', 'category_stats': pd.DataFrame}
+    """
+    return _load(materialize(data_path, cache_dir))
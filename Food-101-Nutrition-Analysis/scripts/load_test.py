@@ -0,0 +1,390 @@
+"""
+Headless load test of the dashboard
+
+Runs N simulated sessions of ``dashboard/app.py`` with Streamlit's AppTest
+against a synthetic catalog, interleaving their interactions (as concurrent
+users share the server process and its caches), and writes a JSON report
+with per-rerun latency percentiles, peak memory and cache hit rates.
+
+Example:
+    python scripts/load_test.py --foods 5000 --sessions 20 --output report.json
+"""
+import argparse
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_PATH = Path(__file__).parents[1] / "dashboard" / "app.py"
+DATA_PATH = Path(__file__).parents[1] / "data" / "nutrition.csv"
+
+# ``streamlit run`` põe a pasta do app no sys.path; o AppTest não
+sys.path.insert(0, str(APP_PATH.parent))
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Filtros da barra lateral restaurados quando nenhum alimento os atende
+FILTERS = (
+    ('multiselect', "Nível de Recomendação"),
+    ('multiselect', "Tipo de Alimento"),
+    ('number_input', "Mín. Proteína (g)"),
+    ('slider', "Limite de Calorias (kcal)")
+)
+EMPTY_WARNING = "Nenhum alimento encontrado"
+
+# Contadores dos caches do Streamlit: chamadas e execuções (misses) por função
+CACHE_STATS = defaultdict(lambda: {'calls': 0, 'misses': 0})
+
+
+def synthetic_catalog(n_foods, path, seed=0, source=DATA_PATH):
+    """
+    Write a synthetic catalog with the schema of ``nutrition.csv``
+
+    Each synthetic food copies the portions of a real food, with every
+    nutrient scaled by its own random factor, so distributions and the
+    relation between portion size and nutrients stay realistic.
+
+    Parameters:
+    -----------
+    n_foods : int
+        Number of foods (each with all portions of its source food)
+    path : Path
+        Output CSV
+    seed : int
+        Random seed
+    source : Path
+        Real catalog used as template
+
+    Returns:
+    --------
+    Path
+        Path of the written catalog
+    """
+    rng = np.random.default_rng(seed)
+    real = pd.read_csv(source)
+    labels = real['label'].unique()
+    chosen = rng.choice(len(labels), size=n_foods)
+
+    portions = real.groupby('label', sort=False).indices
+    rows = np.concatenate([portions[labels[position]] for position in chosen])
+    food = np.repeat(np.arange(n_foods), [len(portions[labels[position]]) for position in chosen])
+
+    catalog = real.iloc[rows].reset_index(drop=True)
+    catalog['label'] = [f"{labels[chosen[i]]}_{i:06d}" for i in food]
+    nutrients = [column for column in catalog.columns if column not in ('label', 'weight')]
+    factors = rng.lognormal(0, 0.25, size=(n_foods, len(nutrients)))
+    catalog[nutrients] = (catalog[nutrients].to_numpy(dtype=float) * factors[food]).round(1)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    catalog.to_csv(path, index=False)
+    return path
+
+
+def _instrument(decorator, kind):
+    """Wrap a Streamlit cache decorator to count calls and misses per function"""
+    def instrumented(func=None, **options):
+        if func is None:
+            return lambda function: instrumented(function, **options)
+        name = f"{kind}:{func.__qualname__}"
+
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            CACHE_STATS[name]['misses'] += 1
+            return func(*args, **kwargs)
+
+        cached = decorator(body, **options)
+
+        @functools.wraps(func)
+        def call(*args, **kwargs):
+            CACHE_STATS[name]['calls'] += 1
+            return cached(*args, **kwargs)
+
+        call.clear = cached.clear
+        return call
+    return instrumented
+
+
+def _widget(at, kind, label):
+    """Widget of a kind by label (None when it is not on the page)"""
+    for widget in getattr(at, kind):
+        if widget.label == label:
+            return widget
+    return None
+
+
+def _is_empty(at):
+    """Whether the app stopped because no food matches the filters"""
+    return any(EMPTY_WARNING in warning.value for warning in at.warning)
+
+
+def _filter_values(at):
+    """Current values of the sidebar filters"""
+    values = {}
+    for kind, label in FILTERS:
+        widget = _widget(at, kind, label)
+        if widget is not None:
+            values[kind, label] = widget.value
+    return values
+
+
+def _restore_filters(at, values):
+    """Set the filters back to ``values`` (the calorie limit clipped to the current base)"""
+    for (kind, label), value in values.items():
+        widget = _widget(at, kind, label)
+        if widget is None:
+            continue
+        if kind == 'slider':
+            value = int(np.clip(value, widget.min, widget.max))
+        widget.set_value(value)
+
+
+def _peak_rss_mb():
+    """Peak resident memory of the process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss em bytes no macOS e em KB no Linux
+    return round(peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def scenario(rng):
+    """
+    Interaction sequence of one user: (action name, widget kind, label, change)
+
+    ``change`` receives the widget and returns it changed (or None to skip).
+    """
+    def drag(start, stop, steps):
+        return [
+            ('arrastar_calorias', 'slider', "Limite de Calorias (kcal)",
+             lambda widget, value=int(value): widget.set_value(int(np.clip(value, widget.min, widget.max))))
+            for value in np.linspace(start, stop, steps)
+        ]
+
+    def pick(index):
+        return lambda widget: widget.select_index(min(index, len(widget.options) - 1)) if len(widget.options) > 1 else None
+
+    def pick_position(index):
+        # Opções são posições exibidas por format_func: o AppTest só conhece os
+        # rótulos, então a posição é definida diretamente
+        return lambda widget: widget.set_value(min(index, len(widget.options) - 1)) if len(widget.options) > 1 else None
+
+    def toggle_option(widget):
+        value = list(widget.value)
+        option = str(rng.choice(widget.options))
+        return widget.set_value([v for v in value if v != option] if option in value else value + [option])
+
+    steps = []
+    if rng.random() < 0.3:
+        steps.append(('base_100g', 'radio', "Base dos valores", lambda widget: widget.set_value('100g')))
+    steps += drag(rng.integers(300, 600), rng.integers(600, 1200), rng.integers(3, 6))
+    steps.append(('recomendacao', 'multiselect', "Nível de Recomendação", toggle_option))
+    steps.append(('perfil', 'multiselect', "Tipo de Alimento", toggle_option))
+    steps.append(('proteina_minima', 'number_input', "Mín. Proteína (g)",
+                  lambda widget: widget.set_value(float(rng.integers(0, 10)))))
+    steps.append(('semelhantes', 'selectbox', "Encontrar alimentos semelhantes a", pick_position(int(rng.integers(0, 50)))))
+    steps.append(('primeiro_alimento', 'selectbox', "Selecione o primeiro alimento", pick(int(rng.integers(1, 20)))))
+    steps.append(('segundo_alimento', 'selectbox', "Selecione o segundo alimento", pick(int(rng.integers(1, 20)))))
+    steps.append(('segundo_alimento', 'selectbox', "Selecione o segundo alimento", pick(int(rng.integers(1, 20)))))
+    steps.append(('tamanho_refeicao', 'slider', "Alimentos por refeição",
+                  lambda widget: widget.set_value(int(rng.integers(2, 5)))))
+    steps.append(('tabela', 'checkbox', "Mostrar tabela completa", lambda widget: widget.check()))
+    steps.append(('pagina', 'number_input', "Página",
+                  lambda widget: widget.set_value(min(2, widget.max)) if widget.max and widget.max > 1 else None))
+    return steps
+
+
+def _summary(values):
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return {'count': 0}
+    summary = {'count': int(len(values)), 'mean': round(float(values.mean()), 2)}
+    summary.update({f"p{p}": round(float(np.percentile(values, p)), 2) for p in PERCENTILES})
+    summary['max'] = round(float(values.max()), 2)
+    return summary
+
+
+def run_load_test(n_sessions, n_foods, seed=0, timeout=60, data_path=None):
+    """
+    Run the simulated sessions and build the report
+
+    Parameters:
+    -----------
+    n_sessions : int
+        Simulated users
+    n_foods : int
+        Foods of the synthetic catalog (ignored if ``data_path`` is given)
+    seed : int
+        Random seed of the catalog and of the interactions
+    timeout : float
+        Maximum seconds per rerun
+    data_path : Path
+        Existing catalog to use instead of a synthetic one
+
+    Returns:
+    --------
+    dict
+        JSON-serializable report
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as folder:
+        if data_path is None:
+            data_path = synthetic_catalog(n_foods, Path(folder) / "nutrition.csv", seed)
+        os.environ["FOOD101_DATA_PATH"] = str(data_path)
+
+        # Caches instrumentados antes de o app definir suas funções
+        original = st.cache_data, st.cache_resource
+        st.cache_data = _instrument(st.cache_data, 'cache_data')
+        st.cache_resource = _instrument(st.cache_resource, 'cache_resource')
+        CACHE_STATS.clear()
+
+        latencies = defaultdict(list)
+        errors = []
+        skipped = defaultdict(int)
+        restored = 0
+        stopped_early = []
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        try:
+            sessions = []
+            for number in range(n_sessions):
+                at = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+                sessions.append((number, at, scenario(np.random.default_rng(seed + number + 1))))
+
+            def rerun(number, at, action):
+                began = time.perf_counter()
+                at.run()
+                latencies[action].append((time.perf_counter() - began) * 1000)
+                if at.exception:
+                    errors.append({'session': number, 'action': action, 'error': str(at.exception[0].value)})
+                    return False
+                return True
+
+            # Primeira execução de cada sessão, depois as interações intercaladas
+            active = [session for session in sessions if rerun(session[0], session[1], 'inicial')]
+            initial_filters = {number: _filter_values(at) for number, at, _ in active}
+            while active:
+                rng.shuffle(active)
+                still_active = []
+                for number, at, steps in active:
+                    if not steps:
+                        continue
+                    action, kind, label, change = steps.pop(0)
+                    widget = _widget(at, kind, label)
+                    if widget is None or change(widget) is None:
+                        skipped[action] += 1
+                        still_active.append((number, at, steps))
+                        continue
+                    if not rerun(number, at, action):
+                        stopped_early.append({'session': number, 'action': action, 'reason': 'erro'})
+                        continue
+                    # Sem alimentos o app para antes das seções seguintes: os
+                    # filtros iniciais são restaurados para que todos os passos rodem
+                    if steps and _is_empty(at):
+                        restored += 1
+                        _restore_filters(at, initial_filters[number])
+                        if not rerun(number, at, 'restaurar_filtros'):
+                            stopped_early.append({'session': number, 'action': action, 'reason': 'erro'})
+                            continue
+                        if _is_empty(at):
+                            stopped_early.append({'session': number, 'action': action, 'reason': 'sem alimentos'})
+                            continue
+                    still_active.append((number, at, steps))
+                active = still_active
+        finally:
+            st.cache_data, st.cache_resource = original
+            os.environ.pop("FOOD101_DATA_PATH", None)
+        foods = int(pd.read_csv(data_path, usecols=['label'])['label'].nunique())
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        'config': {
+            'sessions': n_sessions,
+            'foods': foods,
+            'seed': seed,
+            'streamlit': st.__version__,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count()
+        },
+        'wall_time_s': round(time.perf_counter() - start, 2),
+        'reruns': len(all_latencies),
+        'latency_ms': {
+            'all': _summary(all_latencies),
+            'by_action': {action: _summary(values) for action, values in sorted(latencies.items())}
+        },
+        'peak_rss_mb': _peak_rss_mb(),
+        'cache': {
+            name: {
+                **stats,
+                'hit_rate': round(1 - stats['misses'] / stats['calls'], 4) if stats['calls'] else None
+            }
+            for name, stats in sorted(CACHE_STATS.items())
+        },
+        'skipped': dict(skipped),
+        'filter_restores': restored,
+        'sessions_stopped_early': len(stopped_early),
+        'stopped_early': stopped_early,
+        'errors': errors
+    }
+
+
+def compare(report, baseline):
+    """Latency and memory changes against a previous report (for printing)"""
+    lines = []
+    for key in ('p50', 'p95', 'p99'):
+        before, after = baseline['latency_ms']['all'].get(key), report['latency_ms']['all'].get(key)
+        if before and after:
+            lines.append(f"{key}: {before:.1f} -> {after:.1f} ms ({(after / before - 1) * 100:+.1f}%)")
+    if baseline['peak_rss_mb'] is not None and report['peak_rss_mb'] is not None:
+        lines.append(f"pico de memória: {baseline['peak_rss_mb']} -> {report['peak_rss_mb']} MB")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga headless do dashboard")
+    parser.add_argument('--sessions', type=int, default=10, help="Sessões simuladas")
+    parser.add_argument('--foods', type=int, default=1000, help="Alimentos do catálogo sintético")
+    parser.add_argument('--data', type=Path, help="Usar este catálogo em vez de um sintético")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=60, help="Tempo máximo por rerun (s)")
+    parser.add_argument('--output', type=Path, default=Path("load_test_report.json"))
+    parser.add_argument('--baseline', type=Path, help="Relatório anterior para comparação")
+    args = parser.parse_args()
+
+    report = run_load_test(args.sessions, args.foods, args.seed, args.timeout, args.data)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    latency = report['latency_ms']['all']
+    peak = f"; pico {report['peak_rss_mb']} MB" if report['peak_rss_mb'] is not None else ""
+    print(f"{report['reruns']} reruns em {report['wall_time_s']} s; "
+          f"p50 {latency.get('p50')} ms, p95 {latency.get('p95')} ms{peak}")
+    if report['filter_restores']:
+        print(f"{report['filter_restores']} reruns sem alimentos (filtros restaurados)")
+    if report['sessions_stopped_early']:
+        print(f"{report['sessions_stopped_early']} sessões interrompidas antes do fim (ver {args.output})")
+    if report['errors']:
+        print(f"{len(report['errors'])} erros (ver {args.output})")
+    if args.baseline:
+        for line in compare(report, json.loads(args.baseline.read_text())):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
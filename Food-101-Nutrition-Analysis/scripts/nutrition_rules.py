@@ -0,0 +1,414 @@
+import numpy as np
+import pandas as pd
+
+# Colunas de nutrition.csv e seus tipos
+NUTRITION_SCHEMA = {
+    'label': 'str',
+    'weight': 'float',
+    'calories': 'float',
+    'protein': 'float',
+    'carbohydrates': 'float',
+    'fats': 'float',
+    'fiber': 'float',
+    'sugars': 'float',
+    'sodium': 'float'
+}
+
+OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal
+}
+
+# Regras padrão: score nutricional, recomendação e perfis do dashboard, e os
+# critérios de alimentos saudáveis dos scripts
+DEFAULT_RULES = {
+    # Variáveis derivadas: numerador / denominador * escala (arredondada)
+    'derived': {
+        'protein_density': {'ratio': ['protein', 'calories'], 'scale': 100, 'round': 2},
+        'fiber_density': {'ratio': ['fiber', 'calories'], 'scale': 100, 'round': 2},
+        'carb_density': {'ratio': ['carbohydrates', 'calories'], 'scale': 100, 'round': 2},
+        'protein_ratio': {'ratio': ['protein', 'calories']},
+        'fat_ratio': {'ratio': ['fats', 'calories']},
+        'carb_ratio': {'ratio': ['carbohydrates', 'calories']}
+    },
+    # Scores individuais (0-100): 'target' vale 100 pontos, 'limit' vale 0 pontos
+    'scores': {
+        'protein_score': {'column': 'protein_density', 'target': 20},  # 20g proteína por 100kcal é excelente
+        'fiber_score': {'column': 'fiber_density', 'target': 10},      # 10g fibra por 100kcal é excelente
+        'sugar_score': {'column': 'sugars', 'limit': 25},              # Limite máximo de açúcar
+        'sodium_score': {'column': 'sodium', 'limit': 2300}            # Limite máximo de sódio
+    },
+    # Score final (prioriza proteína e fibra, penaliza açúcar e sódio)
+    'total': {
+        'column': 'nutrition_score',
+        'weights': {'protein_score': 0.35, 'fiber_score': 0.35, 'sugar_score': 0.15, 'sodium_score': 0.15},
+        'round': 1
+    },
+    # Classificação por quartis do score
+    'recommendation': {
+        'column': 'recomendacao',
+        'labels': ['Evitar', 'Consumo Moderado', 'Bom', 'Excelente']
+    },
+    # Perfis: vale o primeiro cujas condições são todas verdadeiras
+    'profiles': {
+        'column': 'perfil_nutricional',
+        'default': 'Balanceado',
+        'rules': [
+            ['Rico em Proteína', [['protein_density', '>', 15]]],
+            ['Alto em Fibra', [['fiber_density', '>', 7]]],
+            ['Rico em Fibra', [['fiber', '>=', 6]]],  # baseado em RDA
+            ['Rico em Carboidratos Complexos', [['carb_density', '>', 50], ['fiber', '>=', 4]]],
+            ['Baixo Açúcar', [['sugars', '<', 5]]]
+        ]
+    },
+    # Critérios de seleção; limites {'quantile': q} são calculados nos dados
+    'filters': {
+        'balanced': [
+            ['protein_ratio', '>=', 0.15],
+            ['fat_ratio', '<=', 0.30],
+            ['carb_ratio', '<=', 0.55]
+        ],
+        'high_protein': [['protein_ratio', '>=', 0.25]],
+        'low_calorie': [['calories', '<=', {'quantile': 0.25}]]
+    }
+}
+
+
+def _numeric(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_rules(spec, schema=NUTRITION_SCHEMA):
+    """
+    Check a rule specification against the dataset schema
+
+    Parameters:
+    -----------
+    spec : dict
+        Rule specification (see ``DEFAULT_RULES``)
+    schema : dict
+        Dataset columns and their types
+
+    Raises:
+    -------
+    ValueError
+        Describing every problem found
+    """
+    errors = []
+    numeric = {column for column, dtype in schema.items() if dtype in ('float', 'int')}
+
+    derived = spec.get('derived', {})
+    for name, feature in derived.items():
+        if name in schema:
+            errors.append(f"derived '{name}' overrides a dataset column")
+        ratio = feature.get('ratio')
+        if not (isinstance(ratio, (list, tuple)) and len(ratio) == 2):
+            errors.append(f"derived '{name}': 'ratio' must be [numerator, denominator]")
+        else:
+            errors += [f"derived '{name}': unknown numeric column '{c}'" for c in ratio if c not in numeric]
+        if not _numeric(feature.get('scale', 1)):
+            errors.append(f"derived '{name}': 'scale' must be a number")
+    available = numeric | set(derived)
+
+    scores = spec.get('scores', {})
+    for name, term in scores.items():
+        if term.get('column') not in available:
+            errors.append(f"score '{name}': unknown column '{term.get('column')}'")
+        kinds = [kind for kind in ('target', 'limit') if kind in term]
+        if len(kinds) != 1 or not _numeric(term[kinds[0]]) or term[kinds[0]] == 0:
+            errors.append(f"score '{name}': needs exactly one non-zero 'target' or 'limit'")
+
+    total = spec.get('total')
+    if total is not None:
+        for name, weight in total.get('weights', {}).items():
+            if name not in scores:
+                errors.append(f"total: unknown score '{name}'")
+            if not _numeric(weight):
+                errors.append(f"total: weight of '{name}' must be a number")
+        if not total.get('weights'):
+            errors.append("total: 'weights' is empty")
+    elif 'recommendation' in spec:
+        errors.append("recommendation requires 'total'")
+
+    def check_conditions(where, conditions):
+        if not conditions:
+            errors.append(f"{where}: no conditions")
+        for condition in conditions:
+            if len(condition) != 3:
+                errors.append(f"{where}: condition {condition} must be [column, operator, threshold]")
+                continue
+            column, operator, threshold = condition
+            if column not in available:
+                errors.append(f"{where}: unknown column '{column}'")
+            if operator not in OPERATORS:
+                errors.append(f"{where}: unknown operator '{operator}'")
+            if isinstance(threshold, dict):
+                if not (_numeric(threshold.get('quantile')) and 0 <= threshold['quantile'] <= 1):
+                    errors.append(f"{where}: quantile must be between 0 and 1")
+            elif not _numeric(threshold):
+                errors.append(f"{where}: threshold of '{column}' must be a number or {{'quantile': q}}")
+
+    for name, conditions in spec.get('profiles', {}).get('rules', []):
+        check_conditions(f"profile '{name}'", conditions)
+    for name, conditions in spec.get('filters', {}).items():
+        check_conditions(f"filter '{name}'", conditions)
+
+    if errors:
+        raise ValueError("Invalid rule specification:\n- " + "\n- ".join(errors))
+
+
+class RuleEngine:
+    """
+    Several rule specifications compiled into one vectorized evaluation
+
+    Every specification is validated once, then flattened into shared
+    arrays: one feature matrix (dataset columns plus derived ratios), one
+    array of score terms and one of conditions. Identical derived variables,
+    conditions and conjunctions across specifications are computed once, and
+    all score terms and all conditions are evaluated in single batched NumPy
+    operations over the catalog.
+
+    Parameters:
+    -----------
+    specs : dict
+        {name: rule specification}
+    schema : dict
+        Dataset columns and their types
+    """
+
+    def __init__(self, specs, schema=NUTRITION_SCHEMA):
+        for spec in specs.values():
+            validate_rules(spec, schema)
+        self.specs = specs
+
+        # Matriz de variáveis: colunas do dataset e depois as derivadas
+        # (definições idênticas em especificações diferentes ocupam uma só coluna)
+        self.inputs = []
+        self.features = []
+        for spec in specs.values():
+            for column in spec.get('derived', {}):
+                self._register(spec, column)
+
+        # Termos de score: (sinal * x + deslocamento) / escala * 100
+        self.term_names = []
+        term_slots, signs, offsets, scales = [], [], [], []
+        # Condições e grupos (perfis e filtros de todas as especificações)
+        condition_slots, operators, thresholds = [], [], []
+        unique = {}
+        self.groups = []
+        for name, spec in specs.items():
+            for term_name, term in spec.get('scores', {}).items():
+                self.term_names.append((name, term_name))
+                term_slots.append(self._register(spec, term['column']))
+                if 'target' in term:
+                    signs.append(1.0), offsets.append(0.0), scales.append(float(term['target']))
+                else:
+                    signs.append(-1.0), offsets.append(float(term['limit'])), scales.append(float(term['limit']))
+            groups = [('profile', profile, conditions) for profile, conditions in spec.get('profiles', {}).get('rules', [])]
+            groups += [('filter', criteria, conditions) for criteria, conditions in spec.get('filters', {}).items()]
+            for kind, group_name, conditions in groups:
+                # Condições iguais (mesma variável, operador e limite) são avaliadas uma vez
+                members = []
+                for column, operator, threshold in conditions:
+                    condition = (self._register(spec, column), operator, repr(threshold))
+                    if condition not in unique:
+                        unique[condition] = len(condition_slots)
+                        condition_slots.append(condition[0])
+                        operators.append(operator)
+                        thresholds.append(threshold)
+                    members.append(unique[condition])
+                self.groups.append((name, kind, group_name, tuple(sorted(set(members)))))
+
+        self.columns = {key: position for position, key in enumerate(self.inputs + self.features)}
+        self._term_columns = np.array([self.columns[key] for key in term_slots], dtype=int)
+        self.signs, self.offsets, self.scales = np.array(signs), np.array(offsets), np.array(scales)
+        self._condition_columns = np.array([self.columns[key] for key in condition_slots], dtype=int)
+        self.operators = operators
+        self.thresholds = thresholds
+        # Conjunções distintas: grupos com as mesmas condições compartilham o resultado
+        self.conjunctions = sorted({members for _, _, _, members in self.groups})
+        self._conjunction_of = [self.conjunctions.index(members) for _, _, _, members in self.groups]
+
+    @staticmethod
+    def _key(spec, column):
+        """Identity of ``column`` as defined by ``spec`` (its definition, for derived ones)"""
+        feature = spec.get('derived', {}).get(column)
+        if feature is None:
+            return column
+        return (*feature['ratio'], feature.get('scale', 1), feature.get('round'))
+
+    def _register(self, spec, column):
+        """Reserve a column of the feature matrix for ``column``"""
+        key = self._key(spec, column)
+        if isinstance(key, tuple):
+            if key not in self.features:
+                for operand in key[:2]:
+                    self._register(spec, operand)
+                self.features.append(key)
+        elif key not in self.inputs:
+            self.inputs.append(key)
+        return key
+
+    def _feature_matrix(self, df):
+        missing = [column for column in self.inputs if column not in df.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        matrix = np.empty((len(df), len(self.inputs) + len(self.features)))
+        matrix[:, :len(self.inputs)] = df[self.inputs].to_numpy(dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for position, (numerator, denominator, scale, decimals) in enumerate(self.features):
+                values = matrix[:, self.columns[numerator]] / matrix[:, self.columns[denominator]]
+                if scale != 1:
+                    values = values * scale
+                if decimals is not None:
+                    values = np.round(values, decimals)
+                matrix[:, len(self.inputs) + position] = values
+        return matrix
+
+    def _conjunctions(self, matrix):
+        """Boolean matrix (rows x groups): all conditions of each group hold"""
+        values = matrix[:, self._condition_columns]
+        thresholds = np.array([
+            np.nanquantile(values[:, position], threshold['quantile']) if isinstance(threshold, dict) else threshold
+            for position, threshold in enumerate(self.thresholds)
+        ], dtype=float)
+        passed = np.empty(values.shape, dtype=bool)
+        operators = np.array(self.operators)
+        for operator, function in OPERATORS.items():
+            columns = np.flatnonzero(operators == operator)
+            if len(columns):
+                passed[:, columns] = function(values[:, columns], thresholds[columns])
+        # Um grupo vale quando todas as suas condições valem
+        conjunctions = np.empty((len(matrix), len(self.conjunctions)), dtype=bool)
+        for position, members in enumerate(self.conjunctions):
+            conjunctions[:, position] = passed[:, members].all(axis=1) if len(members) > 1 else passed[:, members[0]]
+        return conjunctions[:, self._conjunction_of]
+
+    def evaluate(self, df):
+        """
+        Derived columns of every specification
+
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Catalog with the dataset columns
+
+        Returns:
+        --------
+        dict
+            {name: pd.DataFrame with derived ratios, scores, total,
+            recommendation and profile, aligned with ``df``}
+        """
+        matrix = self._feature_matrix(df)
+        with np.errstate(invalid='ignore'):
+            terms = (matrix[:, self._term_columns] * self.signs + self.offsets) / self.scales * 100
+        terms = np.clip(terms, 0, 100)
+        conjunctions = self._conjunctions(matrix)
+
+        results = {}
+        for name, spec in self.specs.items():
+            columns = {}
+            for feature in spec.get('derived', {}):
+                columns[feature] = matrix[:, self.columns[self._key(spec, feature)]]
+            positions = {}
+            for position, (owner, term_name) in enumerate(self.term_names):
+                if owner == name:
+                    columns[term_name] = terms[:, position]
+                    positions[term_name] = position
+
+            total = spec.get('total')
+            if total is not None:
+                score = 0.0
+                for term_name, weight in total['weights'].items():
+                    score = score + terms[:, positions[term_name]] * weight
+                if total.get('round') is not None:
+                    score = np.round(score, total['round'])
+                columns[total['column']] = score
+
+            result = pd.DataFrame(columns, index=df.index)
+            recommendation = spec.get('recommendation')
+            if recommendation is not None:
+                result[recommendation['column']] = pd.qcut(
+                    result[total['column']],
+                    q=len(recommendation['labels']),
+                    labels=recommendation['labels']
+                )
+
+            profiles = spec.get('profiles')
+            if profiles is not None:
+                groups = [
+                    (group, group_name) for group, (owner, kind, group_name, _) in enumerate(self.groups)
+                    if owner == name and kind == 'profile'
+                ]
+                result[profiles['column']] = np.select(
+                    [conjunctions[:, group] for group, _ in groups],
+                    [group_name for _, group_name in groups],
+                    default=profiles.get('default', '')
+                )
+            results[name] = result
+        return results
+
+    def masks(self, df):
+        """
+        Boolean masks of the filters of every specification
+
+        Returns:
+        --------
+        dict
+            {name: {criteria: np.ndarray}}
+        """
+        conjunctions = self._conjunctions(self._feature_matrix(df))
+        masks = {name: {} for name in self.specs}
+        for group, (owner, kind, group_name, _) in enumerate(self.groups):
+            if kind == 'filter':
+                masks[owner][group_name] = conjunctions[:, group]
+        return masks
+
+
+def apply_rules(df, spec=DEFAULT_RULES):
+    """
+    Add the columns derived by a rule specification
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Catalog with the dataset columns
+    spec : dict
+        Rule specification
+
+    Returns:
+    --------
+    pd.DataFrame
+        Same frame with the derived columns
+    """
+    result = RuleEngine({'rules': spec}).evaluate(df)['rules']
+    for column in result.columns:
+        df[column] = result[column]
+    return df
+
+
+def filter_mask(df, criteria, spec=DEFAULT_RULES):
+    """
+    Boolean mask of the rows meeting a filter of the specification
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Catalog with the dataset columns
+    criteria : str
+        Filter name in ``spec['filters']``
+    spec : dict
+        Rule specification
+
+    Returns:
+    --------
+    np.ndarray
+        One value per row (all True for an unknown criteria)
+    """
+    if criteria not in spec.get('filters', {}):
+        return np.ones(len(df), dtype=bool)
+    filters = {**spec, 'filters': {criteria: spec['filters'][criteria]}}
+    return RuleEngine({'rules': filters}).masks(df)['rules'][criteria]
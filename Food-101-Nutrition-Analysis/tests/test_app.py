@@ -0,0 +1,46 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest
+
+ROOT = Path(__file__).parents[1]
+APP_PATH = ROOT / "dashboard" / "app.py"
+
+sys.path.append(str(ROOT / "scripts"))
+from feature_pipeline import load_features
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # Cópia do dataset: o artefato de features é gravado ao lado dele
+    data_path = tmp_path / "nutrition.csv"
+    shutil.copy(ROOT / "data" / "nutrition.csv", data_path)
+    monkeypatch.setenv("FOOD101_DATA_PATH", str(data_path))
+    # ``streamlit run`` põe a pasta do app no sys.path; o AppTest não
+    monkeypatch.syspath_prepend(str(APP_PATH.parent))
+    at = AppTest.from_file(str(APP_PATH), default_timeout=120)
+    at.run()
+    assert not at.exception
+    return at, data_path
+
+
+def _widget(widgets, label):
+    return next(widget for widget in widgets if widget.label == label)
+
+
+@pytest.mark.parametrize("base", ["referencia", "100g"])
+def test_renders_each_base(app, base):
+    at, data_path = app
+    _widget(at.radio, "Base dos valores").set_value(base).run()
+    assert not at.exception
+
+    # O padrão fica dentro da faixa da base (o Streamlit rejeita ou estende a
+    # faixa quando o valor inicial está fora dela)
+    calories = load_features(data_path, data_path.parent / "cache")[base]['calories']
+    slider = _widget(at.slider, "Limite de Calorias (kcal)")
+    assert slider.max == int(calories.max())
+    assert slider.min <= slider.value <= slider.max
@@ -0,0 +1,54 @@
+import sys
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "dashboard"))
+import meal_optimizer
+from meal_optimizer import MEAL_NUTRIENTS, MealOptimizer
+
+LIMITS = {'calories': (None, 900), 'protein': (15, None), 'sodium': (None, 1500)}
+
+
+def _catalog(n_foods, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'calories': rng.uniform(20, 500, n_foods),
+        'protein': rng.uniform(0, 30, n_foods),
+        'fiber': rng.uniform(0, 10, n_foods),
+        'sugars': rng.uniform(0, 40, n_foods),
+        'sodium': rng.uniform(0, 900, n_foods)
+    })
+    df['nutrition_score'] = rng.uniform(0, 10, n_foods).round(1)
+    return df
+
+
+def _brute_force(df, size, limits, top_n):
+    values = df[MEAL_NUTRIENTS].to_numpy(dtype=float)
+    meals = []
+    for items in combinations(range(len(df)), size):
+        totals = values[list(items)].sum(axis=0)
+        if all(
+            (low is None or totals[MEAL_NUTRIENTS.index(column)] >= low) and
+            (high is None or totals[MEAL_NUTRIENTS.index(column)] <= high)
+            for column, (low, high) in limits.items()
+        ):
+            meals.append((-df['nutrition_score'].to_numpy()[list(items)].sum(), items))
+    return [items for _, items in sorted(meals)[:top_n]]
+
+
+@pytest.mark.parametrize("branch_and_bound", [False, True])
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_best_meals_match_brute_force(monkeypatch, size, branch_and_bound):
+    if branch_and_bound:
+        # Força o branch and bound, como em catálogos grandes
+        monkeypatch.setattr(meal_optimizer, 'EXHAUSTIVE_MAX_COMBINATIONS', 0)
+    df = _catalog(25, seed=size)
+
+    meals = MealOptimizer(df).best_meals(size, LIMITS, top_n=8)
+
+    assert list(meals['items']) == _brute_force(df, size, LIMITS, top_n=8)
+